@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql_jwt.refresh_token.signals import refresh_token_revoked
+from graphql_jwt.settings import jwt_settings
+from graphql_jwt.utils import get_http_authorization, get_payload, get_user_by_payload
+
+from .viewer import get_viewer_queryset
+
+User = get_user_model()
+
+
+class TokenUserCache:
+    """An in-process cache of the IDs of the users verified for each token.
+
+    Entries expire after the GRAPHQL_TOKEN_CACHE_TIMEOUT setting, or when
+    their token does, whichever is first, and the entries of a user are
+    dropped as soon as the user is saved or deleted in this process. Other
+    processes forget them when they expire, so the timeout bounds how long a
+    token is accepted after its user is deactivated elsewhere.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, token: str) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            user_id, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return user_id
+
+    def set(self, token: str, user_id: int, timeout: float) -> None:
+        max_size = getattr(settings, "GRAPHQL_TOKEN_CACHE_SIZE", 1000)
+        with self._lock:
+            self._entries[token] = (user_id, time.monotonic() + timeout)
+            self._entries.move_to_end(token)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def revoke(self, user_id: int) -> None:
+        """Drops the entries of a user, so that their tokens are verified again"""
+
+        with self._lock:
+            for token in [t for t, (u, _) in self._entries.items() if u == user_id]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenUserCache()
+
+
+def get_token_cache_timeout() -> float:
+    return getattr(settings, "GRAPHQL_TOKEN_CACHE_TIMEOUT", 0)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def revoke_cached_tokens(sender, instance, **kwargs):
+    token_cache.revoke(instance.pk)
+
+
+@receiver(refresh_token_revoked)
+def revoke_cached_tokens_for_refresh_token(sender, request, refresh_token, **kwargs):
+    token_cache.revoke(refresh_token.user_id)
+
+
+def get_user_by_token(token: str, context=None) -> Optional[User]:
+    """Gets the user authenticated by a JWT, loaded as the viewer.
+
+    If the token cache is enabled, a token verified in the last few seconds
+    is not decoded again, and only its active user is queried.
+
+    Raises:
+        JSONWebTokenError: If the token is invalid, expired or its user is
+            disabled.
+    """
+
+    timeout = get_token_cache_timeout()
+    if timeout:
+        user_id = token_cache.get(token)
+        if user_id is not None:
+            user = get_viewer_queryset().filter(pk=user_id, is_active=True).first()
+            if user is not None:
+                return user
+            token_cache.revoke(user_id)
+
+    payload = get_payload(token, context)
+    user = get_user_by_payload(payload)
+    if timeout and user is not None:
+        expires_in = payload.get("exp", time.time() + timeout) - time.time()
+        if expires_in > 0:
+            token_cache.set(token, user.pk, min(timeout, expires_in))
+    return user
+
+
+def authenticate_request(request) -> Optional[JSONWebTokenError]:
+    """Authenticates the JWT of a request, once for all of its operations.
+
+    The user of the token becomes the user of the request, unless it is
+    already authenticated, such as by its session.
+
+    Returns:
+        The error rejecting the token, or None if the request is anonymous or
+        authenticated.
+    """
+
+    if request is None:
+        return None
+    user = getattr(request, "user", None)
+    if user is not None and not user.is_anonymous:
+        return None
+    if not hasattr(request, "jwt_authentication"):
+        token = get_http_authorization(request)
+        result = None
+        if token is not None:
+            try:
+                result = get_user_by_token(token, request)
+            except JSONWebTokenError as e:
+                result = e
+        request.jwt_authentication = result
+    result = request.jwt_authentication
+    if isinstance(result, JSONWebTokenError):
+        return result
+    if result is not None:
+        request.user = result
+    return None
+
+
+class JSONWebTokenMiddleware:
+    """Reports a rejected JWT on each root field that is not allowed for anyone.
+
+    Replaces the middleware of django-graphql-jwt, which checks the request
+    before every field it resolves, and verifies a rejected token again for
+    every root field. Requests are authenticated before their operations are
+    executed instead, and this middleware is left out of operations whose
+    request is authenticated or anonymous, since graphql-core wraps every
+    resolver of an operation in each middleware.
+
+    Token arguments, enabled by JWT_ALLOW_ARGUMENT, are not supported.
+    """
+
+    @staticmethod
+    def is_needed(context) -> bool:
+        return authenticate_request(context) is not None
+
+    def resolve(self, next, root, info, **kwargs):
+        if len(info.path) == 1:
+            error = authenticate_request(info.context)
+            if error is not None and not jwt_settings.JWT_ALLOW_ANY_HANDLER(
+                info, **kwargs
+            ):
+                raise type(error)(*error.args)
+        return next(root, info, **kwargs)
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import logging
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from graphql.language import ast
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql_jwt.settings import jwt_settings
+from graphql_jwt.utils import get_http_authorization, get_payload
+
+from shows.cache import get_shows_version
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "graphql:response"
+HITS_KEY = f"{KEY_PREFIX}:hits"
+MISSES_KEY = f"{KEY_PREFIX}:misses"
+
+ANONYMOUS = "anonymous"
+AUTHENTICATED = "authenticated"
+
+# Fields whose values depend on the user viewing them, rather than on the
+# viewer class, so that responses selecting them are cached per user
+VIEWER_FIELDS = {"viewerIsPerformer"}
+
+
+def get_cached_fields():
+    return set(getattr(settings, "GRAPHQL_RESPONSE_CACHE_FIELDS", ["shows"]))
+
+
+def get_timeout():
+    return getattr(settings, "GRAPHQL_RESPONSE_CACHE_TIMEOUT", 300)
+
+
+def get_viewer_class(request, identify: bool = False) -> Optional[str]:
+    """Gets the class of viewer making a request without querying the database.
+
+    Args:
+        request: The request to classify.
+        identify: Whether to tell authenticated viewers apart by the username
+            of their token or the user ID of their session.
+
+    Returns:
+        The viewer class, or None if the viewer cannot be classified, such as
+        when the request carries an invalid token that must be rejected by
+        the API.
+    """
+
+    token = get_http_authorization(request)
+    if token is not None:
+        try:
+            payload = get_payload(token)
+        except JSONWebTokenError:
+            return None
+        if identify:
+            username = jwt_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(payload)
+            return f"{AUTHENTICATED}:token:{username}"
+        return AUTHENTICATED
+    if hasattr(request, "session") and SESSION_KEY in request.session:
+        if identify:
+            return f"{AUTHENTICATED}:session:{request.session[SESSION_KEY]}"
+        return AUTHENTICATED
+    return ANONYMOUS
+
+
+def _selects_viewer_fields(selection_set) -> bool:
+    if selection_set is None:
+        return False
+    return any(
+        (isinstance(selection, ast.Field) and selection.name.value in VIEWER_FIELDS)
+        or _selects_viewer_fields(selection.selection_set)
+        for selection in selection_set.selections
+        if not isinstance(selection, ast.FragmentSpread)
+    )
+
+
+def _get_cacheability(
+    document_ast: ast.Document, operation_name: Optional[str]
+) -> Optional[bool]:
+    operations = [
+        d for d in document_ast.definitions if isinstance(d, ast.OperationDefinition)
+    ]
+    if operation_name:
+        operations = [
+            o for o in operations if o.name and o.name.value == operation_name
+        ]
+    if len(operations) != 1 or operations[0].operation != "query":
+        return None
+
+    cached_fields = get_cached_fields() | {"__typename"}
+    for selection in operations[0].selection_set.selections:
+        if not isinstance(selection, ast.Field):
+            return None
+        if selection.name.value not in cached_fields:
+            return None
+    return any(
+        _selects_viewer_fields(getattr(definition, "selection_set", None))
+        for definition in document_ast.definitions
+    )
+
+
+def get_cacheability(document, operation_name: Optional[str]) -> Optional[bool]:
+    """Checks whether the response to an operation of a document can be cached.
+
+    The result is kept on the document, which the backend parses and stores
+    once per query, so that it is only worked out once.
+
+    Returns:
+        Whether the document selects viewer fields, anywhere in the document.
+        None if the selected operation is not a query, or if it selects root
+        fields whose responses are not cached.
+    """
+
+    cacheability = getattr(document, "cacheability", None)
+    if cacheability is None:
+        cacheability = document.cacheability = {}
+    key = (operation_name, frozenset(get_cached_fields()))
+    if key not in cacheability:
+        cacheability[key] = _get_cacheability(document.document_ast, operation_name)
+    return cacheability[key]
+
+
+def get_cache_key(
+    request, document, variables: Optional[Dict], operation_name: Optional[str]
+) -> Optional[str]:
+    """Gets the key of the cached response to an operation.
+
+    The key covers the hash of the query, its variables, the operation name
+    and the viewer class, or the viewer if the query selects viewer fields,
+    along with the version of show data so that any change to a show
+    invalidates its cached responses.
+
+    Args:
+        request: The request of the operation.
+        document: The document of the query, as stored by the backend.
+        variables: The variables of the operation.
+        operation_name: The name of the operation to execute.
+
+    Returns:
+        The cache key, or None if the response must not be cached.
+    """
+
+    selects_viewer_fields = get_cacheability(document, operation_name)
+    if selects_viewer_fields is None:
+        return None
+    viewer_class = get_viewer_class(request, identify=selects_viewer_fields)
+    if viewer_class is None:
+        return None
+
+    try:
+        variables_json = json.dumps(variables or {}, sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+    digest = hashlib.sha256(
+        "\n".join(
+            [document.query_hash, variables_json, operation_name or "", viewer_class]
+        ).encode()
+    ).hexdigest()
+    return f"{KEY_PREFIX}:{get_shows_version()}:{digest}"
+
+
+def get_etag(key: str) -> str:
+    """Gets the strong ETag of the response cached under a key.
+
+    The key covers the version of show data, so a response and its ETag
+    always come from the same version.
+    """
+
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def get_response(key: str):
+    response = cache.get(key)
+    _record(HITS_KEY if response is not None else MISSES_KEY)
+    return response
+
+
+def set_response(key: str, response) -> None:
+    cache.set(key, response, get_timeout())
+
+
+def _record(counter_key: str) -> None:
+    cache.add(counter_key, 0, timeout=None)
+    try:
+        cache.incr(counter_key)
+    except ValueError:
+        pass
+    logger.debug("GraphQL response cache %s", counter_key.rsplit(":", 1)[-1])
+
+
+def get_stats() -> Dict[str, float]:
+    """Gets the hit and miss counts of the response cache"""
+
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counts.get(HITS_KEY, 0), counts.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+    }
+
+
+def reset_stats() -> None:
+    cache.delete_many([HITS_KEY, MISSES_KEY])
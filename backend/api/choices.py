@@ -0,0 +1,38 @@
+import hashlib
+import json
+from functools import lru_cache
+from typing import Dict, NamedTuple
+
+from shows.models import Member, Show, Role
+
+
+class ChoicesBundle(NamedTuple):
+    choices: Dict[str, Dict[str, str]]
+    field_contents: Dict[str, str]
+    content: str
+    etag: str
+
+
+@lru_cache(maxsize=None)
+def get_choices_bundle() -> ChoicesBundle:
+    """Gets the choices of every model field, computed once per process.
+
+    The bundle carries its JSON content and a hash of the content to be used
+    as its ETag, which only changes when the choices themselves change.
+    """
+
+    choices = {
+        name: {str(value): str(label) for value, label in field_choices}
+        for name, field_choices in [
+            ("school", Member.SCHOOLS),
+            ("classYear", Member.CLASS_YEARS),
+            ("position", Member.POSITIONS),
+            ("showPriority", Show.PRIORITIES),
+            ("showStatus", Show.STATUSES),
+            ("performanceRole", Role.ROLES),
+        ]
+    }
+    field_contents = {name: json.dumps(values) for name, values in choices.items()}
+    content = json.dumps(choices, separators=(",", ":"))
+    etag = f'"{hashlib.sha256(content.encode()).hexdigest()}"'
+    return ChoicesBundle(choices, field_contents, content, etag)
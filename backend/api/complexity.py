@@ -0,0 +1,211 @@
+from typing import Dict, NamedTuple, Optional
+
+from django.conf import settings
+from graphene_django import settings as graphene_django_settings
+from graphql import GraphQLError
+from graphql.language import ast
+from graphql.type import GraphQLList, GraphQLNonNull
+
+QUERY_TOO_COMPLEX = "QUERY_TOO_COMPLEX"
+
+
+class QueryComplexityError(GraphQLError):
+    """An operation exceeds the depth or cost budget"""
+
+    def __init__(self, message: str):
+        super().__init__(message, extensions={"code": QUERY_TOO_COMPLEX})
+
+
+class QueryComplexity(NamedTuple):
+    depth: int
+    cost: int
+
+
+def _unwrap_type(graphql_type):
+    while isinstance(graphql_type, GraphQLNonNull):
+        graphql_type = graphql_type.of_type
+    return graphql_type
+
+
+def _get_named_type(graphql_type):
+    graphql_type = _unwrap_type(graphql_type)
+    while isinstance(graphql_type, (GraphQLList, GraphQLNonNull)):
+        graphql_type = graphql_type.of_type
+    return graphql_type
+
+
+def _is_connection(graphql_type) -> bool:
+    fields = getattr(graphql_type, "fields", {})
+    return "edges" in fields and "pageInfo" in fields
+
+
+def _is_edge(graphql_type) -> bool:
+    fields = getattr(graphql_type, "fields", {})
+    return "node" in fields and "cursor" in fields
+
+
+class _Analyzer:
+    """Estimates the depth and cost of an operation from its selections.
+
+    Each object resolved costs one, multiplied by the number of items every
+    enclosing list is expected to hold. Connections hold the number of items
+    requested by `first`, or the maximum page size, and other lists hold the
+    GRAPHQL_LIST_SIZE_ESTIMATE setting. Connection edges and nodes do not add
+    to the depth, so that paginating a list costs no depth.
+    """
+
+    def __init__(self, schema, document_ast: ast.Document, variables: Dict):
+        self.schema = schema
+        self.variables = variables
+        self.fragments = {
+            d.name.value: d
+            for d in document_ast.definitions
+            if isinstance(d, ast.FragmentDefinition)
+        }
+        self.max_page_size = (
+            graphene_django_settings.graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+        )
+        self.list_size = getattr(settings, "GRAPHQL_LIST_SIZE_ESTIMATE", 10)
+
+    def get_argument(self, field: ast.Field, name: str):
+        for argument in field.arguments or []:
+            if argument.name.value != name:
+                continue
+            value = argument.value
+            if isinstance(value, ast.Variable):
+                return self.variables.get(value.name.value)
+            if isinstance(value, ast.IntValue):
+                return int(value.value)
+        return None
+
+    def get_multiplier(self, parent_type, field: ast.Field, field_type) -> int:
+        if _is_connection(_get_named_type(field_type)):
+            first = self.get_argument(field, "first")
+            if isinstance(first, int) and first >= 0:
+                return min(first, self.max_page_size)
+            return self.max_page_size
+        if isinstance(_unwrap_type(field_type), GraphQLList):
+            # Connection edges are already counted by their connection
+            return 1 if _is_connection(parent_type) else self.list_size
+        return 1
+
+    def collect_fields(self, parent_type, selection_set, visited=None):
+        visited = set() if visited is None else visited
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                yield parent_type, selection
+            elif isinstance(selection, ast.InlineFragment):
+                fragment_type = parent_type
+                if selection.type_condition is not None:
+                    fragment_type = self.schema.get_type(
+                        selection.type_condition.name.value
+                    )
+                yield from self.collect_fields(
+                    fragment_type, selection.selection_set, visited
+                )
+            elif isinstance(selection, ast.FragmentSpread):
+                name = selection.name.value
+                if name in visited or name not in self.fragments:
+                    continue
+                visited.add(name)
+                fragment = self.fragments[name]
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                yield from self.collect_fields(
+                    fragment_type, fragment.selection_set, visited
+                )
+
+    def analyze(self, parent_type, selection_set) -> QueryComplexity:
+        max_depth, total_cost = 0, 0
+        for field_parent_type, field in self.collect_fields(parent_type, selection_set):
+            name = field.name.value
+            fields = getattr(field_parent_type, "fields", {})
+            if name.startswith("__") or name not in fields:
+                continue
+            field_type = fields[name].type
+            named_type = _get_named_type(field_type)
+
+            depth, cost = 0, 0
+            if field.selection_set is not None:
+                depth, cost = self.analyze(named_type, field.selection_set)
+                multiplier = self.get_multiplier(field_parent_type, field, field_type)
+                cost = multiplier * (1 + cost)
+            if not (_is_connection(field_parent_type) or _is_edge(field_parent_type)):
+                depth += 1
+            max_depth = max(max_depth, depth)
+            total_cost += cost
+        return QueryComplexity(max_depth, total_cost)
+
+
+def get_operation(
+    document_ast: ast.Document, operation_name: Optional[str]
+) -> Optional[ast.OperationDefinition]:
+    operations = [
+        d for d in document_ast.definitions if isinstance(d, ast.OperationDefinition)
+    ]
+    if operation_name:
+        operations = [
+            o for o in operations if o.name and o.name.value == operation_name
+        ]
+    return operations[0] if len(operations) == 1 else None
+
+
+def _get_variables(operation: ast.OperationDefinition, variables: Optional[Dict]):
+    values = {}
+    for definition in operation.variable_definitions or []:
+        default = definition.default_value
+        if isinstance(default, ast.IntValue):
+            values[definition.variable.name.value] = int(default.value)
+    values.update(variables or {})
+    return values
+
+
+def analyze_query(
+    schema,
+    document_ast: ast.Document,
+    operation_name: Optional[str] = None,
+    variables: Optional[Dict] = None,
+) -> Optional[QueryComplexity]:
+    """Estimates the depth and cost of an operation before it is executed.
+
+    Args:
+        schema: The schema the document was validated against.
+        document_ast: The validated document.
+        operation_name: The name of the operation to analyze.
+        variables: The variables of the operation.
+
+    Returns:
+        The depth and cost of the operation, or None if the document has no
+        such operation.
+    """
+
+    operation = get_operation(document_ast, operation_name)
+    if operation is None:
+        return None
+    root_type = {
+        "query": schema.get_query_type,
+        "mutation": schema.get_mutation_type,
+        "subscription": schema.get_subscription_type,
+    }[operation.operation]()
+    analyzer = _Analyzer(schema, document_ast, _get_variables(operation, variables))
+    return analyzer.analyze(root_type, operation.selection_set)
+
+
+def check_complexity(complexity: QueryComplexity) -> None:
+    """Checks the complexity of an operation against the configured budgets.
+
+    Raises:
+        QueryComplexityError: If the operation is deeper than GRAPHQL_MAX_DEPTH
+            or costs more than GRAPHQL_MAX_COST. Either budget is disabled
+            when set to None.
+    """
+
+    max_depth = getattr(settings, "GRAPHQL_MAX_DEPTH", None)
+    if max_depth is not None and complexity.depth > max_depth:
+        raise QueryComplexityError(
+            f"Query depth of {complexity.depth} exceeds the maximum of {max_depth}"
+        )
+    max_cost = getattr(settings, "GRAPHQL_MAX_COST", None)
+    if max_cost is not None and complexity.cost > max_cost:
+        raise QueryComplexityError(
+            f"Query cost of {complexity.cost} exceeds the maximum of {max_cost}"
+        )
@@ -0,0 +1,362 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import partial
+from typing import Callable, Dict, Hashable, Optional
+
+from django.conf import settings
+from graphql import GraphQLError
+from graphql.backend import GraphQLCoreBackend
+from graphql.backend.base import GraphQLDocument
+from graphql.execution import ExecutionResult, execute
+from graphql.language import ast
+from graphql.language.parser import parse
+from graphql.validation import validate
+
+from .auth import JSONWebTokenMiddleware
+from .complexity import (
+    QueryComplexityError,
+    analyze_query,
+    check_complexity,
+    get_operation,
+)
+from .sql import QueryLog, sql_requested
+from .tracing import TracingMiddleware, finish_trace, start_trace
+
+logger = logging.getLogger(__name__)
+
+PERSISTED_QUERY_NOT_FOUND = "PERSISTED_QUERY_NOT_FOUND"
+PERSISTED_QUERY_NOT_REGISTERED = "PERSISTED_QUERY_NOT_REGISTERED"
+PERSISTED_QUERY_HASH_MISMATCH = "PERSISTED_QUERY_HASH_MISMATCH"
+
+
+class PersistedQueryError(GraphQLError):
+    """A persisted query could not be resolved to a document"""
+
+    def __init__(self, message: str, code: str):
+        super().__init__(message, extensions={"code": code})
+
+
+class LRUCache:
+    """A thread-safe mapping evicting its least recently used items"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key: Hashable):
+        return key in self._items
+
+    def get(self, key: Hashable):
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+            except KeyError:
+                return None
+            return self._items[key]
+
+    def set(self, key: Hashable, value) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class DocumentStats:
+    """Counts document cache lookups and the time spent in each phase"""
+
+    PHASES = ("parse", "validate", "execute")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.counts = {phase: 0 for phase in self.PHASES}
+            self.durations = {phase: 0.0 for phase in self.PHASES}
+
+    def record_lookup(self, hit: bool) -> int:
+        """Records a document cache lookup, returning the number of lookups"""
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return self.hits + self.misses
+
+    def record_phase(self, phase: str, duration: float) -> None:
+        with self._lock:
+            self.counts[phase] += 1
+            self.durations[phase] += duration
+
+    def as_dict(self) -> Dict:
+        """Gets the hit ratio and the total and mean duration of each phase"""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "phases": {
+                    phase: {
+                        "count": self.counts[phase],
+                        "total_ms": self.durations[phase] * 1000,
+                        "mean_ms": (
+                            self.durations[phase] * 1000 / self.counts[phase]
+                            if self.counts[phase]
+                            else 0.0
+                        ),
+                    }
+                    for phase in self.PHASES
+                },
+            }
+
+
+def hash_query(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def _select_middleware(middleware, context, trace):
+    """Leaves out the middleware an operation does not need.
+
+    graphql-core wraps every resolver of an operation in each middleware, so
+    tracing is only included in traced operations, and JWT authentication only
+    in requests whose token was rejected, to report it on each root field.
+    """
+
+    if not isinstance(middleware, (list, tuple)):
+        return middleware
+    return [
+        m
+        for m in middleware
+        if not (isinstance(m, TracingMiddleware) and trace is None)
+        and not (isinstance(m, JSONWebTokenMiddleware) and not m.is_needed(context))
+    ]
+
+
+def _execute_invalid(errors, *args, **kwargs):
+    return ExecutionResult(errors=errors, invalid=True)
+
+
+class DocumentBackend(GraphQLCoreBackend):
+    """A backend parsing and validating each document only once.
+
+    Documents are keyed by the SHA-256 hash of their text, which is the hash
+    sent by clients for persisted queries. Validation runs when a document is
+    first stored, so executing a stored document skips both phases. The
+    complexity of each operation is checked against its budgets before it is
+    executed, and reported in the extensions of the result along with its
+    trace, if traced, and its SQL queries, if requested by a staff member.
+    """
+
+    def __init__(self, max_size: int, registered: Optional[Dict[str, str]] = None):
+        super().__init__()
+        self.documents = LRUCache(max_size)
+        self.registered = registered or {}
+        self.stats = DocumentStats()
+        self._local = threading.local()
+
+    def start_timing(self, timings: Optional[Dict[str, float]] = None):
+        """Starts collecting the phase durations of the current thread.
+
+        Args:
+            timings: The timings to add to, or None to start from nothing.
+
+        Returns:
+            A dict to which the duration in seconds of each phase run by the
+            current thread is added, until timing is started again.
+        """
+
+        self._local.timings = {} if timings is None else timings
+        # The document of an operation is looked up before it is executed, to
+        # key its cached response, which is counted as a single lookup
+        self._local.looked_up = set()
+        return self._local.timings
+
+    def _time(self, phase: str, func: Callable, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            self.stats.record_phase(phase, duration)
+            timings = getattr(self._local, "timings", None)
+            if timings is not None:
+                timings[phase] = timings.get(phase, 0.0) + duration
+
+    def compile(self, schema, query: str) -> GraphQLDocument:
+        document_ast = self._time("parse", parse, query)
+        errors = self._time("validate", validate, schema, document_ast)
+        execute_document = (
+            partial(_execute_invalid, errors)
+            if errors
+            else partial(self._execute, schema, document_ast)
+        )
+        document = GraphQLDocument(
+            schema=schema,
+            document_string=query,
+            document_ast=document_ast,
+            execute=execute_document,
+        )
+        document.query_hash = hash_query(query)
+        return document
+
+    def _execute(self, schema, document_ast: ast.Document, **options):
+        complexity = analyze_query(
+            schema,
+            document_ast,
+            options.get("operation_name"),
+            options.get("variable_values"),
+        )
+        extensions = {}
+        if complexity is not None:
+            extensions["complexity"] = complexity._asdict()
+            try:
+                check_complexity(complexity)
+            except QueryComplexityError as e:
+                return ExecutionResult(errors=[e], invalid=True, extensions=extensions)
+
+        context = options.get("context_value")
+        operation = get_operation(document_ast, options.get("operation_name"))
+        operation_name = operation and operation.name and operation.name.value
+        trace = start_trace(context, operation_name) if operation else None
+        options["middleware"] = _select_middleware(
+            options.get("middleware"), context, trace
+        )
+        query_log = QueryLog(operation_name) if sql_requested(context) else None
+        with query_log.record() if query_log else nullcontext():
+            result = self._time("execute", execute, schema, document_ast, **options)
+        if trace is not None:
+            finish_trace(context, trace, extensions)
+        if query_log is not None:
+            extensions["sql"] = query_log.as_dict()
+        result.extensions.update(extensions)
+        return result
+
+    def get_document(self, schema, query_hash: str) -> Optional[GraphQLDocument]:
+        """Gets the stored document of a hash, compiling registered queries"""
+
+        document = self.documents.get(query_hash)
+        if document is None and query_hash in self.registered:
+            document = self.compile(schema, self.registered[query_hash])
+            self.documents.set(query_hash, document)
+        return document
+
+    def document_from_string(self, schema, document_string) -> GraphQLDocument:
+        if isinstance(document_string, ast.Document):
+            return super().document_from_string(schema, document_string)
+        query_hash = hash_query(document_string)
+        document = self.get_document(schema, query_hash)
+        looked_up = getattr(self._local, "looked_up", None)
+        if looked_up is None or query_hash not in looked_up:
+            if looked_up is not None:
+                looked_up.add(query_hash)
+            lookups = self.stats.record_lookup(document is not None)
+            interval = getattr(settings, "GRAPHQL_DOCUMENT_STATS_LOG_INTERVAL", 0)
+            if interval and lookups % interval == 0:
+                logger.info(f"GraphQL document stats: {self.stats.as_dict()}")
+        if document is None:
+            document = self.compile(schema, document_string)
+            self.documents.set(query_hash, document)
+        return document
+
+
+def load_manifest(path: Optional[str]) -> Dict[str, str]:
+    """Loads the registered queries from a manifest mapping hashes to queries"""
+
+    if not path:
+        return {}
+    with open(path) as f:
+        queries = json.load(f)
+    if isinstance(queries, list):
+        queries = {hash_query(query): query for query in queries}
+    return queries
+
+
+def get_persisted_query_hash(extensions) -> Optional[str]:
+    """Gets the hash of a persisted query from the extensions of a request"""
+
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            return None
+    if not isinstance(extensions, dict):
+        return None
+    persisted_query = extensions.get("persistedQuery")
+    if not isinstance(persisted_query, dict):
+        return None
+    return persisted_query.get("sha256Hash")
+
+
+def resolve_persisted_query(
+    backend: DocumentBackend, schema, query: Optional[str], query_hash: Optional[str]
+) -> Optional[str]:
+    """Resolves the query text of a request to the persisted query endpoint.
+
+    Args:
+        backend: The backend storing persisted documents.
+        schema: The schema the documents are validated against.
+        query: The query text sent with the request, if any.
+        query_hash: The SHA-256 hash sent with the request, if any.
+
+    Returns:
+        The query text to execute.
+
+    Raises:
+        PersistedQueryError: If the hash is unknown, does not match the query
+            text, or is not registered in allow-list mode.
+    """
+
+    if getattr(settings, "GRAPHQL_PERSISTED_QUERIES_ONLY", False):
+        registered_hash = query_hash or (query and hash_query(query))
+        if registered_hash not in backend.registered:
+            raise PersistedQueryError(
+                "Query is not registered", PERSISTED_QUERY_NOT_REGISTERED
+            )
+    if query_hash is None:
+        return query
+
+    if query:
+        if hash_query(query) != query_hash:
+            raise PersistedQueryError(
+                "Provided sha256Hash does not match query",
+                PERSISTED_QUERY_HASH_MISMATCH,
+            )
+        return query
+
+    document = backend.get_document(schema, query_hash)
+    if document is None:
+        raise PersistedQueryError("PersistedQueryNotFound", PERSISTED_QUERY_NOT_FOUND)
+    return document.document_string
+
+
+_backend = None
+
+
+def get_document_backend() -> DocumentBackend:
+    global _backend
+    if _backend is None:
+        _backend = DocumentBackend(
+            getattr(settings, "GRAPHQL_DOCUMENT_CACHE_SIZE", 1000),
+            load_manifest(getattr(settings, "GRAPHQL_PERSISTED_QUERY_MANIFEST", None)),
+        )
+    return _backend
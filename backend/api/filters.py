@@ -0,0 +1,52 @@
+from datetime import date
+from typing import Optional
+
+from django.db.models import Q, QuerySet
+
+from shows.models import Show
+
+
+def filter_shows(
+    queryset: QuerySet,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[int] = None,
+    priority: Optional[int] = None,
+    is_open: Optional[bool] = None,
+    performer_id: Optional[str] = None,
+    search: Optional[str] = None,
+) -> QuerySet:
+    """Filters a show queryset by the arguments of the shows query.
+
+    Args:
+        queryset: The show queryset to filter.
+        date_from: The earliest show date to include.
+        date_to: The latest show date to include.
+        status: The show status to include.
+        priority: The show priority to include.
+        is_open: Whether to include only open or only non-open shows.
+        performer_id: The ID of a member who must be performing at the show.
+        search: Text to search for in the show name and address.
+
+    Returns:
+        The filtered queryset.
+    """
+
+    if date_from is not None:
+        queryset = queryset.filter(date__gte=date_from)
+    if date_to is not None:
+        queryset = queryset.filter(date__lte=date_to)
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    if priority is not None:
+        queryset = queryset.filter(priority=priority)
+    if is_open is not None:
+        open_filter = Q(status__gt=Show.STATUSES.draft, status__lt=Show.STATUSES.closed)
+        queryset = queryset.filter(open_filter if is_open else ~open_filter)
+    if performer_id is not None:
+        queryset = queryset.filter(performers=performer_id)
+    if search:
+        queryset = queryset.filter(
+            Q(name__icontains=search) | Q(address__icontains=search)
+        )
+    return queryset
@@ -0,0 +1,259 @@
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from django.db import connections
+from django.db.models import F, QuerySet, Window
+from django.db.models.functions import RowNumber
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from shows.models import Member, Show, Round, Contact, Role
+from users.models import User
+from .pagination import (
+    filter_after,
+    get_order_by,
+    get_ordering,
+    make_connection,
+    parse_ordering,
+)
+from .utils import get_model_field
+
+
+class ModelLoader(DataLoader):
+    """A loader that batches primary key lookups for a model"""
+
+    model = None
+
+    def batch_load_fn(self, keys):
+        instances = self.model.objects.in_bulk(keys)
+        return Promise.resolve([instances.get(key) for key in keys])
+
+
+class RelatedListLoader(DataLoader):
+    """A loader that batches lookups of objects grouped by a foreign key.
+
+    Subclasses set `model` and `key_field`, and may override `get_queryset`
+    and `get_value` to load a different object than the one being queried.
+    """
+
+    model = None
+    key_field = None
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def get_value(self, instance):
+        return instance
+
+    def batch_load_fn(self, keys):
+        groups = defaultdict(list)
+        queryset = self.get_queryset().filter(**{f"{self.key_field}__in": keys})
+        for instance in queryset:
+            groups[getattr(instance, self.key_field)].append(self.get_value(instance))
+        return Promise.resolve([groups[key] for key in keys])
+
+
+class UserLoader(ModelLoader):
+    model = User
+
+
+class MemberLoader(ModelLoader):
+    model = Member
+
+
+class ShowLoader(ModelLoader):
+    model = Show
+
+
+class ContactLoader(ModelLoader):
+    model = Contact
+
+
+class MemberByUserLoader(DataLoader):
+    """Loads the member profile for each user ID"""
+
+    def batch_load_fn(self, keys):
+        members = {m.user_id: m for m in Member.objects.filter(user_id__in=keys)}
+        return Promise.resolve([members.get(key) for key in keys])
+
+
+class ShowRoundsLoader(RelatedListLoader):
+    model = Round
+    key_field = "show_id"
+
+
+class ShowPerformersLoader(RelatedListLoader):
+    model = Role
+    key_field = "show_id"
+
+    def get_queryset(self):
+        return Role.objects.select_related("performer").order_by("id")
+
+    def get_value(self, instance):
+        return instance.performer
+
+
+class MemberPointedShowsLoader(RelatedListLoader):
+    model = Show
+    key_field = "point_id"
+
+
+class MemberPerformedShowsLoader(DataLoader):
+    """Loads a page of the shows performed by each member.
+
+    Keys are (member_id, first, after) tuples. The pages of all members
+    paged with the same arguments are selected in one query, numbering the
+    shows of each member with a window function, and the shows on all pages
+    are then fetched in one query with the optimized queryset of the field.
+    """
+
+    def __init__(self, queryset: QuerySet, connection_type, **kwargs):
+        super().__init__(**kwargs)
+        self.queryset = queryset
+        self.connection_type = connection_type
+        self.ordering = parse_ordering(get_ordering(queryset))
+
+    def get_pages(
+        self, member_ids: List[int], first: int, after: Optional[str]
+    ) -> Dict[int, List[int]]:
+        """Gets the IDs of the shows on the page of each member, plus the
+        show after the page, if any"""
+
+        roles = filter_after(
+            Role.objects.filter(performer_id__in=member_ids),
+            self.ordering,
+            after,
+            prefix="show__",
+        )
+        roles = (
+            roles.annotate(
+                page_member=F("performer_id"),
+                page_show=F("show_id"),
+                page_row=Window(
+                    RowNumber(),
+                    partition_by=F("performer_id"),
+                    order_by=get_order_by(self.ordering, prefix="show__"),
+                ),
+            )
+            .order_by()
+            .values_list("page_member", "page_show", "page_row")
+        )
+        sql, params = roles.query.sql_with_params()
+        pages = defaultdict(list)
+        with connections[roles.db].cursor() as cursor:
+            # Window functions cannot be filtered on, so the rows are
+            # numbered in a subquery
+            cursor.execute(
+                f"SELECT page_member, page_show FROM ({sql}) pages "
+                f"WHERE page_row <= %s ORDER BY page_member, page_row",
+                [*params, first + 1],
+            )
+            for member_id, show_id in cursor.fetchall():
+                pages[member_id].append(show_id)
+        return pages
+
+    def batch_load_fn(self, keys):
+        groups = defaultdict(list)
+        for member_id, first, after in keys:
+            groups[(first, after)].append(member_id)
+        pages = {}
+        for (first, after), member_ids in groups.items():
+            for member_id, show_ids in self.get_pages(member_ids, first, after).items():
+                pages[(member_id, first, after)] = show_ids
+
+        shows = self.queryset.in_bulk(
+            {show_id for show_ids in pages.values() for show_id in show_ids}
+        )
+        results = []
+        for key in keys:
+            _, first, after = key
+            nodes = [shows[show_id] for show_id in pages.get(key, [])]
+            results.append(
+                make_connection(
+                    nodes, self.connection_type, self.ordering, first, after
+                )
+            )
+        return Promise.resolve(results)
+
+
+class Loaders:
+    """Per-request collection of data loaders.
+
+    Each loader caches the objects it has loaded, so a new collection is
+    created for every request and attached to the request context.
+    """
+
+    def __init__(self):
+        self.user = UserLoader()
+        self.member = MemberLoader()
+        self.show = ShowLoader()
+        self.contact = ContactLoader()
+        self.member_by_user = MemberByUserLoader()
+        self.show_rounds = ShowRoundsLoader()
+        self.show_performers = ShowPerformersLoader()
+        self.member_pointed_shows = MemberPointedShowsLoader()
+        # Loaders depending on the selection of a field, by field node
+        self.fields: Dict[tuple, DataLoader] = {}
+
+
+def load_related(info, instance, name, loader_name, key):
+    """Resolves a relation of a model instance.
+
+    Relations already fetched with select_related or prefetch_related are
+    returned from the instance. Otherwise, the relation is loaded in a batch
+    with the named data loader.
+
+    Args:
+        info: The GraphQL resolve info.
+        instance: The model instance to resolve the relation for.
+        name: The name of the relation on the model.
+        loader_name: The name of the data loader to fall back to.
+        key: The key to load, typically a primary or foreign key.
+    """
+
+    field = get_model_field(type(instance), name)
+    if field.many_to_many or field.one_to_many:
+        # Reverse many-to-many managers cache prefetched objects by query name
+        manager = getattr(instance, name)
+        cache_name = getattr(manager, "prefetch_cache_name", name)
+        prefetched = getattr(instance, "_prefetched_objects_cache", {})
+        if cache_name in prefetched:
+            return list(prefetched[cache_name])
+    elif field.is_cached(instance):
+        return field.get_cached_value(instance)
+    if key is None:
+        return None
+    return getattr(get_loaders(info), loader_name).load(key)
+
+
+def get_loaders(info) -> Loaders:
+    """Returns the data loaders attached to the request, creating them if needed"""
+
+    context = info.context
+    loaders = getattr(context, "loaders", None)
+    if loaders is None:
+        loaders = Loaders()
+        context.loaders = loaders
+    return loaders
+
+
+def get_field_loader(info, create: Callable[[], DataLoader]) -> DataLoader:
+    """Returns the data loader of a field in the query, creating it if needed.
+
+    Loaders whose results depend on the selection of the field, such as an
+    optimized queryset, are kept per field node in the document, so that the
+    objects of a list share the loader of the field they are selected by.
+    """
+
+    loaders = get_loaders(info).fields
+    key = tuple(id(field_ast) for field_ast in info.field_asts)
+    loader = loaders.get(key)
+    if loader is None:
+        loader = loaders[key] = create()
+    return loader
+
+
+def clear_loaders(context) -> None:
+    """Discards the data loaders attached to the request and their results"""
+
+    context.loaders = None
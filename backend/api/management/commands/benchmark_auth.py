@@ -0,0 +1,112 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from graphql_jwt.shortcuts import get_token
+
+from api.auth import token_cache
+from api.tests.utils import execute_query
+from shows.models import Role, Show
+
+User = get_user_model()
+
+SHOWS_QUERY = """
+    query BenchmarkAuth($first: Int) {
+        shows(first: $first) {
+            edges {
+                node {
+                    id name date time lions isOpen status
+                    performers { user { id firstName lastName } }
+                }
+            }
+        }
+    }
+"""
+
+LIBRARY_MIDDLEWARE = [
+    "graphql_jwt.middleware.JSONWebTokenMiddleware",
+    "api.tracing.TracingMiddleware",
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the overhead of JWT authentication on a query of many shows, "
+        "with the middleware of django-graphql-jwt and with the API's own"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shows", type=int, default=500)
+        parser.add_argument("--requests", type=int, default=20)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_active=True).first()
+        if user is None:
+            raise CommandError("A user is needed to authenticate as.")
+
+        # The shows are created for the benchmark only, and every response is
+        # executed rather than served from the cache
+        try:
+            with transaction.atomic(), override_settings(
+                GRAPHQL_RESPONSE_CACHE_FIELDS=[],
+                GRAPHQL_MAX_COST=None,
+                ALLOWED_HOSTS=["testserver"],
+            ):
+                self.create_shows(user, options["shows"])
+                self.benchmark(user, options["shows"], options["requests"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    @staticmethod
+    def create_shows(user, count: int):
+        shows = Show.objects.bulk_create(
+            [
+                Show(name=f"Benchmark show {i}", status=Show.STATUSES.published)
+                for i in range(count)
+            ]
+        )
+        Role.objects.bulk_create(
+            [Role(show=show, performer=user.member) for show in shows]
+        )
+
+    def benchmark(self, user, shows: int, requests: int):
+        client = Client()
+        token = get_token(user)
+
+        def run(**extra) -> float:
+            start = time.perf_counter()
+            for _ in range(requests):
+                result = execute_query(client, SHOWS_QUERY, {"first": shows}, **extra)
+                if "errors" in result:
+                    raise CommandError(result["errors"][0]["message"])
+            return (time.perf_counter() - start) / requests
+
+        for name, middleware, timeout in [
+            ("django-graphql-jwt middleware", LIBRARY_MIDDLEWARE, 0),
+            ("API middleware", settings.GRAPHENE["MIDDLEWARE"], 0),
+            ("API middleware with token cache", settings.GRAPHENE["MIDDLEWARE"], 30),
+        ]:
+            token_cache.clear()
+            graphene = {
+                **settings.GRAPHENE,
+                "MIDDLEWARE": middleware,
+                "RELAY_CONNECTION_MAX_LIMIT": shows,
+            }
+            with override_settings(
+                GRAPHENE=graphene, GRAPHQL_TOKEN_CACHE_TIMEOUT=timeout
+            ):
+                anonymous = run()
+                authenticated = run(HTTP_AUTHORIZATION=f"JWT {token}")
+            self.stdout.write(
+                f"{name}: {anonymous * 1000:.1f}ms anonymous, "
+                f"{authenticated * 1000:.1f}ms authenticated "
+                f"({(authenticated - anonymous) * 1000:+.2f}ms)"
+            )
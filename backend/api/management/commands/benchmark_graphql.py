@@ -0,0 +1,169 @@
+import asyncio
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from common.side_effects import wait_for_side_effects
+from core.asgi import HubASGIHandler
+
+User = get_user_model()
+
+SHOWS_QUERY = """
+    query BenchmarkShows {
+        shows(first: 50) {
+            edges { node { id name date time performers { user { id } } } }
+        }
+    }
+"""
+
+PASSWORD_RESET_MUTATION = """
+    mutation BenchmarkPasswordReset($email: String!) {
+        sendPasswordResetEmail(email: $email) { success }
+    }
+"""
+
+HOST = "localhost"
+
+
+class SlowEmailBackend(EmailBackend):
+    """Keeps emails in memory after waiting as long as a mail server would"""
+
+    delay = 0.0
+
+    def send_messages(self, messages):
+        time.sleep(self.delay)
+        return super().send_messages(messages)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of concurrent GraphQL requests served by the "
+        "WSGI and the ASGI applications"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--operation",
+            choices=["shows", "password-reset"],
+            default="shows",
+            help="The operation to request.",
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument(
+            "--email-delay",
+            type=float,
+            default=0.2,
+            help="Seconds each password reset email takes to send.",
+        )
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Serve repeated queries from the response cache.",
+        )
+
+    def handle(self, *args, **options):
+        body = self.get_body(options["operation"])
+        overrides = {
+            "EMAIL_BACKEND": f"{__name__}.SlowEmailBackend",
+            "ALLOWED_HOSTS": [HOST],
+        }
+        if not options["cache"]:
+            overrides["GRAPHQL_RESPONSE_CACHE_FIELDS"] = []
+        SlowEmailBackend.delay = options["email_delay"]
+
+        with override_settings(**overrides):
+            for name, benchmark in [
+                ("WSGI", self.benchmark_wsgi),
+                ("ASGI", self.benchmark_asgi),
+            ]:
+                duration = benchmark(body, options["requests"], options["concurrency"])
+                self.stdout.write(
+                    f"{name}: {options['requests']} requests in {duration:.2f}s "
+                    f"({options['requests'] / duration:.1f} requests/s)"
+                )
+
+    def get_body(self, operation: str) -> bytes:
+        if operation == "shows":
+            return json.dumps({"query": SHOWS_QUERY}).encode()
+        email = User.objects.values_list("email", flat=True).first()
+        if email is None:
+            raise CommandError("A user is needed to reset the password of.")
+        return json.dumps(
+            {"query": PASSWORD_RESET_MUTATION, "variables": {"email": email}}
+        ).encode()
+
+    @staticmethod
+    def benchmark_wsgi(body: bytes, requests: int, concurrency: int) -> float:
+        application = WSGIHandler()
+
+        def request(_):
+            environ = {
+                "REQUEST_METHOD": "POST",
+                "PATH_INFO": "/graphql/",
+                "SERVER_NAME": HOST,
+                "SERVER_PORT": "80",
+                "HTTP_HOST": HOST,
+                "CONTENT_TYPE": "application/json",
+                "CONTENT_LENGTH": str(len(body)),
+                "wsgi.input": io.BytesIO(body),
+                "wsgi.url_scheme": "http",
+            }
+            response = application(environ, lambda status, headers: None)
+            b"".join(response)
+            response.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(request, range(requests)))
+        return time.perf_counter() - start
+
+    @staticmethod
+    def benchmark_asgi(body: bytes, requests: int, concurrency: int) -> float:
+        application = HubASGIHandler()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": "/graphql/",
+            "raw_path": b"/graphql/",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"host", HOST.encode()),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+            "server": (HOST, 80),
+        }
+
+        async def request(semaphore):
+            messages = [{"type": "http.request", "body": body}]
+
+            async def receive():
+                return messages.pop() if messages else {"type": "http.disconnect"}
+
+            async def send(message):
+                pass
+
+            async with semaphore:
+                await application(dict(scope), receive, send)
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+            start = time.perf_counter()
+            await asyncio.gather(*(request(semaphore) for _ in range(requests)))
+            duration = time.perf_counter() - start
+            await wait_for_side_effects()
+            return duration
+
+        return asyncio.run(run())
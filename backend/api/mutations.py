@@ -1,6 +1,7 @@
 import graphene
+from graphql_jwt.decorators import login_required
 
-from shows.models import Show, Member, Role
+from shows.models import Show, Role
 from users.mixins import (
     SendPasswordResetEmailMixin,
     LogoutUserMixin,
@@ -11,6 +12,7 @@ from users.mixins import (
 )
 from .bases import DynamicArgsMixin
 from .types import RoleType
+from .viewer import get_viewer
 
 
 class CreateRoleMutation(graphene.Mutation):
@@ -20,10 +22,11 @@ class CreateRoleMutation(graphene.Mutation):
         show_id = graphene.ID(required=True)
 
     @staticmethod
+    @login_required
     def mutate(root, info, show_id):
         role_instance = Role(
             show=Show.objects.get(pk=show_id),
-            performer=Member.objects.get(pk=info.context.user.member.id),
+            performer=get_viewer(info).member,
         )
         role_instance.save()
         return CreateRoleMutation(role=role_instance)
@@ -36,15 +39,46 @@ class DeleteRoleMutation(graphene.Mutation):
         show_id = graphene.ID(required=True)
 
     @staticmethod
+    @login_required
     def mutate(root, info, show_id):
         role_instance = Role.objects.get(
             show=Show.objects.get(pk=show_id),
-            performer=Member.objects.get(pk=info.context.user.member.id),
+            performer=get_viewer(info).member,
         )
         role_instance.delete()
         return DeleteRoleMutation(role=role_instance)
 
 
+class CreateRolesMutation(graphene.Mutation):
+    """Signs the viewer up for several shows at once"""
+
+    roles = graphene.List(RoleType)
+
+    class Arguments:
+        show_ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+    @staticmethod
+    @login_required
+    def mutate(root, info, show_ids):
+        roles = Role.objects.create_for_shows(get_viewer(info).member, show_ids)
+        return CreateRolesMutation(roles=roles)
+
+
+class DeleteRolesMutation(graphene.Mutation):
+    """Withdraws the viewer from several shows at once"""
+
+    roles = graphene.List(RoleType)
+
+    class Arguments:
+        show_ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+    @staticmethod
+    @login_required
+    def mutate(root, info, show_ids):
+        roles = Role.objects.delete_for_shows(get_viewer(info).member, show_ids)
+        return DeleteRolesMutation(roles=roles)
+
+
 class RegisterMutation(DynamicArgsMixin, RegisterMixin, graphene.Mutation):
     __doc__ = RegisterMixin.__doc__
     _required_args = ["email", "password1", "password2", "first_name", "last_name"]
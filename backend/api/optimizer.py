@@ -0,0 +1,193 @@
+from functools import partial
+from typing import Dict, List, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet
+from graphene import Dynamic
+from graphene.relay import Connection
+from graphene.utils.str_converters import to_camel_case
+from graphene_django import DjangoObjectType
+from graphql.language import ast
+
+from .pagination import get_ordering
+from .utils import get_model_field
+
+
+class QueryPlan:
+    """Collects the queryset optimizations for a selection set.
+
+    Attributes:
+        only: Column paths to load.
+        select_related: Relation paths to join in the same query.
+        prefetch_related: Prefetch objects for list relations.
+        annotations: Functions annotating the queryset for the selected fields,
+            keyed by the annotation functions declared by the object type.
+        load_all_columns: Whether a selected field needs columns that cannot
+            be determined from the model, so that `only` is not applied.
+    """
+
+    def __init__(self):
+        self.only = set()
+        self.select_related = set()
+        self.prefetch_related = []
+        self.annotations = {}
+        self.load_all_columns = False
+
+    def apply(self, queryset: QuerySet) -> QuerySet:
+        for annotate in self.annotations.values():
+            queryset = annotate(queryset)
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only and not self.load_all_columns:
+            queryset = queryset.only(*sorted(self.only))
+        return queryset
+
+
+def optimize_queryset(queryset: QuerySet, info, object_type=None) -> QuerySet:
+    """Optimizes a queryset for the fields selected in a GraphQL query.
+
+    Forward and reverse one-to-one relations in the selection set are joined
+    with select_related, list relations are fetched with prefetch_related
+    using nested optimized querysets, and only the selected columns are
+    loaded. The plan is derived from the DjangoObjectType field metadata, so
+    model fields need no per-field hints. Fields computed by the database
+    are annotated by the functions in the `annotations` of the object type,
+    mapping field names to functions of the queryset and the resolve info.
+    Selecting any other field that is not backed by a model field loads all
+    columns of that queryset.
+
+    Args:
+        queryset: The queryset to optimize.
+        info: The GraphQL resolve info of the field returning the queryset.
+        object_type: The DjangoObjectType of the queryset's objects. Inferred
+            from the return type of the field if not provided. If the field
+            returns a connection, the selection of its nodes is optimized and
+            the columns used by the pagination cursors are always loaded.
+
+    Returns:
+        The optimized queryset.
+    """
+
+    plan = QueryPlan()
+    field_asts = info.field_asts
+    if object_type is None:
+        connection_type = _get_connection_type(info.return_type)
+        if connection_type is not None:
+            object_type = connection_type._meta.node
+            edges = _collect_fields(info, field_asts).get("edges", [])
+            field_asts = _collect_fields(info, edges).get("node", [])
+            plan.only.update(name.lstrip("-") for name in get_ordering(queryset))
+        else:
+            object_type = _get_object_type(info.return_type)
+    _plan_selections(plan, info, object_type, queryset.model, field_asts, "")
+    return plan.apply(queryset)
+
+
+def _plan_selections(plan, info, object_type, model, field_asts, prefix):
+    fields = _collect_fields(info, field_asts)
+    graphene_fields = {
+        to_camel_case(name): (name, field)
+        for name, field in object_type._meta.fields.items()
+    }
+
+    annotations = getattr(object_type, "annotations", {})
+
+    for field_name, sub_field_asts in fields.items():
+        if field_name.startswith("__"):
+            continue
+        if field_name not in graphene_fields:
+            plan.load_all_columns = True
+            continue
+        name, graphene_field = graphene_fields[field_name]
+        if name in annotations:
+            # Objects joined with select_related cannot be annotated, so their
+            # resolvers compute the field instead
+            if not prefix:
+                annotate = annotations[name]
+                plan.annotations.setdefault(annotate, partial(annotate, info=info))
+            continue
+        try:
+            model_field = get_model_field(model, name)
+        except FieldDoesNotExist:
+            plan.load_all_columns = True
+            continue
+
+        path = f"{prefix}{name}"
+        if not model_field.is_relation:
+            plan.only.add(path)
+            continue
+
+        if _get_connection_type(graphene_field) is not None:
+            # Paginated relations are queried separately by their resolvers
+            continue
+        related_type = _get_object_type(graphene_field)
+        if related_type is None:
+            plan.load_all_columns = True
+            continue
+        related_model = model_field.related_model
+
+        if model_field.many_to_many or model_field.one_to_many:
+            related_queryset = related_model._default_manager.all()
+            related_plan = QueryPlan()
+            _plan_selections(
+                related_plan, info, related_type, related_model, sub_field_asts, ""
+            )
+            if model_field.one_to_many:
+                related_plan.only.add(model_field.field.name)
+            plan.prefetch_related.append(
+                Prefetch(path, queryset=related_plan.apply(related_queryset))
+            )
+        else:
+            if model_field.concrete:
+                plan.only.add(path)
+            plan.select_related.add(path)
+            _plan_selections(
+                plan, info, related_type, related_model, sub_field_asts, f"{path}__"
+            )
+
+
+def _collect_fields(info, field_asts: List[ast.Field]) -> Dict[str, List[ast.Field]]:
+    """Groups the sub-fields selected by field ASTs by name, expanding fragments"""
+
+    fields = {}
+
+    def collect(selection_set):
+        if selection_set is None:
+            return
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                fields.setdefault(selection.name.value, []).append(selection)
+            elif isinstance(selection, ast.FragmentSpread):
+                collect(info.fragments[selection.name.value].selection_set)
+            elif isinstance(selection, ast.InlineFragment):
+                collect(selection.selection_set)
+
+    for field_ast in field_asts:
+        collect(field_ast.selection_set)
+    return fields
+
+
+def _unwrap_type(field_or_type) -> Optional[type]:
+    """Unwraps a graphene field or GraphQL type to its graphene type"""
+
+    if isinstance(field_or_type, Dynamic):
+        field_or_type = field_or_type.get_type()
+        if field_or_type is None:
+            return None
+    _type = getattr(field_or_type, "type", field_or_type)
+    while hasattr(_type, "of_type"):
+        _type = _type.of_type
+    _type = getattr(_type, "graphene_type", _type)
+    return _type if isinstance(_type, type) else None
+
+
+def _get_object_type(field_or_type) -> Optional[type]:
+    _type = _unwrap_type(field_or_type)
+    return _type if _type and issubclass(_type, DjangoObjectType) else None
+
+
+def _get_connection_type(field_or_type) -> Optional[type]:
+    _type = _unwrap_type(field_or_type)
+    return _type if _type and issubclass(_type, Connection) else None
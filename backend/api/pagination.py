@@ -0,0 +1,193 @@
+import base64
+import json
+from typing import List, Optional, Tuple
+
+import graphene
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q, QuerySet
+from graphene.relay import PageInfo
+from graphene_django import settings as graphene_django_settings
+from graphql import GraphQLError
+
+
+class KeysetConnectionField(graphene.Field):
+    """A connection field paginated forwards with `first` and `after`"""
+
+    def __init__(self, type_, *args, **kwargs):
+        kwargs.setdefault("first", graphene.Int())
+        kwargs.setdefault("after", graphene.String())
+        super().__init__(type_, *args, **kwargs)
+
+
+def get_ordering(queryset: QuerySet) -> List[str]:
+    """Gets the keyset ordering for a queryset.
+
+    The model's default ordering is used, with the primary key appended as a
+    tiebreaker so that every row has a unique position.
+    """
+
+    ordering = list(queryset.model._meta.ordering)
+    pk_name = queryset.model._meta.pk.name
+    if not {"pk", pk_name, f"-{pk_name}"} & set(ordering):
+        ordering.append(pk_name)
+    return ordering
+
+
+def encode_cursor(values: List) -> str:
+    data = json.dumps([str(v) if v is not None else None for v in values])
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> List:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except ValueError:
+        raise GraphQLError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise GraphQLError("Invalid cursor")
+    return values
+
+
+def parse_ordering(ordering: List[str]) -> List[Tuple[str, bool]]:
+    return [(f.lstrip("-"), f.startswith("-")) for f in ordering]
+
+
+def _after_filter(
+    ordering: List[Tuple[str, bool]], values: List, prefix: str = ""
+) -> Q:
+    """Builds the filter for rows positioned after the cursor values.
+
+    Rows are ordered with nulls last, so a null value is positioned after
+    every non-null value of its column. Field names are prefixed with
+    `prefix`, so that rows of a related model can be filtered by them.
+    """
+
+    after = Q(pk__in=[])
+    equal = Q()
+    for (name, descending), value in zip(ordering, values):
+        name = f"{prefix}{name}"
+        if value is None:
+            beyond = Q(pk__in=[])
+        else:
+            lookup = "lt" if descending else "gt"
+            beyond = Q(**{f"{name}__{lookup}": value}) | Q(**{f"{name}__isnull": True})
+        after |= equal & beyond
+        equal &= Q(**{f"{name}__isnull": True}) if value is None else Q(**{name: value})
+    return after
+
+
+def get_page_size(first: Optional[int] = None) -> int:
+    """Gets the number of items of a page, capped at and defaulting to the
+    RELAY_CONNECTION_MAX_LIMIT setting"""
+
+    # Settings are looked up on every call as they are replaced when changed
+    max_limit = graphene_django_settings.graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+    if first is None:
+        return max_limit
+    if first < 0:
+        raise GraphQLError("Argument 'first' must be a non-negative integer")
+    return min(first, max_limit)
+
+
+def get_order_by(ordering: List[Tuple[str, bool]], prefix: str = "") -> List:
+    """Gets the order_by expressions of a keyset ordering, with nulls last"""
+
+    return [
+        (
+            F(f"{prefix}{name}").desc(nulls_last=True)
+            if descending
+            else F(f"{prefix}{name}").asc(nulls_last=True)
+        )
+        for name, descending in ordering
+    ]
+
+
+def filter_after(
+    queryset: QuerySet,
+    ordering: List[Tuple[str, bool]],
+    after: Optional[str],
+    prefix: str = "",
+) -> QuerySet:
+    """Filters a queryset for the rows positioned after a cursor, if any"""
+
+    if after is None:
+        return queryset
+    values = decode_cursor(after, len(ordering))
+    try:
+        return queryset.filter(_after_filter(ordering, values, prefix))
+    except (ValidationError, ValueError, TypeError):
+        raise GraphQLError("Invalid cursor")
+
+
+def make_connection(
+    nodes: List,
+    connection_type,
+    ordering: List[Tuple[str, bool]],
+    first: int,
+    after: Optional[str] = None,
+):
+    """Makes a connection of a page from its nodes and the node after it.
+
+    Args:
+        nodes: Up to `first + 1` nodes, the last of which is only fetched to
+            tell whether there is a next page.
+        connection_type: The graphene Connection type to return.
+        ordering: The keyset ordering the nodes were selected by.
+        first: The number of items of the page.
+        after: The cursor the page starts after.
+
+    Returns:
+        An instance of connection_type containing the page.
+    """
+
+    has_next_page = len(nodes) > first
+    nodes = nodes[:first]
+
+    edge_type = connection_type.Edge
+    edges = [
+        edge_type(
+            node=node,
+            cursor=encode_cursor([getattr(node, name) for name, _ in ordering]),
+        )
+        for node in nodes
+    ]
+    return connection_type(
+        edges=edges,
+        page_info=PageInfo(
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+            has_previous_page=after is not None,
+            has_next_page=has_next_page,
+        ),
+    )
+
+
+def paginate(
+    queryset: QuerySet,
+    connection_type,
+    first: Optional[int] = None,
+    after: Optional[str] = None,
+):
+    """Paginates a queryset into a connection using keyset pagination.
+
+    Instead of an OFFSET, the page is selected by filtering on the ordering
+    values encoded in the `after` cursor, so every page costs the same to
+    query regardless of its depth.
+
+    Args:
+        queryset: The queryset to paginate.
+        connection_type: The graphene Connection type to return.
+        first: The number of items to return, capped at and defaulting to
+            the RELAY_CONNECTION_MAX_LIMIT setting.
+        after: The cursor of the item after which to start.
+
+    Returns:
+        An instance of connection_type containing the page.
+    """
+
+    first = get_page_size(first)
+    ordering = parse_ordering(get_ordering(queryset))
+    queryset = queryset.order_by(*get_order_by(ordering))
+    queryset = filter_after(queryset, ordering, after)
+    nodes = list(queryset[: first + 1])
+    return make_connection(nodes, connection_type, ordering, first, after)
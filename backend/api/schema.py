@@ -1,16 +1,16 @@
-import json
-
 import graphene
 import graphql_jwt
 from django.dispatch import receiver
 from graphql_jwt.decorators import login_required, staff_member_required
 from graphql_jwt.refresh_token.signals import refresh_token_rotated
 
-from shows.models import Member, Show, Role
+from shows.models import Member, Show
 from users.models import User
 from .mutations import (
     CreateRoleMutation,
+    CreateRolesMutation,
     DeleteRoleMutation,
+    DeleteRolesMutation,
     LogoutUserMutation,
     SendPasswordResetEmailMutation,
     ResetPasswordMutation,
@@ -18,7 +18,20 @@ from .mutations import (
     UpdateProfileMutation,
     UpdatePasswordMutation,
 )
-from .types import UserType, MemberType, ShowType
+from .choices import get_choices_bundle
+from .filters import filter_shows
+from .optimizer import optimize_queryset
+from .pagination import KeysetConnectionField, paginate
+from .subscriptions import Subscription
+from .sync import get_show_changes
+from .types import (
+    UserType,
+    UserConnection,
+    MemberConnection,
+    ShowConnection,
+    ShowChangesType,
+)
+from .viewer import get_viewer
 
 
 @receiver(refresh_token_rotated)
@@ -26,14 +39,25 @@ def revoke_refresh_token(sender, request, refresh_token, **kwargs):
     refresh_token.revoke(request)
 
 
-def tuple_to_json(tuple_dict):
-    return json.dumps(dict((k, v) for k, v in tuple_dict))
-
-
 class Query(graphene.ObjectType):
-    users = graphene.List(UserType)
-    members = graphene.List(MemberType)
-    shows = graphene.List(ShowType)
+    users = KeysetConnectionField(UserConnection)
+    members = KeysetConnectionField(MemberConnection)
+    shows = KeysetConnectionField(
+        ShowConnection,
+        date_from=graphene.Date(),
+        date_to=graphene.Date(),
+        status=graphene.Int(),
+        priority=graphene.Int(),
+        is_open=graphene.Boolean(),
+        performer_id=graphene.ID(),
+        search=graphene.String(),
+    )
+    shows_changed_since = graphene.Field(
+        ShowChangesType,
+        required=True,
+        cursor=graphene.String(),
+        first=graphene.Int(),
+    )
     me = graphene.Field(UserType)
 
     school_choices = graphene.String()
@@ -46,45 +70,55 @@ class Query(graphene.ObjectType):
     @staticmethod
     @staff_member_required
     def resolve_users(root, info, **kwargs):
-        return User.objects.all()
+        queryset = optimize_queryset(User.objects.all(), info)
+        return paginate(queryset, UserConnection, **kwargs)
 
     @staticmethod
     @login_required
     def resolve_members(root, info, **kwargs):
-        return Member.objects.all()
+        queryset = optimize_queryset(Member.objects.all(), info)
+        return paginate(queryset, MemberConnection, **kwargs)
+
+    @staticmethod
+    def resolve_shows(root, info, first=None, after=None, **filters):
+        queryset = filter_shows(
+            Show.objects.filter(status__gt=Show.STATUSES.draft), **filters
+        )
+        queryset = optimize_queryset(queryset, info)
+        return paginate(queryset, ShowConnection, first=first, after=after)
 
     @staticmethod
-    def resolve_shows(root, info, **kwargs):
-        return Show.objects.filter(status__gt=Show.STATUSES.draft)
+    def resolve_shows_changed_since(root, info, cursor=None, first=None):
+        return get_show_changes(cursor, first)
 
     @staticmethod
     @login_required
     def resolve_me(root, info, **kwargs):
-        return User.objects.get(pk=info.context.user.pk)
+        return get_viewer(info)
 
     @staticmethod
     def resolve_school_choices(root, info, **kwargs):
-        return tuple_to_json(Member.SCHOOLS)
+        return get_choices_bundle().field_contents["school"]
 
     @staticmethod
     def resolve_class_year_choices(root, info, **kwargs):
-        return tuple_to_json(Member.CLASS_YEARS)
+        return get_choices_bundle().field_contents["classYear"]
 
     @staticmethod
     def resolve_position_choices(root, info, **kwargs):
-        return tuple_to_json(Member.POSITIONS)
+        return get_choices_bundle().field_contents["position"]
 
     @staticmethod
     def resolve_show_priority_choices(root, info, **kwargs):
-        return tuple_to_json(Show.PRIORITIES)
+        return get_choices_bundle().field_contents["showPriority"]
 
     @staticmethod
     def resolve_show_status_choices(root, info, **kwargs):
-        return tuple_to_json(Show.STATUSES)
+        return get_choices_bundle().field_contents["showStatus"]
 
     @staticmethod
     def resolve_performance_role_choices(root, info, **kwargs):
-        return tuple_to_json(Role.ROLES)
+        return get_choices_bundle().field_contents["performanceRole"]
 
 
 class Mutation(graphene.ObjectType):
@@ -96,6 +130,8 @@ class Mutation(graphene.ObjectType):
     register = RegisterMutation.Field()
     create_role = CreateRoleMutation.Field()
     delete_role = DeleteRoleMutation.Field()
+    create_roles = CreateRolesMutation.Field()
+    delete_roles = DeleteRolesMutation.Field()
     update_profile = UpdateProfileMutation.Field()
     update_password = UpdatePasswordMutation.Field()
 
@@ -104,4 +140,6 @@ class Mutation(graphene.ObjectType):
     reset_password = ResetPasswordMutation.Field()
 
 
-schema = graphene.Schema(query=Query, mutation=Mutation)  # noqa
+schema = graphene.Schema(
+    query=Query, mutation=Mutation, subscription=Subscription
+)  # noqa
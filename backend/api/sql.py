@@ -0,0 +1,77 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+from django.db import connection
+
+from .auth import authenticate_request
+
+SQL_HEADER = "HTTP_X_GRAPHQL_DEBUG_SQL"
+
+
+def find_duplicates(statements: Iterable[str]) -> List[Dict]:
+    """Finds the SQL statements executed more than once, most repeated first"""
+
+    return [
+        {"sql": sql, "count": count}
+        for sql, count in Counter(statements).most_common()
+        if count > 1
+    ]
+
+
+class QueryLog:
+    """The SQL queries executed by an operation.
+
+    Statements are recorded without their parameters, so that a statement
+    repeated for each item of a list is reported as duplicated.
+    """
+
+    def __init__(self, operation_name: Optional[str]):
+        self.operation_name = operation_name
+        self.statements = []
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.statements.append(sql)
+            self.duration += time.perf_counter() - start
+
+    @contextmanager
+    def record(self):
+        with connection.execute_wrapper(self):
+            yield self
+
+    def as_dict(self) -> Dict:
+        return {
+            "operationName": self.operation_name,
+            "count": len(self.statements),
+            "durationMs": round(self.duration * 1000, 3),
+            "duplicates": find_duplicates(self.statements),
+        }
+
+
+def sql_requested(request) -> bool:
+    """Whether a request asks for the SQL queries of its operations, and its
+    user may see them.
+
+    Requests from other users asking for them are served like any other, from
+    the response cache where possible, without recording their queries.
+    """
+
+    return bool(getattr(request, "META", {}).get(SQL_HEADER)) and can_view_sql(request)
+
+
+def can_view_sql(request) -> bool:
+    """Whether the user of a request may see the SQL queries of operations.
+
+    The token of the request, if any, is authenticated first, which is done
+    once per request, so that staff members using tokens may see them too.
+    """
+
+    authenticate_request(request)
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_staff)
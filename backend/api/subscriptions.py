@@ -0,0 +1,56 @@
+import graphene
+
+from shows.events import ROSTER_CHANGED, SHOW_UPDATED
+from shows.models import Show
+from .loaders import get_loaders
+from .types import MemberType, ShowType
+
+
+class RosterChangeType(graphene.ObjectType):
+    """A member joining or leaving the roster of a show"""
+
+    show = graphene.Field(ShowType)
+    member = graphene.Field(MemberType)
+    joined = graphene.Boolean()
+
+    def resolve_show(self, info):
+        return get_loaders(info).show.load(self.show_id)
+
+    def resolve_member(self, info):
+        return get_loaders(info).member.load(self.member_id)
+
+
+def _is_published(show_id) -> bool:
+    return Show.objects.filter(pk=show_id, status__gt=Show.STATUSES.draft).exists()
+
+
+class Subscription(graphene.ObjectType):
+    """Changes to shows, pushed to WebSocket connections.
+
+    Each resolver returns an observable of the events delivered to the
+    connection, so that every event resolves the selections of the
+    subscription once.
+    """
+
+    show_updated = graphene.Field(ShowType, id=graphene.ID(required=True))
+    roster_changed = graphene.Field(RosterChangeType)
+
+    @staticmethod
+    def resolve_show_updated(root, info, id):
+        return (
+            info.context.events.filter(
+                lambda event: event.kind == SHOW_UPDATED and str(event.show_id) == id
+            )
+            .map(
+                lambda event: Show.objects.filter(
+                    pk=event.show_id, status__gt=Show.STATUSES.draft
+                ).first()
+            )
+            .filter(lambda show: show is not None)
+        )
+
+    @staticmethod
+    def resolve_roster_changed(root, info):
+        return info.context.events.filter(
+            lambda event: event.kind == ROSTER_CHANGED and _is_published(event.show_id)
+        )
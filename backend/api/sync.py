@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from graphql import GraphQLError
+
+from shows.models import Show, ShowTombstone, get_tombstone_retention
+from .pagination import decode_cursor, encode_cursor, get_page_size
+
+# Changes committed by transactions that started before a sync may be stamped
+# slightly before its cursor, so each sync looks back this far before it
+SYNC_OVERLAP = timedelta(seconds=5)
+
+SYNC_CURSOR_EXPIRED = "SYNC_CURSOR_EXPIRED"
+
+
+class SyncCursorExpiredError(GraphQLError):
+    """A sync cursor predates the tombstones kept, so a full sync is needed"""
+
+    def __init__(self):
+        super().__init__("Cursor expired", extensions={"code": SYNC_CURSOR_EXPIRED})
+
+
+class ShowChanges(NamedTuple):
+    """A page of the shows changed since a sync cursor, and the next cursor"""
+
+    shows: QuerySet
+    deleted_ids: List[int]
+    has_more: bool
+    cursor: str
+
+
+def encode_sync_cursor(
+    since: datetime,
+    after_id: Optional[int] = None,
+    started_at: Optional[datetime] = None,
+) -> str:
+    """Encodes a sync cursor.
+
+    A cursor returned by the last page of a sync holds only the time to get
+    changes since. The cursors of the other pages also hold the ID of the
+    last show returned, and the time the sync started.
+    """
+
+    return encode_cursor(
+        [
+            since.isoformat(),
+            after_id,
+            started_at.isoformat() if started_at is not None else None,
+        ]
+    )
+
+
+def _parse_timestamp(value) -> datetime:
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise GraphQLError("Invalid cursor")
+    if timezone.is_naive(timestamp):
+        raise GraphQLError("Invalid cursor")
+    return timestamp
+
+
+def decode_sync_cursor(
+    cursor: str,
+) -> Tuple[datetime, Optional[int], Optional[datetime]]:
+    since, after_id, started_at = decode_cursor(cursor, 3)
+    if (after_id is None) != (started_at is None):
+        raise GraphQLError("Invalid cursor")
+    if after_id is not None:
+        try:
+            after_id = int(after_id)
+        except ValueError:
+            raise GraphQLError("Invalid cursor")
+        started_at = _parse_timestamp(started_at)
+    return _parse_timestamp(since), after_id, started_at
+
+
+def get_show_changes(
+    cursor: Optional[str] = None, first: Optional[int] = None
+) -> ShowChanges:
+    """Gets a page of the changes to the published shows since a sync.
+
+    A show is changed when it, one of its rounds or roles, or its contact is
+    saved. Changed shows are paged in the order of their last change, and
+    shows deleted or returned to draft since the sync are reported by ID on
+    the first page only, so that clients can drop them from their copy before
+    applying the pages.
+
+    Args:
+        cursor: The cursor returned by the previous page or sync, or None to
+            start a sync of every published show.
+        first: The number of shows of the page, capped at and defaulting to
+            the RELAY_CONNECTION_MAX_LIMIT setting.
+
+    Returns:
+        The changed shows, the IDs of the removed shows, whether more pages
+        follow, and the cursor to pass to the next page or sync.
+
+    Raises:
+        SyncCursorExpiredError: If the sync the cursor was returned by is
+            older than the SHOW_TOMBSTONE_RETENTION setting, so removed shows
+            may be missing and the client must sync again without a cursor.
+    """
+
+    first = get_page_size(first)
+    shows = Show.objects.filter(status__gt=Show.STATUSES.draft)
+    deleted_ids = []
+    if cursor is None:
+        started_at = timezone.now() - SYNC_OVERLAP
+    else:
+        since, after_id, started_at = decode_sync_cursor(cursor)
+        if started_at is None:
+            started_at = timezone.now() - SYNC_OVERLAP
+            if since < timezone.now() - get_tombstone_retention():
+                raise SyncCursorExpiredError()
+            deleted_ids = sorted(
+                set(
+                    ShowTombstone.objects.filter(deleted_at__gt=since).values_list(
+                        "show_id", flat=True
+                    )
+                )
+            )
+        after = Q(updated_at__gt=since)
+        if after_id is not None:
+            after |= Q(updated_at=since, pk__gt=after_id)
+        shows = shows.filter(after)
+
+    page = list(
+        shows.order_by("updated_at", "pk").values_list("pk", "updated_at")[: first + 1]
+    )
+    has_more = len(page) > first
+    page = page[:first]
+    if has_more:
+        last_id, last_updated_at = page[-1]
+        next_cursor = encode_sync_cursor(last_updated_at, last_id, started_at)
+    else:
+        next_cursor = encode_sync_cursor(started_at)
+
+    shows = Show.objects.filter(pk__in=[pk for pk, _ in page]).order_by(
+        "updated_at", "pk"
+    )
+    return ShowChanges(shows, deleted_ids, has_more, next_cursor)
@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from faker import Faker
+
+from common.side_effects import (
+    run_side_effects,
+    schedule_side_effects,
+    wait_for_side_effects,
+)
+from shows.models import Show
+from shows.tests.utils import fake_show_data
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+PASSWORD_RESET_MUTATION = """
+    mutation PasswordReset($email: String!) {
+        sendPasswordResetEmail(email: $email) { success }
+    }
+"""
+
+CREATE_ROLE_MUTATION = """
+    mutation CreateRole($showId: ID!) {
+        createRole(showId: $showId) { role { id } }
+    }
+"""
+
+
+@override_settings(ROOT_URLCONF="core.asgi_urls")
+class TestAsyncGraphQLView(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        faker = Faker()
+        Faker.seed(0)
+
+        self.user = User.objects.create(**fake_user_data(faker))
+        self.show = Show.objects.create(
+            **fake_show_data(faker), status=Show.STATUSES.published
+        )
+        self.async_client.force_login(self.user)
+        mail.outbox = []
+
+    async def execute_async(self, query, variables):
+        response = await self.async_client.post(
+            "/graphql/",
+            {"query": query, "variables": variables},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    async def test_emails_are_sent_after_the_response(self):
+        with patch("api.views.schedule_side_effects") as mock_schedule:
+            result = await self.execute_async(
+                PASSWORD_RESET_MUTATION, {"email": self.user.email}
+            )
+        self.assertTrue(result["data"]["sendPasswordResetEmail"]["success"])
+        self.assertEqual(mail.outbox, [])
+
+        (side_effects,), _ = mock_schedule.call_args
+        schedule_side_effects(side_effects)
+        await wait_for_side_effects()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+
+    async def test_slack_invites_are_sent_after_the_response(self):
+        with patch("api.views.schedule_side_effects") as mock_schedule:
+            result = await self.execute_async(
+                CREATE_ROLE_MUTATION, {"showId": self.show.id}
+            )
+        self.assertIsNotNone(result["data"]["createRole"]["role"]["id"])
+        self.mock_invite_users_to_channel.assert_not_called()
+
+        (side_effects,), _ = mock_schedule.call_args
+        await sync_to_async(run_side_effects)(side_effects)
+        self.mock_invite_users_to_channel.assert_called_once()
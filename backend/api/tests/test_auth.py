@@ -0,0 +1,102 @@
+import json
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from faker import Faker
+from graphql_jwt.shortcuts import get_token
+from graphql_jwt.utils import get_payload
+
+from api.auth import token_cache
+from api.tests.utils import bulk_create_shows, execute_query
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+ME_QUERY = "query Me { me { id member { id } } }"
+SHOWS_QUERY = """
+    query Shows {
+        shows { edges { node { id name point { user { id } } } } }
+        me { id }
+    }
+"""
+
+
+class TestJSONWebTokenMiddleware(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+
+        faker = Faker()
+        Faker.seed(0)
+
+        self.user = User.objects.create(**fake_user_data(faker))
+        bulk_create_shows(faker, 5, [self.user.member])
+        self.token = get_token(self.user)
+
+    def execute(self, query, token=None):
+        return execute_query(
+            self.client, query, HTTP_AUTHORIZATION=f"JWT {token or self.token}"
+        )
+
+    def post_batch(self, operations, token=None):
+        return self.client.post(
+            "/graphql/",
+            json.dumps(operations),
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"JWT {token or self.token}",
+        ).json()
+
+    def test_token_is_verified_once_per_request(self):
+        with patch("api.auth.get_payload", wraps=get_payload) as mock_get_payload:
+            results = self.post_batch([{"query": SHOWS_QUERY}, {"query": ME_QUERY}])
+        mock_get_payload.assert_called_once()
+        for result in results:
+            self.assertEqual(result["data"]["me"]["id"], str(self.user.pk))
+
+    def test_invalid_token_is_verified_once_per_request(self):
+        with patch("api.auth.get_payload", wraps=get_payload) as mock_get_payload:
+            result = self.execute(SHOWS_QUERY, token="invalid")
+        mock_get_payload.assert_called_once()
+        self.assertEqual(
+            [error["path"] for error in result["errors"]], [["shows"], ["me"]]
+        )
+        self.assertEqual(result["errors"][0]["message"], "Error decoding signature")
+
+    def test_tokens_are_verified_for_every_request_by_default(self):
+        with patch("api.auth.get_payload", wraps=get_payload) as mock_get_payload:
+            self.execute(ME_QUERY)
+            self.execute(ME_QUERY)
+        self.assertEqual(mock_get_payload.call_count, 2)
+
+    @override_settings(GRAPHQL_TOKEN_CACHE_TIMEOUT=30)
+    def test_cached_tokens_are_not_verified_again(self):
+        with patch("api.auth.get_payload", wraps=get_payload) as mock_get_payload:
+            self.execute(ME_QUERY)
+            # Only the viewer is queried for a cached token
+            with self.assertNumQueries(1):
+                result = self.execute(ME_QUERY)
+        mock_get_payload.assert_called_once()
+        self.assertEqual(result["data"]["me"]["member"]["id"], str(self.user.member.pk))
+
+    @override_settings(GRAPHQL_TOKEN_CACHE_TIMEOUT=30)
+    def test_cached_tokens_are_revoked(self):
+        self.execute(ME_QUERY)
+        self.user.save()
+        self.assertIsNone(token_cache.get(self.token))
+
+        self.execute(ME_QUERY)
+        # Users deactivated without signals are still rejected
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        result = self.execute(ME_QUERY)
+        self.assertEqual(result["errors"][0]["message"], "User is disabled")
+        self.assertIsNone(token_cache.get(self.token))
+
+    @override_settings(GRAPHQL_TOKEN_CACHE_TIMEOUT=30, GRAPHQL_TOKEN_CACHE_SIZE=1)
+    def test_token_cache_is_bounded(self):
+        other_user = User.objects.create(**fake_user_data(Faker()))
+        self.execute(ME_QUERY)
+        self.execute(ME_QUERY, token=get_token(other_user))
+        self.assertIsNone(token_cache.get(self.token))
+        self.assertEqual(token_cache.get(get_token(other_user)), other_user.pk)
@@ -0,0 +1,85 @@
+import json
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from faker import Faker
+from graphql_jwt.shortcuts import get_token
+
+from api.tests.utils import bulk_create_shows, get_nodes
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+ME_QUERY = "query Me { me { id } }"
+SHOWS_QUERY = "query Shows { shows { edges { node { id } } } }"
+CHOICES_QUERY = "query Choices { showStatusChoices }"
+
+
+class TestBatchedOperations(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        faker = Faker()
+        Faker.seed(0)
+
+        self.user = User.objects.create(**fake_user_data(faker))
+        self.shows = bulk_create_shows(faker, 3, [self.user.member])
+        self.token = get_token(self.user)
+
+    def post_batch(self, operations, **extra):
+        return self.client.post(
+            "/graphql/",
+            json.dumps(operations),
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"JWT {self.token}",
+            **extra,
+        )
+
+    def test_results_are_returned_in_order(self):
+        response = self.post_batch(
+            [
+                {"id": 1, "query": ME_QUERY},
+                {"id": 2, "query": SHOWS_QUERY},
+                {"id": 3, "query": CHOICES_QUERY},
+                {"id": 4, "query": "{ notAField }"},
+            ]
+        )
+        self.assertEqual(response.status_code, 400)
+        results = response.json()
+        self.assertEqual([result["id"] for result in results], [1, 2, 3, 4])
+        self.assertEqual([result["status"] for result in results], [200] * 3 + [400])
+        self.assertEqual(results[0]["data"]["me"]["id"], str(self.user.id))
+        self.assertEqual(len(get_nodes(results[1]["data"]["shows"])), 3)
+        self.assertIn("showStatusChoices", results[2]["data"])
+        self.assertIn("errors", results[3])
+
+    def test_operations_share_authentication(self):
+        # The viewer is fetched for the token once, and shared by each query
+        with self.assertNumQueries(1):
+            response = self.post_batch([{"query": ME_QUERY}, {"query": ME_QUERY}])
+        for result in response.json():
+            self.assertEqual(result["data"]["me"]["id"], str(self.user.id))
+
+    def test_mutations_clear_loaders(self):
+        mutation = (
+            "mutation { createRole(showId: %d) { role { id } } }" % self.shows[0].id
+        )
+        with patch("api.views.clear_loaders") as clear_loaders:
+            self.post_batch([{"query": SHOWS_QUERY}, {"query": mutation}])
+        clear_loaders.assert_called_once()
+
+    def test_single_operations_are_not_batched(self):
+        response = self.post_batch({"query": CHOICES_QUERY})
+        self.assertIn("showStatusChoices", response.json()["data"])
+
+    @override_settings(GRAPHQL_MAX_BATCH_SIZE=2)
+    def test_invalid_batches(self):
+        for operations in [
+            [{"query": CHOICES_QUERY}] * 3,
+            [{"query": CHOICES_QUERY}, CHOICES_QUERY],
+            [],
+        ]:
+            response = self.post_batch(operations)
+            self.assertEqual(response.status_code, 400)
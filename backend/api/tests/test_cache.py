@@ -0,0 +1,246 @@
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from faker import Faker
+from graphql.language.parser import parse
+from graphql_jwt.shortcuts import get_token
+
+from api import cache as response_cache
+from api.documents import get_document_backend
+from api.tests.utils import GET_SHOWS_QUERY, bulk_create_shows, get_nodes
+from api.views import CACHE_STATUS_HEADER
+from shows.cache import get_shows_version
+from shows.models import Contact, Member, Role, Round, Show, ShowsVersion
+from slack.tests.utils import PatchSlackBossMixin, fake_slack_id
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+
+class TestResponseCache(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+        self.faker = Faker()
+        Faker.seed(0)
+        self.mock_fetch_user.side_effect = lambda **kwargs: fake_slack_id(self.faker)
+
+        self.user, self.other_user = [
+            User.objects.create(**data) for data in fake_user_data(self.faker, 2)
+        ]
+        self.contact = Contact.objects.create(first_name="Tom", last_name="Hanks")
+        self.shows = bulk_create_shows(self.faker, 5, [self.user.member], self.contact)
+
+    def post(self, query=GET_SHOWS_QUERY, variables=None, **extra):
+        body = {"query": query}
+        if variables is not None:
+            body["variables"] = variables
+        return self.client.post(
+            "/graphql/", body, content_type="application/json", **extra
+        )
+
+    def assertCacheStatus(self, status, query=GET_SHOWS_QUERY, **kwargs):
+        response = self.post(query, **kwargs)
+        self.assertEqual(response.get(CACHE_STATUS_HEADER), status)
+        return response
+
+    def test_repeated_query_is_served_from_cache(self):
+        first = self.assertCacheStatus("miss")
+        # Only the version of show data is read from the database
+        with self.assertNumQueries(1):
+            second = self.assertCacheStatus("hit")
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(len(get_nodes(second.json()["data"]["shows"])), 5)
+
+        stats = response_cache.get_stats()
+        self.assertGreaterEqual(stats["hits"], 1)
+        self.assertGreaterEqual(stats["misses"], 1)
+
+    def test_documents_are_parsed_once(self):
+        get_document_backend().documents.clear()
+        with patch("api.documents.parse", wraps=parse) as mock_parse:
+            self.assertCacheStatus("miss", GET_SHOWS_QUERY)
+            self.assertCacheStatus("hit", GET_SHOWS_QUERY)
+            self.assertEqual(mock_parse.call_count, 1)
+
+            # Queries whose responses are not cached are not keyed
+            self.assertCacheStatus(None, "query Me { me { id } }")
+            self.assertCacheStatus(None, "query Me { me { id } }")
+            self.assertEqual(mock_parse.call_count, 2)
+
+    def test_variables_and_viewer_class_are_keyed(self):
+        self.assertCacheStatus("miss", variables={"first": 2})
+        self.assertCacheStatus("hit", variables={"first": 2})
+        self.assertCacheStatus("miss", variables={"first": 3})
+
+        token = get_token(self.user)
+        self.assertCacheStatus(
+            "miss", variables={"first": 2}, HTTP_AUTHORIZATION=f"JWT {token}"
+        )
+        token = get_token(self.other_user)
+        self.assertCacheStatus(
+            "hit", variables={"first": 2}, HTTP_AUTHORIZATION=f"JWT {token}"
+        )
+
+    def test_invalid_token_is_not_cached(self):
+        self.assertCacheStatus(None, HTTP_AUTHORIZATION="JWT invalid")
+
+    def test_uncached_operations(self):
+        self.client.force_login(self.user)
+        for query in [
+            "query { me { id } }",
+            "query { shows { edges { node { id } } } me { id } }",
+            'mutation { verifyToken(token: "invalid") { payload } }',
+            "query { shows { edges { node { id } } } ",
+        ]:
+            self.assertCacheStatus(None, query)
+            self.assertCacheStatus(None, query)
+
+    def test_errors_are_not_cached(self):
+        self.assertCacheStatus("miss", variables={"first": -1})
+        self.assertCacheStatus("miss", variables={"first": -1})
+
+    def test_model_changes_invalidate_cache(self):
+        show = self.shows[0]
+        changes = [
+            lambda: show.save(),
+            lambda: Round.objects.create(show=show, time=datetime.time(23, 59)),
+            lambda: Role.objects.create(show=show, performer=self.other_user.member),
+            lambda: Role.objects.filter(performer=self.other_user.member).delete(),
+            lambda: show.performers.add(self.other_user.member),
+            lambda: self.contact.save(),
+            lambda: self.user.member.save(),
+            lambda: self.other_user.save(),
+            lambda: self.shows[1].delete(),
+        ]
+        self.assertCacheStatus("miss")
+        for change in changes:
+            self.assertCacheStatus("hit")
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            self.assertCacheStatus("miss")
+
+        shows = get_nodes(self.post().json()["data"]["shows"])
+        self.assertEqual(len(shows), 4)
+
+    def test_cache_is_invalidated_on_commit(self):
+        version = get_shows_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.shows[0].save()
+            Role.objects.create_for_shows(self.other_user.member, [self.shows[1].pk])
+            # Responses missing the cache before the commit are stored under
+            # the version they are invalidated by
+            self.assertEqual(get_shows_version(), version)
+            self.assertCacheStatus("miss")
+        self.assertCacheStatus("hit")
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_shows_version(), version)
+        self.assertCacheStatus("miss")
+
+
+class TestConditionalRequests(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+        self.faker = Faker()
+        Faker.seed(0)
+
+        self.user = User.objects.create(**fake_user_data(self.faker))
+        self.shows = bulk_create_shows(self.faker, 3, [self.user.member])
+
+    def get(self, query=GET_SHOWS_QUERY, **extra):
+        return self.client.get("/graphql/", {"query": query}, **extra)
+
+    def test_unchanged_response_is_not_modified(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        with self.assertNumQueries(1):
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_changes_modify_response(self):
+        etag = self.get()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.shows[0].save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_performer_changes_modify_response(self):
+        etag = self.get()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "Renamed"
+            self.user.save()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.get()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.member.position = Member.POSITIONS.president
+            self.user.member.save()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_changes_by_other_processes_modify_response(self):
+        etag = self.get()["ETag"]
+        # Changes made by another process, whose responses are cached
+        # elsewhere, only bump the version persisted in the database
+        Show.objects.filter(pk=self.shows[0].pk).update(name="Renamed show")
+        ShowsVersion.objects.bump()
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response[CACHE_STATUS_HEADER], "miss")
+        self.assertIn("Renamed show", response.content.decode())
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+    def test_etag_is_keyed_by_query(self):
+        etag = self.get()["ETag"]
+        response = self.get(
+            "query { shows { edges { node { id } } } }", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_uncacheable_responses_are_not_tagged(self):
+        self.client.force_login(self.user)
+        self.assertFalse(self.get("query { me { id } }").has_header("ETag"))
+        self.assertFalse(
+            self.client.get(
+                "/graphql/", {"query": GET_SHOWS_QUERY, "variables": '{"first": -1}'}
+            ).has_header("ETag")
+        )
+        self.assertFalse(
+            self.client.post(
+                "/graphql/", {"query": GET_SHOWS_QUERY}, content_type="application/json"
+            ).has_header("ETag")
+        )
+
+    def test_viewer_fields_are_keyed_by_viewer(self):
+        query = "query { shows { edges { node { id viewerIsPerformer } } } }"
+        other_user = User.objects.create(**fake_user_data(self.faker))
+        self.client.force_login(self.user)
+        response = self.get(query)
+        self.assertEqual(response["X-Response-Cache"], "miss")
+        self.assertEqual(self.get(query)["X-Response-Cache"], "hit")
+        self.assertTrue(
+            get_nodes(response.json()["data"]["shows"])[0]["viewerIsPerformer"]
+        )
+
+        self.client.force_login(other_user)
+        response = self.get(query, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Response-Cache"], "miss")
+        self.assertFalse(
+            get_nodes(response.json()["data"]["shows"])[0]["viewerIsPerformer"]
+        )
@@ -0,0 +1,41 @@
+from django.test import TestCase
+
+from api.choices import get_choices_bundle
+from api.tests.utils import execute_query
+from shows.models import Member, Show, Role
+
+
+class TestChoices(TestCase):
+    def test_choices_endpoint(self):
+        response = self.client.get("/api/choices/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], get_choices_bundle().etag)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        choices = response.json()
+        self.assertEqual(choices["school"]["1"], Member.SCHOOLS[1])
+        self.assertEqual(choices["showStatus"]["2"], Show.STATUSES[2])
+        self.assertEqual(len(choices["performanceRole"]), len(Role.ROLES))
+
+    def test_conditional_get(self):
+        etag = self.client.get("/api/choices/")["ETag"]
+        response = self.client.get("/api/choices/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        response = self.client.get("/api/choices/", HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_bundle_is_computed_once(self):
+        self.assertIs(get_choices_bundle(), get_choices_bundle())
+
+    def test_choices_fields(self):
+        result = execute_query(self.client, "{ positionChoices showPriorityChoices }")
+        bundle = get_choices_bundle()
+        self.assertEqual(
+            result["data"]["positionChoices"], bundle.field_contents["position"]
+        )
+        self.assertEqual(
+            result["data"]["showPriorityChoices"],
+            bundle.field_contents["showPriority"],
+        )
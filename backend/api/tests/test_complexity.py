@@ -0,0 +1,98 @@
+from django.test import TestCase, override_settings
+from graphql.language.parser import parse
+
+from api.complexity import analyze_query
+from api.schema import schema
+from api.tests.utils import GET_SHOWS_QUERY, execute_query
+
+NESTED_MEMBERS_QUERY = """
+    query NestedMembers($first: Int) {
+        members {
+            edges {
+                node {
+                    performedShows(first: $first) {
+                        edges {
+                            node {
+                                performers {
+                                    performedShows(first: $first) {
+                                        edges { node { id } }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+def analyze(query, variables=None, operation_name=None):
+    return analyze_query(schema, parse(query), operation_name, variables)
+
+
+class TestQueryComplexity(TestCase):
+    def test_scalar_fields_cost_nothing(self):
+        complexity = analyze("{ showStatusChoices positionChoices }")
+        self.assertEqual((complexity.depth, complexity.cost), (1, 0))
+
+    def test_connections_cost_their_page_size(self):
+        query = "query ($first: Int) { shows(first: $first) { edges { node { id } } } }"
+        # The show connection, its edge and its node for each show
+        self.assertEqual(analyze(query, {"first": 5}).cost, 5 * 3)
+        self.assertEqual(analyze(query, {"first": 5}).depth, 2)
+        self.assertEqual(analyze(query).cost, 100 * 3)
+
+    def test_lists_cost_estimated_size(self):
+        query = "{ shows(first: 1) { edges { node { rounds { id } } } } }"
+        self.assertEqual(analyze(query).cost, 3 + 10)
+        with self.settings(GRAPHQL_LIST_SIZE_ESTIMATE=2):
+            self.assertEqual(analyze(query).cost, 3 + 2)
+
+    def test_fragments_are_counted(self):
+        query = """
+            query { shows(first: 1) { edges { node { ...Show } } } }
+            fragment Show on ShowType { point { user { id } } }
+        """
+        complexity = analyze(query)
+        self.assertEqual((complexity.depth, complexity.cost), (4, 3 + 2))
+
+    def test_nested_connections_multiply(self):
+        complexity = analyze(NESTED_MEMBERS_QUERY, {"first": 2})
+        self.assertEqual(complexity.depth, 5)
+        self.assertEqual(complexity.cost, 100 * (3 + 2 * (3 + 10 * (1 + 2 * 3))))
+
+    def test_operation_is_selected_by_name(self):
+        query = "query A { me { id } } query B { showStatusChoices }"
+        self.assertEqual(analyze(query, operation_name="A").cost, 1)
+        self.assertEqual(analyze(query, operation_name="B").cost, 0)
+        self.assertIsNone(analyze(query))
+
+
+class TestComplexityLimits(TestCase):
+    def test_cost_is_reported(self):
+        result = execute_query(self.client, GET_SHOWS_QUERY, {"first": 1})
+        self.assertNotIn("errors", result)
+        complexity = result["extensions"]["complexity"]
+        self.assertEqual(complexity["depth"], 4)
+        self.assertGreater(complexity["cost"], 0)
+
+    @override_settings(GRAPHQL_MAX_COST=1000)
+    def test_costly_operations_are_rejected(self):
+        response = self.client.post(
+            "/graphql/",
+            {"query": NESTED_MEMBERS_QUERY, "variables": {"first": 20}},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        result = response.json()
+        self.assertNotIn("data", result)
+        self.assertIn("cost", result["errors"][0]["message"])
+        self.assertEqual(result["errors"][0]["extensions"]["code"], "QUERY_TOO_COMPLEX")
+        self.assertGreater(result["extensions"]["complexity"]["cost"], 1000)
+
+    @override_settings(GRAPHQL_MAX_DEPTH=4)
+    def test_deep_operations_are_rejected(self):
+        result = execute_query(self.client, NESTED_MEMBERS_QUERY, {"first": 1})
+        self.assertIn("depth of 5", result["errors"][0]["message"])
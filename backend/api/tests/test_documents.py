@@ -0,0 +1,132 @@
+import json
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from api import documents
+from api.documents import LRUCache, get_document_backend, hash_query, load_manifest
+from api.tests.utils import execute_query
+
+QUERY = "query Choices { showStatusChoices }"
+
+
+class TestPersistedQueries(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = get_document_backend()
+        self.backend.documents.clear()
+
+    def execute_persisted(self, query_hash, query=None, **extra):
+        extensions = {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}
+        body = {"extensions": extensions}
+        if query is not None:
+            body["query"] = query
+        return self.client.post(
+            "/graphql/", json.dumps(body), content_type="application/json", **extra
+        )
+
+    def test_unknown_hash_is_not_found(self):
+        response = self.execute_persisted(hash_query(QUERY))
+        self.assertEqual(response.status_code, 200)
+        error = response.json()["errors"][0]
+        self.assertEqual(error["message"], "PersistedQueryNotFound")
+        self.assertEqual(error["extensions"]["code"], "PERSISTED_QUERY_NOT_FOUND")
+
+    def test_registered_hash_skips_parsing_and_validation(self):
+        query_hash = hash_query(QUERY)
+        response = self.execute_persisted(query_hash, QUERY)
+        self.assertIn("showStatusChoices", response.json()["data"])
+
+        with patch.object(documents, "parse") as parse, patch.object(
+            documents, "validate"
+        ) as validate:
+            response = self.execute_persisted(query_hash)
+            self.assertIn("showStatusChoices", response.json()["data"])
+            result = execute_query(self.client, QUERY)
+            self.assertIn("showStatusChoices", result["data"])
+        parse.assert_not_called()
+        validate.assert_not_called()
+
+    def test_hash_mismatch(self):
+        response = self.execute_persisted(hash_query("{ me { id } }"), QUERY)
+        self.assertEqual(response.status_code, 400)
+        error = response.json()["errors"][0]
+        self.assertEqual(error["extensions"]["code"], "PERSISTED_QUERY_HASH_MISMATCH")
+
+    def test_validation_errors_are_kept(self):
+        for _ in range(2):
+            result = execute_query(self.client, "{ notAField }")
+            self.assertIn("notAField", result["errors"][0]["message"])
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_ONLY=True)
+    def test_allow_list_mode(self):
+        query_hash = hash_query(QUERY)
+        response = self.execute_persisted(query_hash, QUERY)
+        self.assertEqual(response.status_code, 400)
+        error = response.json()["errors"][0]
+        self.assertEqual(error["extensions"]["code"], "PERSISTED_QUERY_NOT_REGISTERED")
+        self.assertIn("errors", execute_query(self.client, QUERY))
+
+        with patch.dict(self.backend.registered, {query_hash: QUERY}):
+            response = self.execute_persisted(query_hash)
+            self.assertIn("showStatusChoices", response.json()["data"])
+            self.assertNotIn("errors", execute_query(self.client, QUERY))
+            self.assertIn("errors", execute_query(self.client, "{ me { id } }"))
+
+
+class TestDocumentStore(TestCase):
+    def test_lru_cache_evicts_least_recently_used(self):
+        lru = LRUCache(2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        self.assertEqual(lru.get("a"), 1)
+        lru.set("c", 3)
+        self.assertEqual(len(lru), 2)
+        self.assertNotIn("b", lru)
+        self.assertEqual(lru.get("a"), 1)
+        self.assertEqual(lru.get("c"), 3)
+
+    def test_load_manifest(self):
+        self.assertEqual(load_manifest(None), {})
+        for queries in [[QUERY], {hash_query(QUERY): QUERY}]:
+            with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+                json.dump(queries, f)
+                f.flush()
+                self.assertEqual(load_manifest(f.name), {hash_query(QUERY): QUERY})
+
+
+class TestDocumentStats(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = get_document_backend()
+        self.backend.documents.clear()
+        self.backend.stats.reset()
+
+    def get_timed_phases(self, query):
+        response = self.client.post(
+            "/graphql/", {"query": query}, content_type="application/json"
+        )
+        return [
+            timing.split(";")[0] for timing in response["Server-Timing"].split(", ")
+        ]
+
+    def test_phase_timings(self):
+        self.assertEqual(self.get_timed_phases(QUERY), ["parse", "validate", "execute"])
+        self.assertEqual(self.get_timed_phases(QUERY), ["execute"])
+        self.assertEqual(self.get_timed_phases("{ notAField }"), ["parse", "validate"])
+
+        stats = self.backend.stats.as_dict()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertAlmostEqual(stats["hit_ratio"], 1 / 3)
+        self.assertEqual(stats["phases"]["parse"]["count"], 2)
+        self.assertEqual(stats["phases"]["execute"]["count"], 2)
+        self.assertGreater(stats["phases"]["execute"]["mean_ms"], 0)
+
+    @override_settings(GRAPHQL_DOCUMENT_STATS_LOG_INTERVAL=2)
+    def test_stats_are_logged(self):
+        with self.assertLogs("api.documents", "INFO") as logs:
+            for _ in range(2):
+                execute_query(self.client, QUERY)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("'hit_ratio': 0.5", logs.output[0])
@@ -0,0 +1,100 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from faker import Faker
+
+from api.tests.utils import bulk_create_shows, execute_query, get_nodes
+from shows.models import Show
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+FILTERED_SHOWS_QUERY = """
+    query FilteredShows(
+        $dateFrom: Date
+        $dateTo: Date
+        $status: Int
+        $priority: Int
+        $isOpen: Boolean
+        $performerId: ID
+        $search: String
+    ) {
+        shows(
+            dateFrom: $dateFrom
+            dateTo: $dateTo
+            status: $status
+            priority: $priority
+            isOpen: $isOpen
+            performerId: $performerId
+            search: $search
+        ) {
+            edges { node { id } }
+        }
+    }
+"""
+
+
+class TestShowsFilters(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        faker = Faker()
+        Faker.seed(0)
+
+        users = [User.objects.create(**data) for data in fake_user_data(faker, 2)]
+        self.member, self.other_member = [user.member for user in users]
+
+        self.shows = bulk_create_shows(faker, 6, [self.other_member])
+        Show.objects.bulk_create(
+            [Show(name="Draft show", date=datetime.date(2023, 1, 10))]
+        )
+        for i, show in enumerate(self.shows):
+            show.date = datetime.date(2023, 1, 1) + datetime.timedelta(weeks=i)
+            show.name = f"Show {i}"
+            show.address = "Lerner Hall" if i % 2 else "Low Library"
+            show.priority = Show.PRIORITIES.urgent if i < 2 else show.priority
+            show.status = Show.STATUSES.closed if i == 5 else show.status
+        Show.objects.bulk_update(
+            self.shows, ["date", "name", "address", "priority", "status"]
+        )
+        self.shows[3].performers.add(self.member)
+
+    def filter_ids(self, **variables):
+        result = execute_query(self.client, FILTERED_SHOWS_QUERY, variables)
+        self.assertNotIn("errors", result)
+        return [node["id"] for node in get_nodes(result["data"]["shows"])]
+
+    def ids(self, *indices):
+        return [str(self.shows[i].id) for i in indices]
+
+    def test_no_filters_excludes_drafts(self):
+        self.assertEqual(self.filter_ids(), self.ids(0, 1, 2, 3, 4, 5))
+
+    def test_date_window(self):
+        ids = self.filter_ids(dateFrom="2023-01-08", dateTo="2023-01-22")
+        self.assertEqual(ids, self.ids(1, 2, 3))
+        self.assertEqual(self.filter_ids(dateFrom="2023-01-29"), self.ids(4, 5))
+        self.assertEqual(self.filter_ids(dateTo="2023-01-01"), self.ids(0))
+
+    def test_status_and_is_open(self):
+        self.assertEqual(self.filter_ids(status=Show.STATUSES.closed), self.ids(5))
+        self.assertEqual(self.filter_ids(isOpen=False), self.ids(5))
+        self.assertEqual(self.filter_ids(isOpen=True), self.ids(0, 1, 2, 3, 4))
+
+    def test_priority(self):
+        ids = self.filter_ids(priority=Show.PRIORITIES.urgent)
+        self.assertEqual(ids, self.ids(0, 1))
+
+    def test_performer(self):
+        self.assertEqual(self.filter_ids(performerId=self.member.id), self.ids(3))
+        self.assertEqual(len(self.filter_ids(performerId=self.other_member.id)), 6)
+
+    def test_search(self):
+        self.assertEqual(self.filter_ids(search="lerner"), self.ids(1, 3, 5))
+        self.assertEqual(self.filter_ids(search="Show 4"), self.ids(4))
+
+    def test_combined_filters(self):
+        ids = self.filter_ids(search="library", dateFrom="2023-01-08", isOpen=True)
+        self.assertEqual(ids, self.ids(2, 4))
@@ -0,0 +1,156 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+
+from api.tests.utils import (
+    GET_SHOWS_QUERY,
+    bulk_create_shows,
+    execute_query,
+    get_nodes,
+)
+from shows.models import Show, Contact, Role
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+
+@override_settings(
+    GRAPHENE={**settings.GRAPHENE, "RELAY_CONNECTION_MAX_LIMIT": 10000},
+    GRAPHQL_MAX_COST=None,
+)
+class TestShowsQueryBatching(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.faker = Faker()
+        Faker.seed(0)
+
+        self.users = [
+            User.objects.create(
+                email=user["email"],
+                password=user["password"],
+                first_name=user["first_name"],
+                last_name=user["last_name"],
+            )
+            for user in fake_user_data(self.faker, count=3)
+        ]
+        self.members = [user.member for user in self.users]
+        self.contact = Contact.objects.create(first_name="Tom", last_name="Hanks")
+
+    def count_queries(self, query: str) -> int:
+        with CaptureQueriesContext(connection) as context:
+            result = execute_query(self.client, query, {"first": 10000})
+        self.assertNotIn("errors", result)
+        self.assertFalse(result["data"]["shows"]["pageInfo"]["hasNextPage"])
+        return len(context.captured_queries)
+
+    def test_shows_query_count_is_constant(self):
+        bulk_create_shows(self.faker, 10, self.members, self.contact)
+        small_count = self.count_queries(GET_SHOWS_QUERY)
+
+        bulk_create_shows(self.faker, 9990, self.members, self.contact)
+        self.assertEqual(Show.objects.count(), 10000)
+        large_count = self.count_queries(GET_SHOWS_QUERY)
+
+        self.assertEqual(small_count, large_count)
+
+    def test_shows_query_batches_relations(self):
+        bulk_create_shows(self.faker, 10, self.members, self.contact)
+        # shows version, shows joined with point and contact, rounds, performers
+        with self.assertNumQueries(4):
+            result = execute_query(self.client, GET_SHOWS_QUERY)
+
+        shows = get_nodes(result["data"]["shows"])
+        self.assertEqual(len(shows), 10)
+        for show in shows:
+            self.assertEqual(len(show["rounds"]), 1)
+            self.assertEqual(
+                {performer["user"]["id"] for performer in show["performers"]},
+                {str(user.id) for user in self.users},
+            )
+            self.assertEqual(show["point"]["user"]["id"], str(self.users[0].id))
+            self.assertEqual(show["contact"]["lastName"], "Hanks")
+
+    def test_member_pointed_shows(self):
+        shows = bulk_create_shows(self.faker, 5, self.members)
+        self.client.force_login(self.users[0])
+        query = """
+            {
+                members {
+                    edges { node { id pointedShows { id } } }
+                }
+            }
+        """
+        result = execute_query(self.client, query)
+
+        members = get_nodes(result["data"]["members"])
+        self.assertEqual(len(members[0]["pointedShows"]), len(shows))
+        for member in members[1:]:
+            self.assertEqual(member["pointedShows"], [])
+
+    def test_member_performed_shows(self):
+        bulk_create_shows(self.faker, 5, self.members)
+        # The last member left two of the shows
+        roles = Role.objects.filter(performer=self.members[2])
+        Role.objects.filter(
+            pk__in=list(roles.values_list("pk", flat=True)[:2])
+        ).delete()
+        self.client.force_login(self.users[0])
+        query = """
+            query PerformedShows($after: String) {
+                members {
+                    edges {
+                        node {
+                            id
+                            performedShows(first: 2, after: $after) {
+                                edges { node { id } }
+                                pageInfo { hasNextPage endCursor }
+                            }
+                        }
+                    }
+                }
+            }
+        """
+
+        def get_pages(after=None):
+            result = execute_query(self.client, query, {"after": after})
+            self.assertNotIn("errors", result)
+            return {
+                int(member["id"]): member["performedShows"]
+                for member in get_nodes(result["data"]["members"])
+            }
+
+        expected = {
+            member.pk: [str(show.pk) for show in member.performed_shows.all()]
+            for member in self.members
+        }
+        with CaptureQueriesContext(connection) as context:
+            pages = get_pages()
+        for member_id, page in pages.items():
+            self.assertEqual(
+                get_nodes(page), [{"id": pk} for pk in expected[member_id][:2]]
+            )
+            self.assertTrue(page["pageInfo"]["hasNextPage"])
+        # The pages of all members are selected together
+        self.assertEqual(
+            len([q for q in context.captured_queries if "ROW_NUMBER" in q["sql"]]), 1
+        )
+
+        # Every member is paged after the same cursor
+        after = pages[self.members[0].pk]["pageInfo"]["endCursor"]
+        ordered = [str(pk) for pk in Show.objects.values_list("pk", flat=True)]
+        position = ordered.index(expected[self.members[0].pk][1])
+        pages = get_pages(after)
+        for member_id, page in pages.items():
+            self.assertEqual(
+                get_nodes(page),
+                [
+                    {"id": pk}
+                    for pk in expected[member_id]
+                    if ordered.index(pk) > position
+                ][:2],
+            )
@@ -0,0 +1,153 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+
+from api.tests.utils import bulk_create_shows, execute_query, get_nodes
+from shows.models import Contact, Show
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+
+# Responses are not cached, so only the queries of execution are captured
+@override_settings(GRAPHQL_RESPONSE_CACHE_FIELDS=[])
+class TestQueryOptimizer(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.faker = Faker()
+        Faker.seed(0)
+
+        self.users = [
+            User.objects.create(
+                email=user["email"],
+                password=user["password"],
+                first_name=user["first_name"],
+                last_name=user["last_name"],
+                is_staff=True,
+            )
+            for user in fake_user_data(self.faker, count=3)
+        ]
+        self.members = [user.member for user in self.users]
+        self.contact = Contact.objects.create(first_name="Tom", last_name="Hanks")
+        self.shows = bulk_create_shows(self.faker, 5, self.members, self.contact)
+
+    def capture(self, query: str):
+        with CaptureQueriesContext(connection) as context:
+            result = execute_query(self.client, query)
+        self.assertNotIn("errors", result)
+        return result["data"], [q["sql"] for q in context.captured_queries]
+
+    def test_only_selected_columns(self):
+        data, queries = self.capture("{ shows { edges { node { id name } } } }")
+        self.assertEqual(len(get_nodes(data["shows"])), len(self.shows))
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"shows_show"."name"', queries[0])
+        self.assertNotIn('"shows_show"."notes"', queries[0])
+
+    def test_computed_fields_load_all_columns(self):
+        data, queries = self.capture("{ shows { edges { node { id isOpen } } } }")
+        self.assertTrue(all(show["isOpen"] for show in get_nodes(data["shows"])))
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"shows_show"."notes"', queries[0])
+
+    def test_select_related_forward_relations(self):
+        query = """
+            {
+                shows {
+                    edges {
+                        node { id point { user { firstName } } contact { lastName } }
+                    }
+                }
+            }
+        """
+        data, queries = self.capture(query)
+        self.assertEqual(len(queries), 1)
+        self.assertIn("JOIN", queries[0])
+        for show in get_nodes(data["shows"]):
+            self.assertEqual(
+                show["point"]["user"]["firstName"], self.users[0].first_name
+            )
+            self.assertEqual(show["contact"]["lastName"], "Hanks")
+
+    def test_prefetch_related_with_fragments(self):
+        query = """
+            query {
+                shows { edges { node { id ...Roster rounds { time } } } }
+            }
+            fragment Roster on ShowType {
+                performers { ... on MemberType { user { id } } }
+            }
+        """
+        data, queries = self.capture(query)
+        self.assertEqual(len(queries), 3)
+        for show in get_nodes(data["shows"]):
+            self.assertEqual(len(show["rounds"]), 1)
+            self.assertEqual(len(show["performers"]), len(self.members))
+
+    def test_users_select_related_member(self):
+        self.client.force_login(self.users[0])
+        query = "{ users { edges { node { id member { position } } } } }"
+        data, queries = self.capture(query)
+        users = get_nodes(data["users"])
+        self.assertEqual(len(users), len(self.users))
+        self.assertTrue(all(user["member"] is not None for user in users))
+        user_queries = [q for q in queries if "shows_member" in q]
+        self.assertEqual(len(user_queries), 1)
+        self.assertIn("JOIN", user_queries[0])
+
+    def test_members_prefetch_pointed_shows(self):
+        self.client.force_login(self.users[0])
+        query = "{ members { edges { node { id user { lastName } pointedShows { id name } } } } }"
+        data, queries = self.capture(query)
+        self.assertEqual(len([q for q in queries if "shows_show" in q]), 1)
+        members = get_nodes(data["members"])
+        self.assertEqual(len(members[0]["pointedShows"]), len(self.shows))
+        self.assertEqual(members[0]["user"]["lastName"], self.users[0].last_name)
+
+    def test_annotated_fields(self):
+        Show.objects.filter(pk=self.shows[0].pk).update(lions=1)
+        Show.objects.filter(pk=self.shows[1].pk).update(lions=3)
+        query = """
+            query ($performerId: ID) {
+                shows(performerId: $performerId) {
+                    edges { node { id performerCount spotsRemaining } }
+                }
+            }
+        """
+        with CaptureQueriesContext(connection) as context:
+            result = execute_query(
+                self.client, query, {"performerId": str(self.members[0].pk)}
+            )
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('"shows_show"."notes"', context.captured_queries[0]["sql"])
+
+        shows = {show["id"]: show for show in get_nodes(result["data"]["shows"])}
+        # Filtering by performer does not narrow the count of performers
+        self.assertTrue(
+            all(show["performerCount"] == len(self.members) for show in shows.values())
+        )
+        self.assertEqual(shows[str(self.shows[0].pk)]["spotsRemaining"], 1)
+        self.assertEqual(shows[str(self.shows[1].pk)]["spotsRemaining"], 5)
+        self.assertIsNone(shows[str(self.shows[2].pk)]["spotsRemaining"])
+
+    def test_viewer_is_performer(self):
+        other_user = User.objects.create(**fake_user_data(self.faker))
+        query = "{ shows { edges { node { id viewerIsPerformer } } } }"
+        for user, is_performer in [
+            (None, False),
+            (self.users[1], True),
+            (other_user, False),
+        ]:
+            if user is not None:
+                self.client.force_login(user)
+            data, queries = self.capture(query)
+            self.assertTrue(
+                all(
+                    show["viewerIsPerformer"] == is_performer
+                    for show in get_nodes(data["shows"])
+                )
+            )
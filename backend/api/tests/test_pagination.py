@@ -0,0 +1,116 @@
+import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+
+from api.tests.utils import bulk_create_shows, execute_query, get_nodes
+from shows.models import Show
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+SHOWS_PAGE_QUERY = """
+    query ShowsPage($first: Int, $after: String) {
+        shows(first: $first, after: $after) {
+            pageInfo { hasNextPage hasPreviousPage endCursor }
+            edges { cursor node { id } }
+        }
+    }
+"""
+
+
+class TestKeysetPagination(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.faker = Faker()
+        Faker.seed(0)
+
+        self.user = User.objects.create(**fake_user_data(self.faker))
+        self.shows = bulk_create_shows(self.faker, 30, [self.user.member])
+
+        # Ties and missing times must keep a stable position
+        date = datetime.date(2023, 1, 1)
+        for i, show in enumerate(self.shows[:10]):
+            show.date = date
+            show.time = None if i % 3 == 0 else datetime.time(12, i)
+        Show.objects.bulk_update(self.shows[:10], ["date", "time"])
+
+    def expected_ids(self):
+        def key(show):
+            return show.date, show.time is None, show.time or datetime.time(), show.id
+
+        return [str(show.id) for show in sorted(Show.objects.all(), key=key)]
+
+    def fetch_page(self, first, after=None):
+        with CaptureQueriesContext(connection) as context:
+            result = execute_query(
+                self.client, SHOWS_PAGE_QUERY, {"first": first, "after": after}
+            )
+        self.assertNotIn("errors", result)
+        return result["data"]["shows"], context.captured_queries
+
+    def test_pages_cover_all_shows_in_order(self):
+        ids, after, query_counts = [], None, set()
+        while True:
+            page, queries = self.fetch_page(7, after)
+            ids += [node["id"] for node in get_nodes(page)]
+            query_counts.add(len(queries))
+            for query in queries:
+                self.assertNotIn("OFFSET", query["sql"].upper())
+            self.assertEqual(page["pageInfo"]["hasPreviousPage"], after is not None)
+            if not page["pageInfo"]["hasNextPage"]:
+                break
+            after = page["pageInfo"]["endCursor"]
+
+        self.assertEqual(ids, self.expected_ids())
+        self.assertEqual(len(query_counts), 1)
+
+    def test_first_is_capped(self):
+        with self.settings(
+            GRAPHENE={**settings.GRAPHENE, "RELAY_CONNECTION_MAX_LIMIT": 5}
+        ):
+            page, _ = self.fetch_page(50)
+        self.assertEqual(len(page["edges"]), 5)
+        self.assertTrue(page["pageInfo"]["hasNextPage"])
+
+    def test_empty_page(self):
+        page, _ = self.fetch_page(0)
+        self.assertEqual(page["edges"], [])
+        self.assertIsNone(page["pageInfo"]["endCursor"])
+
+    def test_invalid_arguments(self):
+        for variables in [{"first": -1}, {"after": "not-a-cursor"}]:
+            result = execute_query(self.client, SHOWS_PAGE_QUERY, variables)
+            self.assertIn("errors", result)
+
+    def test_member_performed_shows_connection(self):
+        self.client.force_login(self.user)
+        query = """
+            query PerformedShows($after: String) {
+                members {
+                    edges {
+                        node {
+                            performedShows(first: 20, after: $after) {
+                                pageInfo { hasNextPage endCursor }
+                                edges { node { id } }
+                            }
+                        }
+                    }
+                }
+            }
+        """
+        ids, after = [], None
+        while True:
+            result = execute_query(self.client, query, {"after": after})
+            page = get_nodes(result["data"]["members"])[0]["performedShows"]
+            ids += [node["id"] for node in get_nodes(page)]
+            if not page["pageInfo"]["hasNextPage"]:
+                break
+            after = page["pageInfo"]["endCursor"]
+        self.assertEqual(ids, self.expected_ids())
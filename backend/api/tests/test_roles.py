@@ -0,0 +1,111 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from faker import Faker
+from graphql_jwt.shortcuts import get_token
+
+from api.tests.utils import bulk_create_shows, execute_query
+from shows.models import Role, Show
+from slack.models import SlackChannel
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+CREATE_ROLES_MUTATION = """
+    mutation CreateRoles($showIds: [ID!]!) {
+        createRoles(showIds: $showIds) { roles { id show { id } } }
+    }
+"""
+DELETE_ROLES_MUTATION = """
+    mutation DeleteRoles($showIds: [ID!]!) {
+        deleteRoles(showIds: $showIds) { roles { show { id } } }
+    }
+"""
+
+
+class TestBulkRoles(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.faker = Faker()
+        Faker.seed(0)
+
+        self.user = User.objects.create(**fake_user_data(self.faker))
+        self.member = self.user.member
+        self.shows = bulk_create_shows(self.faker, 4, [])
+        # The third channel is archived, and the fourth show has none
+        SlackChannel.objects.bulk_create(
+            [
+                SlackChannel(id=f"C{i}", show=show, archived=i == 2)
+                for i, show in enumerate(self.shows[:3])
+            ]
+        )
+        self.show_ids = [show.pk for show in self.shows]
+        self.token = get_token(self.user)
+
+    def execute(self, query, variables=None):
+        return execute_query(
+            self.client, query, variables, HTTP_AUTHORIZATION=f"JWT {self.token}"
+        )
+
+    def test_create_roles(self):
+        Role.objects.create(show=self.shows[0], performer=self.member)
+        self.mock_invite_users_to_channel.reset_mock()
+
+        result = self.execute(CREATE_ROLES_MUTATION, {"showIds": self.show_ids})
+        self.assertNotIn("errors", result)
+        roles = result["data"]["createRoles"]["roles"]
+        self.assertEqual(
+            [role["show"]["id"] for role in roles], [str(pk) for pk in self.show_ids]
+        )
+        self.assertTrue(all(role["id"] for role in roles))
+        self.assertEqual(
+            Role.objects.filter(performer=self.member).count(), len(self.shows)
+        )
+        # Only the new role with an active channel is invited
+        self.mock_invite_users_to_channel.assert_called_once()
+        self.assertEqual(
+            self.mock_invite_users_to_channel.call_args.kwargs["channel_id"],
+            "C1",
+        )
+
+    def test_create_roles_queries_do_not_grow_with_shows(self):
+        with self.assertNumQueries(7):
+            self.execute(CREATE_ROLES_MUTATION, {"showIds": self.show_ids[:2]})
+        Role.objects.all().delete()
+        with self.assertNumQueries(7):
+            self.execute(CREATE_ROLES_MUTATION, {"showIds": self.show_ids})
+
+    def test_create_roles_touches_shows(self):
+        before = Show.objects.get(pk=self.shows[3].pk).updated_at
+        self.execute(CREATE_ROLES_MUTATION, {"showIds": [self.shows[3].pk]})
+        self.assertGreater(Show.objects.get(pk=self.shows[3].pk).updated_at, before)
+
+    def test_create_roles_for_missing_show(self):
+        result = self.execute(CREATE_ROLES_MUTATION, {"showIds": [self.show_ids[0], 0]})
+        self.assertIn("errors", result)
+        self.assertFalse(Role.objects.exists())
+        self.mock_invite_users_to_channel.assert_not_called()
+
+    def test_create_roles_requires_login(self):
+        result = execute_query(
+            self.client, CREATE_ROLES_MUTATION, {"showIds": self.show_ids}
+        )
+        self.assertIn("errors", result)
+        self.assertFalse(Role.objects.exists())
+
+    def test_delete_roles(self):
+        Role.objects.bulk_create(
+            [Role(show=show, performer=self.member) for show in self.shows[:3]]
+        )
+
+        result = self.execute(DELETE_ROLES_MUTATION, {"showIds": self.show_ids})
+        self.assertNotIn("errors", result)
+        roles = result["data"]["deleteRoles"]["roles"]
+        self.assertEqual(
+            [role["show"]["id"] for role in roles],
+            [str(pk) for pk in self.show_ids[:3]],
+        )
+        self.assertFalse(Role.objects.exists())
+        # Removed from the active channels only
+        self.assertEqual(self.mock_remove_users_from_channel.call_count, 2)
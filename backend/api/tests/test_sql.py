@@ -0,0 +1,126 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+from graphql_jwt.shortcuts import get_token
+
+from api.sql import find_duplicates
+from api.tests.utils import (
+    GET_MEMBERS_QUERY,
+    GET_SHOWS_QUERY,
+    QueryBudgetMixin,
+    bulk_create_shows,
+    execute_query,
+)
+from api.views import CACHE_STATUS_HEADER
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+PERFORMED_SHOWS_QUERY = """
+    query PerformedShows {
+        members(first: 10) {
+            edges {
+                node { performedShows(first: 10) { edges { node { id } } } }
+            }
+        }
+    }
+"""
+
+
+class TestSQLAccounting(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        faker = Faker()
+        Faker.seed(0)
+
+        self.users = [User.objects.create(**data) for data in fake_user_data(faker, 3)]
+        bulk_create_shows(faker, 4, [user.member for user in self.users])
+        cache.clear()
+
+    def execute_debug_query(self, query, **extra):
+        return execute_query(self.client, query, HTTP_X_GRAPHQL_DEBUG_SQL="1", **extra)
+
+    def test_sql_is_reported_to_staff(self):
+        self.users[0].is_staff = True
+        self.users[0].save()
+        self.client.force_login(self.users[0])
+
+        result = self.execute_debug_query(PERFORMED_SHOWS_QUERY)
+        sql = result["extensions"]["sql"]
+        self.assertEqual(sql["operationName"], "PerformedShows")
+        self.assertGreater(sql["count"], 0)
+        self.assertGreaterEqual(sql["durationMs"], 0)
+        # The performed shows of all members are queried together
+        self.assertEqual(sql["duplicates"], [])
+
+    def test_sql_is_not_reported_to_other_users(self):
+        self.assertNotIn("sql", self.execute_debug_query(GET_SHOWS_QUERY)["extensions"])
+        self.client.force_login(self.users[0])
+        result = self.execute_debug_query(PERFORMED_SHOWS_QUERY)
+        self.assertNotIn("sql", result["extensions"])
+
+    def test_sql_header_of_other_users_is_served_from_cache(self):
+        self.execute_debug_query(GET_SHOWS_QUERY)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                "/graphql/",
+                {"query": GET_SHOWS_QUERY},
+                content_type="application/json",
+                HTTP_X_GRAPHQL_DEBUG_SQL="1",
+            )
+        self.assertEqual(response[CACHE_STATUS_HEADER], "hit")
+        self.assertNotIn("sql", response.json()["extensions"])
+        # Only the version of show data is read
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_sql_is_reported_to_staff_with_tokens(self):
+        self.users[0].is_staff = True
+        self.users[0].save()
+        token = get_token(self.users[0])
+
+        result = self.execute_debug_query(
+            PERFORMED_SHOWS_QUERY, HTTP_AUTHORIZATION=f"JWT {token}"
+        )
+        self.assertIn("sql", result["extensions"])
+
+    def test_sql_is_not_reported_without_header(self):
+        self.users[0].is_staff = True
+        self.users[0].save()
+        self.client.force_login(self.users[0])
+        result = execute_query(self.client, PERFORMED_SHOWS_QUERY)
+        self.assertNotIn("sql", result["extensions"])
+
+    def test_find_duplicates(self):
+        statements = ["SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3", "SELECT 1"]
+        self.assertEqual(find_duplicates(statements), [{"sql": "SELECT 1", "count": 3}])
+
+
+class TestQueryBudgets(QueryBudgetMixin, PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.faker = Faker()
+        Faker.seed(0)
+
+        self.users = [
+            User.objects.create(**data) for data in fake_user_data(self.faker, 5)
+        ]
+        bulk_create_shows(self.faker, 10, [user.member for user in self.users])
+
+    def test_shows_query_budget(self):
+        self.assertWithinQueryBudget(GET_SHOWS_QUERY)
+
+    def test_members_query_budget(self):
+        self.client.force_login(self.users[0])
+        self.assertWithinQueryBudget(GET_MEMBERS_QUERY)
+
+    def test_budget_overruns_fail(self):
+        self.query_budgets = {"GetShows": 3}
+        with self.assertRaises(AssertionError) as context:
+            self.assertWithinQueryBudget(GET_SHOWS_QUERY)
+        self.assertIn("GetShows executed 4 queries", str(context.exception))
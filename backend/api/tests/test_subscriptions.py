@@ -0,0 +1,218 @@
+import json
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+from faker import Faker
+from graphql_jwt.shortcuts import get_token
+
+from api.tests.utils import bulk_create_shows
+from api.websocket import GraphQLWebSocket
+from shows.events import ROSTER_CHANGED, SHOW_UPDATED, Event, broker
+from shows.models import Role, Show
+from slack.service import SlackBoss
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+ROSTER_CHANGED_SUBSCRIPTION = """
+    subscription RosterChanged {
+        rosterChanged { show { id name } member { id } joined }
+    }
+"""
+
+SHOW_UPDATED_SUBSCRIPTION = """
+    subscription ShowUpdated($id: ID!) {
+        showUpdated(id: $id) { id name performers { id } }
+    }
+"""
+
+
+class TestShowEvents(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        faker = Faker()
+        Faker.seed(0)
+
+        self.member = User.objects.create(**fake_user_data(faker)).member
+        self.show = bulk_create_shows(faker, 1, [])[0]
+        self.events = []
+        self.addCleanup(broker.subscribe(self.events.append))
+
+    def test_events_are_published_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            role = Role.objects.create(show=self.show, performer=self.member)
+        self.assertEqual(self.events, [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(
+            self.events,
+            [
+                Event(ROSTER_CHANGED, self.show.id, self.member.id, True),
+                Event(SHOW_UPDATED, self.show.id),
+            ],
+        )
+
+        self.events.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            role.delete()
+            self.show.save()
+        self.assertEqual(
+            self.events,
+            [
+                Event(ROSTER_CHANGED, self.show.id, self.member.id, False),
+                Event(SHOW_UPDATED, self.show.id),
+                Event(SHOW_UPDATED, self.show.id),
+            ],
+        )
+
+
+class TestGraphQLWebSocket(TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+
+        fetch_user_patcher = patch.object(SlackBoss, "fetch_user", return_value=None)
+        fetch_user_patcher.start()
+        self.addCleanup(fetch_user_patcher.stop)
+
+        faker = Faker()
+        Faker.seed(0)
+
+        self.user = User.objects.create(**fake_user_data(faker))
+        self.show, self.draft = bulk_create_shows(faker, 2, [])
+        Show.objects.filter(pk=self.draft.pk).update(status=Show.STATUSES.draft)
+
+    async def connect(self, subprotocols=("graphql-transport-ws",)):
+        communicator = ApplicationCommunicator(
+            GraphQLWebSocket.as_asgi,
+            {"type": "websocket", "path": "/graphql/", "subprotocols": subprotocols},
+        )
+        await communicator.send_input({"type": "websocket.connect"})
+        return communicator
+
+    async def send(self, communicator, message):
+        await communicator.send_input(
+            {"type": "websocket.receive", "text": json.dumps(message)}
+        )
+
+    async def receive(self, communicator):
+        message = await communicator.receive_output(timeout=5)
+        self.assertEqual(message["type"], "websocket.send")
+        return json.loads(message["text"])
+
+    async def initialize(self, payload=None):
+        communicator = await self.connect()
+        self.assertEqual(
+            await communicator.receive_output(timeout=5),
+            {"type": "websocket.accept", "subprotocol": "graphql-transport-ws"},
+        )
+        await self.send(
+            communicator, {"type": "connection_init", "payload": payload or {}}
+        )
+        self.assertEqual(await self.receive(communicator), {"type": "connection_ack"})
+        return communicator
+
+    async def subscribe(self, communicator, query, variables=None):
+        await self.send(
+            communicator,
+            {
+                "id": "1",
+                "type": "subscribe",
+                "payload": {"query": query, "variables": variables or {}},
+            },
+        )
+        # Subscriptions are acknowledged by a round trip
+        await self.send(communicator, {"type": "ping"})
+        self.assertEqual(await self.receive(communicator), {"type": "pong"})
+
+    async def test_roster_changes_are_pushed(self):
+        token = await sync_to_async(get_token)(self.user)
+        communicator = await self.initialize({"authorization": f"JWT {token}"})
+        await self.subscribe(communicator, ROSTER_CHANGED_SUBSCRIPTION)
+
+        member_id = await sync_to_async(lambda: self.user.member.id)()
+        broker.publish(Event(ROSTER_CHANGED, self.draft.id, member_id, True))
+        broker.publish(Event(ROSTER_CHANGED, self.show.id, member_id, True))
+        message = await self.receive(communicator)
+        self.assertEqual(message["id"], "1")
+        self.assertEqual(message["type"], "next")
+        self.assertEqual(
+            message["payload"]["data"]["rosterChanged"],
+            {
+                "show": {"id": str(self.show.id), "name": self.show.name},
+                "member": {"id": str(member_id)},
+                "joined": True,
+            },
+        )
+
+        await self.send(communicator, {"id": "1", "type": "complete"})
+        await self.send(communicator, {"type": "ping"})
+        self.assertEqual(await self.receive(communicator), {"type": "pong"})
+        broker.publish(Event(ROSTER_CHANGED, self.show.id, member_id, False))
+        self.assertTrue(await communicator.receive_nothing(timeout=0.5))
+        await communicator.send_input({"type": "websocket.disconnect"})
+        await communicator.wait()
+
+    async def test_show_updates_are_pushed(self):
+        communicator = await self.initialize()
+        await self.subscribe(
+            communicator, SHOW_UPDATED_SUBSCRIPTION, {"id": str(self.show.id)}
+        )
+
+        member = await sync_to_async(lambda: self.user.member)()
+        await sync_to_async(Role.objects.create)(show=self.show, performer=member)
+        message = await self.receive(communicator)
+        self.assertEqual(
+            message["payload"]["data"]["showUpdated"],
+            {
+                "id": str(self.show.id),
+                "name": self.show.name,
+                "performers": [{"id": str(member.id)}],
+            },
+        )
+        await communicator.send_input({"type": "websocket.disconnect"})
+        await communicator.wait()
+
+    async def test_protocol_errors(self):
+        communicator = await self.connect(subprotocols=[])
+        self.assertEqual(
+            await communicator.receive_output(timeout=5),
+            {"type": "websocket.close", "code": 4406},
+        )
+
+        communicator = await self.connect()
+        await communicator.receive_output(timeout=5)
+        await self.send(communicator, {"id": "1", "type": "subscribe"})
+        self.assertEqual(
+            await communicator.receive_output(timeout=5),
+            {"type": "websocket.close", "code": 4401},
+        )
+
+    async def test_invalid_token_is_forbidden(self):
+        communicator = await self.connect()
+        await communicator.receive_output(timeout=5)
+        await self.send(
+            communicator,
+            {"type": "connection_init", "payload": {"authorization": "JWT invalid"}},
+        )
+        self.assertEqual(
+            await communicator.receive_output(timeout=5),
+            {"type": "websocket.close", "code": 4403},
+        )
+
+    async def test_only_subscriptions_are_served(self):
+        communicator = await self.initialize()
+        await self.send(
+            communicator,
+            {"id": "1", "type": "subscribe", "payload": {"query": "{ me { id } }"}},
+        )
+        message = await self.receive(communicator)
+        self.assertEqual(message["type"], "error")
+        self.assertIn("Only subscriptions", message["payload"][0]["message"])
+        await communicator.send_input({"type": "websocket.disconnect"})
+        await communicator.wait()
@@ -0,0 +1,188 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from faker import Faker
+
+from api.sync import SYNC_CURSOR_EXPIRED, encode_sync_cursor
+from api.tests.utils import bulk_create_shows, execute_query
+from shows.models import Role, Show, ShowTombstone
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+SHOWS_CHANGED_SINCE_QUERY = """
+    query ShowsChangedSince($cursor: String, $first: Int) {
+        showsChangedSince(cursor: $cursor, first: $first) {
+            shows {
+                id
+                name
+                performers { id }
+            }
+            deletedIds
+            hasMore
+            cursor
+        }
+    }
+"""
+
+
+class TestShowsChangedSince(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.faker = Faker()
+        Faker.seed(0)
+
+        self.users = [
+            User.objects.create(**data) for data in fake_user_data(self.faker, 2)
+        ]
+        self.shows = bulk_create_shows(self.faker, 3, [self.users[0].member])
+        # Shows changed before the first sync are outside its overlap
+        Show.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def sync(self, cursor=None, first=None):
+        result = execute_query(
+            self.client, SHOWS_CHANGED_SINCE_QUERY, {"cursor": cursor, "first": first}
+        )
+        self.assertNotIn("errors", result)
+        return result["data"]["showsChangedSince"]
+
+    def test_full_sync_without_cursor(self):
+        changes = self.sync()
+        self.assertEqual(
+            {show["id"] for show in changes["shows"]},
+            {str(show.pk) for show in self.shows},
+        )
+        self.assertEqual(changes["deletedIds"], [])
+        self.assertFalse(changes["hasMore"])
+
+    def test_full_sync_is_paginated(self):
+        Show.objects.create(name="Unpublished show", status=Show.STATUSES.draft)
+        first_page = self.sync(first=2)
+        self.assertEqual(len(first_page["shows"]), 2)
+        self.assertTrue(first_page["hasMore"])
+
+        last_page = self.sync(first_page["cursor"], first=2)
+        self.assertEqual(len(last_page["shows"]), 1)
+        self.assertFalse(last_page["hasMore"])
+        self.assertEqual(last_page["deletedIds"], [])
+        self.assertEqual(
+            {show["id"] for show in first_page["shows"] + last_page["shows"]},
+            {str(show.pk) for show in self.shows},
+        )
+
+        self.assertEqual(self.sync(last_page["cursor"])["shows"], [])
+
+    def test_delta_sync_is_paginated(self):
+        cursor = self.sync()["cursor"]
+        Show.objects.get(pk=self.shows[2].pk).delete()
+        for show in Show.objects.filter(pk__in=[s.pk for s in self.shows[:2]]):
+            show.save()
+
+        first_page = self.sync(cursor, first=1)
+        self.assertEqual(len(first_page["shows"]), 1)
+        self.assertTrue(first_page["hasMore"])
+        self.assertEqual(first_page["deletedIds"], [str(self.shows[2].pk)])
+
+        last_page = self.sync(first_page["cursor"], first=1)
+        self.assertEqual(len(last_page["shows"]), 1)
+        self.assertFalse(last_page["hasMore"])
+        self.assertEqual(last_page["deletedIds"], [])
+        self.assertNotEqual(first_page["shows"][0], last_page["shows"][0])
+
+    def test_sync_returns_changed_shows(self):
+        cursor = self.sync()["cursor"]
+        self.assertEqual(self.sync(cursor)["shows"], [])
+
+        show = Show.objects.get(pk=self.shows[0].pk)
+        show.name = "Renamed show"
+        show.save()
+
+        changes = self.sync(cursor)
+        self.assertEqual(len(changes["shows"]), 1)
+        self.assertEqual(changes["shows"][0]["name"], "Renamed show")
+
+    def test_roster_changes_change_show(self):
+        cursor = self.sync()["cursor"]
+        Role.objects.create(show=self.shows[1], performer=self.users[1].member)
+
+        changes = self.sync(cursor)
+        self.assertEqual(
+            [show["id"] for show in changes["shows"]], [str(self.shows[1].pk)]
+        )
+        self.assertEqual(len(changes["shows"][0]["performers"]), 2)
+
+    def test_removed_shows_are_reported_by_id(self):
+        cursor = self.sync()["cursor"]
+        Show.objects.get(pk=self.shows[0].pk).delete()
+        show = Show.objects.get(pk=self.shows[1].pk)
+        show.status = Show.STATUSES.draft
+        show.save()
+
+        changes = self.sync(cursor)
+        self.assertEqual(changes["shows"], [])
+        self.assertEqual(
+            changes["deletedIds"], [str(self.shows[0].pk), str(self.shows[1].pk)]
+        )
+
+    def test_drafts_are_not_reported(self):
+        cursor = self.sync()["cursor"]
+        draft = Show.objects.create(name="Draft show", status=Show.STATUSES.draft)
+        draft.name = "Renamed draft show"
+        draft.save()
+        Show.objects.get(pk=draft.pk).delete()
+
+        changes = self.sync(cursor)
+        self.assertEqual(changes["shows"], [])
+        self.assertEqual(changes["deletedIds"], [])
+
+    def test_republished_shows_are_reported(self):
+        cursor = self.sync()["cursor"]
+        show = Show.objects.get(pk=self.shows[0].pk)
+        show.status = Show.STATUSES.draft
+        show.save()
+        show.status = Show.STATUSES.published
+        show.save()
+
+        # Clients drop the removed shows before adding the changed ones
+        changes = self.sync(cursor)
+        self.assertEqual(changes["deletedIds"], [str(show.pk)])
+        self.assertEqual([show["id"] for show in changes["shows"]], [str(show.pk)])
+
+    @override_settings(SHOW_TOMBSTONE_RETENTION=24 * 60 * 60)
+    def test_expired_cursor_requires_full_sync(self):
+        cursor = encode_sync_cursor(timezone.now() - timedelta(days=2))
+        result = execute_query(
+            self.client, SHOWS_CHANGED_SINCE_QUERY, {"cursor": cursor}
+        )
+        self.assertEqual(result["errors"][0]["message"], "Cursor expired")
+        self.assertEqual(result["errors"][0]["extensions"]["code"], SYNC_CURSOR_EXPIRED)
+
+    @override_settings(SHOW_TOMBSTONE_RETENTION=24 * 60 * 60)
+    def test_expired_tombstones_are_pruned(self):
+        expired = ShowTombstone.objects.create(show_id=0)
+        ShowTombstone.objects.filter(pk=expired.pk).update(
+            deleted_at=timezone.now() - timedelta(days=2)
+        )
+        Show.objects.get(pk=self.shows[0].pk).delete()
+
+        self.assertEqual(
+            list(ShowTombstone.objects.values_list("show_id", flat=True)),
+            [self.shows[0].pk],
+        )
+
+    def test_future_cursor_returns_no_changes(self):
+        cursor = encode_sync_cursor(timezone.now() + timedelta(hours=1))
+        changes = self.sync(cursor)
+        self.assertEqual(changes["shows"], [])
+        self.assertEqual(changes["deletedIds"], [])
+
+    def test_invalid_cursor(self):
+        for cursor in ["invalid", encode_sync_cursor(timezone.now())[:-4]]:
+            result = execute_query(
+                self.client, SHOWS_CHANGED_SINCE_QUERY, {"cursor": cursor}
+            )
+            self.assertEqual(result["errors"][0]["message"], "Invalid cursor")
@@ -0,0 +1,58 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+
+from api.tests.utils import GET_SHOWS_QUERY, bulk_create_shows, execute_query
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+
+class TestTracing(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        faker = Faker()
+        Faker.seed(0)
+
+        users = [User.objects.create(**data) for data in fake_user_data(faker, 2)]
+        bulk_create_shows(faker, 4, [user.member for user in users])
+
+    @override_settings(GRAPHQL_TRACING_IN_EXTENSIONS=True)
+    def test_trace_in_extensions(self):
+        result = execute_query(self.client, GET_SHOWS_QUERY)
+        self.assertNotIn("tracing", result["extensions"])
+
+        with CaptureQueriesContext(connection) as context:
+            result = execute_query(
+                self.client, GET_SHOWS_QUERY, HTTP_X_GRAPHQL_TRACING="1"
+            )
+        trace = result["extensions"]["tracing"]
+        self.assertEqual(trace["operationName"], "GetShows")
+        self.assertEqual(trace["sqlCount"], len(context.captured_queries))
+        self.assertGreater(trace["durationMs"], 0)
+
+        resolvers = {resolver["path"]: resolver for resolver in trace["resolvers"]}
+        self.assertEqual(resolvers["shows"]["count"], 1)
+        self.assertGreaterEqual(resolvers["shows"]["sqlCount"], 1)
+        self.assertEqual(resolvers["shows.edges.node.name"]["count"], 4)
+        self.assertEqual(resolvers["shows.edges.node.performers.user.id"]["count"], 8)
+
+    def test_operations_are_not_traced_by_default(self):
+        with self.assertNoLogs("api.tracing", "INFO"):
+            result = execute_query(self.client, GET_SHOWS_QUERY)
+        self.assertNotIn("tracing", result.get("extensions", {}))
+
+    @override_settings(GRAPHQL_TRACING_SAMPLE_RATE=1.0)
+    def test_sampled_traces_are_logged(self):
+        with self.assertLogs("api.tracing", "INFO") as logs:
+            result = execute_query(self.client, GET_SHOWS_QUERY)
+        self.assertNotIn("tracing", result["extensions"])
+        trace = json.loads(logs.records[0].getMessage())
+        self.assertEqual(trace["operationName"], "GetShows")
+        self.assertIn("shows", [resolver["path"] for resolver in trace["resolvers"]])
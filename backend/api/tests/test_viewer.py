@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from faker import Faker
+from graphql_jwt.shortcuts import get_token
+
+from api.tests.utils import bulk_create_shows, execute_query
+from shows.models import Role
+from slack.models import SlackChannel
+from slack.tests.utils import PatchSlackBossMixin
+from users.tests.utils import fake_user_data
+
+User = get_user_model()
+
+ME_QUERY = "query { me { id email member { id position } } }"
+CREATE_ROLE_MUTATION = """
+    mutation CreateRole($showId: ID!) {
+        createRole(showId: $showId) { role { id } }
+    }
+"""
+DELETE_ROLE_MUTATION = """
+    mutation DeleteRole($showId: ID!) {
+        deleteRole(showId: $showId) { role { performer { id } } }
+    }
+"""
+
+
+class TestViewer(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.faker = Faker()
+        Faker.seed(0)
+
+        self.user = User.objects.create(**fake_user_data(self.faker))
+        self.show = bulk_create_shows(self.faker, 1, [])[0]
+        SlackChannel.objects.create(show=self.show)
+        self.token = get_token(self.user)
+
+    def execute(self, query, variables=None):
+        return execute_query(
+            self.client, query, variables, HTTP_AUTHORIZATION=f"JWT {self.token}"
+        )
+
+    def test_me_is_loaded_with_token(self):
+        with self.assertNumQueries(1):
+            result = self.execute(ME_QUERY)
+        me = result["data"]["me"]
+        self.assertEqual(me["id"], str(self.user.pk))
+        self.assertEqual(me["member"]["id"], str(self.user.member.pk))
+
+    def test_me_is_loaded_once_with_session(self):
+        self.client.force_login(self.user)
+        # The session and its user, then the viewer with their member
+        with self.assertNumQueries(3):
+            result = execute_query(self.client, ME_QUERY)
+        self.assertEqual(result["data"]["me"]["member"]["id"], str(self.user.member.pk))
+
+    def test_roles_use_viewer(self):
+        self.mock_invite_users_to_channel.reset_mock()
+        result = self.execute(CREATE_ROLE_MUTATION, {"showId": self.show.pk})
+        self.assertIsNotNone(result["data"]["createRole"]["role"]["id"])
+        role = Role.objects.get(show=self.show)
+        self.assertEqual(role.performer, self.user.member)
+        self.mock_invite_users_to_channel.assert_called_once()
+
+        result = self.execute(DELETE_ROLE_MUTATION, {"showId": self.show.pk})
+        self.assertNotIn("errors", result)
+        self.assertFalse(Role.objects.filter(show=self.show).exists())
+
+    def test_roles_require_login(self):
+        result = execute_query(
+            self.client, CREATE_ROLE_MUTATION, {"showId": self.show.pk}
+        )
+        self.assertIn("errors", result)
+        self.assertFalse(Role.objects.exists())
@@ -0,0 +1,190 @@
+import json
+from typing import List, Dict, Optional
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+from graphql.language.parser import parse
+
+from api.complexity import get_operation
+from api.sql import find_duplicates
+
+from shows.cache import bump_shows_version
+from shows.models import Member, Show, Round, Role, Contact
+from shows.tests.utils import fake_show_name
+
+GET_SHOWS_QUERY = """
+    query GetShows($first: Int, $after: String) {
+        shows(first: $first, after: $after) {
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+            edges {
+                node {
+                    id
+                    name
+                    priority
+                    date
+                    time
+                    rounds {
+                        id
+                        time
+                    }
+                    address
+                    lions
+                    performers {
+                        user {
+                            id
+                            firstName
+                            lastName
+                        }
+                    }
+                    point {
+                        user {
+                            id
+                            firstName
+                            lastName
+                        }
+                    }
+                    contact {
+                        firstName
+                        lastName
+                        phone
+                        email
+                    }
+                    isCampus
+                    isOutOfCity
+                    isOpen
+                    isPending
+                    status
+                    notes
+                }
+            }
+        }
+    }
+"""
+
+
+GET_MEMBERS_QUERY = """
+    query GetMembers {
+        members {
+            edges {
+                node {
+                    id
+                    position
+                    user {
+                        id
+                        firstName
+                        lastName
+                    }
+                    pointedShows {
+                        id
+                        name
+                    }
+                    performedShows(first: 10) {
+                        edges {
+                            node {
+                                id
+                                name
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+# The most SQL queries each operation may execute, whatever the amount of data
+QUERY_BUDGETS = {
+    # shows version, shows joined with point and contact, rounds, performers
+    "GetShows": 4,
+    # session and user, members, users, pointed shows, pages of performed
+    # shows and their shows
+    "GetMembers": 6,
+}
+
+
+def bulk_create_shows(
+    faker: Faker, count: int, members: List[Member], contact: Optional[Contact] = None
+) -> List[Show]:
+    """Bulk create published shows with a round and a role for each member.
+
+    Bypasses Show.save so that no Slack channels are created, so the shows
+    version is bumped explicitly to invalidate cached responses.
+    """
+
+    shows = Show.objects.bulk_create(
+        [
+            Show(
+                name=fake_show_name(faker),
+                date=faker.date_object(),
+                time=faker.time_object(),
+                point=members[0] if members else None,
+                contact=contact,
+                status=Show.STATUSES.published,
+            )
+            for _ in range(count)
+        ]
+    )
+    Round.objects.bulk_create([Round(show=show, time=show.time) for show in shows])
+    Role.objects.bulk_create(
+        [Role(show=show, performer=member) for show in shows for member in members]
+    )
+    bump_shows_version()
+    return shows
+
+
+def execute_query(
+    client: Client, query: str, variables: Optional[Dict] = None, **extra
+) -> Dict:
+    """Posts a GraphQL operation to the API endpoint and decodes the response"""
+
+    body = {"query": query}
+    if variables is not None:
+        body["variables"] = variables
+    response = client.post(
+        "/graphql/", json.dumps(body), content_type="application/json", **extra
+    )
+    return response.json()
+
+
+def get_nodes(connection: Dict) -> List[Dict]:
+    """Gets the nodes from the edges of a connection in a response"""
+
+    return [edge["node"] for edge in connection["edges"]]
+
+
+class QueryBudgetMixin:
+    """Asserts that operations execute no more SQL queries than their budget.
+
+    Budgets are looked up by operation name in QUERY_BUDGETS, so that an N+1
+    regression in any type an operation selects fails its tests.
+    """
+
+    query_budgets = QUERY_BUDGETS
+
+    def assertWithinQueryBudget(
+        self, query: str, variables: Optional[Dict] = None, **extra
+    ) -> Dict:
+        operation = get_operation(parse(query), None)
+        name = operation.name.value
+        budget = self.query_budgets[name]
+
+        with CaptureQueriesContext(connection) as context:
+            result = execute_query(self.client, query, variables, **extra)
+        self.assertNotIn("errors", result)
+
+        statements = [query["sql"] for query in context.captured_queries]
+        if len(statements) > budget:
+            duplicates = "\n".join(
+                f"{duplicate['count']}x {duplicate['sql']}"
+                for duplicate in find_duplicates(statements)
+            )
+            self.fail(
+                f"{name} executed {len(statements)} queries, over its budget of "
+                f"{budget}. Duplicated queries:\n{duplicates or 'none'}"
+            )
+        return result
@@ -0,0 +1,139 @@
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+TRACING_HEADER = "HTTP_X_GRAPHQL_TRACING"
+
+
+class ResolverStats:
+    __slots__ = ("count", "duration", "sql_count", "sql_duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.sql_count = 0
+        self.sql_duration = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "durationMs": round(self.duration * 1000, 3),
+            "sqlCount": self.sql_count,
+            "sqlDurationMs": round(self.sql_duration * 1000, 3),
+        }
+
+
+class Trace:
+    """The time and SQL queries spent in each resolver path of an operation.
+
+    Paths omit list indices, so that the resolvers of every item of a list
+    are aggregated together.
+    """
+
+    def __init__(self, operation_name: Optional[str], in_extensions: bool):
+        self.operation_name = operation_name
+        self.in_extensions = in_extensions
+        self.resolvers = defaultdict(ResolverStats)
+        self.start = time.perf_counter()
+        self.duration = None
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self.start
+
+    def as_dict(self) -> Dict:
+        resolvers = sorted(
+            self.resolvers.items(), key=lambda item: item[1].duration, reverse=True
+        )
+        return {
+            "operationName": self.operation_name,
+            "durationMs": round((self.duration or 0.0) * 1000, 3),
+            "sqlCount": sum(stats.sql_count for stats in self.resolvers.values()),
+            "sqlDurationMs": round(
+                sum(stats.sql_duration for stats in self.resolvers.values()) * 1000,
+                3,
+            ),
+            "resolvers": [
+                {"path": path, **stats.as_dict()} for path, stats in resolvers
+            ],
+        }
+
+
+def tracing_requested(request) -> bool:
+    """Whether a request asks for the traces of its operations"""
+
+    return getattr(settings, "GRAPHQL_TRACING_IN_EXTENSIONS", False) and bool(
+        getattr(request, "META", {}).get(TRACING_HEADER)
+    )
+
+
+def start_trace(context, operation_name: Optional[str]) -> Optional[Trace]:
+    """Starts tracing an operation if it is sampled or traced in extensions.
+
+    Operations are sampled at the GRAPHQL_TRACING_SAMPLE_RATE setting. When
+    GRAPHQL_TRACING_IN_EXTENSIONS is set, operations requested with the
+    X-GraphQL-Tracing header are also traced, and their trace is returned.
+
+    Returns:
+        The trace attached to the context, or None if the operation is not
+        traced.
+    """
+
+    in_extensions = tracing_requested(context)
+    sample_rate = getattr(settings, "GRAPHQL_TRACING_SAMPLE_RATE", 0.0)
+    sampled = sample_rate > 0 and random.random() < sample_rate
+    trace = Trace(operation_name, in_extensions) if sampled or in_extensions else None
+    if context is not None:
+        context.graphql_trace = trace
+    return trace
+
+
+def finish_trace(context, trace: Trace, extensions: Dict) -> None:
+    """Finishes tracing an operation, logging it and adding it to extensions"""
+
+    trace.finish()
+    if context is not None:
+        context.graphql_trace = None
+    data = trace.as_dict()
+    logger.info(json.dumps(data))
+    if trace.in_extensions:
+        extensions["tracing"] = data
+
+
+class TracingMiddleware:
+    """Records the wall time and SQL queries of each resolver of a trace.
+
+    Resolvers returning promises are timed until they return, which excludes
+    the batched loads they wait for.
+    """
+
+    def resolve(self, next, root, info, **args):
+        trace = getattr(info.context, "graphql_trace", None)
+        if trace is None:
+            return next(root, info, **args)
+
+        path = ".".join(str(key) for key in info.path if not isinstance(key, int))
+        stats = trace.resolvers[path]
+
+        def record_sql(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats.sql_count += 1
+                stats.sql_duration += time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(record_sql):
+                return next(root, info, **args)
+        finally:
+            stats.count += 1
+            stats.duration += time.perf_counter() - start
@@ -6,6 +6,9 @@ from graphene_django.utils import camelize
 from common.exceptions import WrongUsage
 from shows.models import Member, Show, Round, Contact, Role
 from users.models import User
+from .loaders import MemberPerformedShowsLoader, get_field_loader, load_related
+from .optimizer import optimize_queryset
+from .pagination import KeysetConnectionField, get_page_size
 
 
 class UserType(DjangoObjectType):
@@ -13,6 +16,9 @@ class UserType(DjangoObjectType):
         model = User
         fields = ("id", "email", "first_name", "last_name", "phone", "member")
 
+    def resolve_member(self, info):
+        return load_related(info, self, "member", "member_by_user", self.pk)
+
 
 class MemberType(DjangoObjectType):
     class Meta:
@@ -28,6 +34,33 @@ class MemberType(DjangoObjectType):
         )
         convert_choices_to_enum = False
 
+    performed_shows = KeysetConnectionField(lambda: ShowConnection)
+
+    def resolve_user(self, info):
+        return load_related(info, self, "user", "user", self.user_id)  # noqa
+
+    def resolve_performed_shows(self, info, first=None, after=None):
+        loader = get_field_loader(
+            info,
+            lambda: MemberPerformedShowsLoader(
+                optimize_queryset(Show.objects.all(), info), ShowConnection
+            ),
+        )
+        return loader.load((self.pk, get_page_size(first), after))
+
+    def resolve_pointed_shows(self, info):
+        return load_related(
+            info, self, "pointed_shows", "member_pointed_shows", self.pk
+        )
+
+
+def annotate_roster_counts(queryset, info):
+    return queryset.with_roster_counts()
+
+
+def annotate_viewer_is_performer(queryset, info):
+    return queryset.with_viewer_is_performer(info.context.user)
+
 
 class ShowType(DjangoObjectType):
     class Meta:
@@ -53,6 +86,15 @@ class ShowType(DjangoObjectType):
 
     is_open = graphene.Boolean()
     is_pending = graphene.Boolean()
+    performer_count = graphene.Int()
+    spots_remaining = graphene.Int()
+    viewer_is_performer = graphene.Boolean()
+
+    annotations = {
+        "performer_count": annotate_roster_counts,
+        "spots_remaining": annotate_roster_counts,
+        "viewer_is_performer": annotate_viewer_is_performer,
+    }
 
     def resolve_is_open(self, info):
         return self.is_open()  # noqa
@@ -60,12 +102,42 @@ class ShowType(DjangoObjectType):
     def resolve_is_pending(self, info):
         return self.pending  # noqa
 
+    def resolve_performer_count(self, info):
+        return self.performer_count()  # noqa
+
+    def resolve_spots_remaining(self, info):
+        return self.spots_remaining()  # noqa
+
+    def resolve_viewer_is_performer(self, info):
+        if hasattr(self, "viewer_is_performer"):
+            return self.viewer_is_performer
+        user = info.context.user
+        return (
+            user.is_authenticated
+            and Role.objects.filter(show=self, performer__user=user).exists()
+        )
+
+    def resolve_rounds(self, info):
+        return load_related(info, self, "rounds", "show_rounds", self.pk)
+
+    def resolve_performers(self, info):
+        return load_related(info, self, "performers", "show_performers", self.pk)
+
+    def resolve_point(self, info):
+        return load_related(info, self, "point", "member", self.point_id)  # noqa
+
+    def resolve_contact(self, info):
+        return load_related(info, self, "contact", "contact", self.contact_id)  # noqa
+
 
 class RoundType(DjangoObjectType):
     class Meta:
         model = Round
         fields = ("id", "show", "time")
 
+    def resolve_show(self, info):
+        return load_related(info, self, "show", "show", self.show_id)  # noqa
+
 
 class ContactType(DjangoObjectType):
     class Meta:
@@ -78,6 +150,41 @@ class RoleType(DjangoObjectType):
         model = Role
         fields = ("id", "show", "performer", "role")
 
+    def resolve_show(self, info):
+        return load_related(info, self, "show", "show", self.show_id)  # noqa
+
+    def resolve_performer(self, info):
+        return load_related(
+            info, self, "performer", "member", self.performer_id
+        )  # noqa
+
+
+class UserConnection(graphene.relay.Connection):
+    class Meta:
+        node = UserType
+
+
+class MemberConnection(graphene.relay.Connection):
+    class Meta:
+        node = MemberType
+
+
+class ShowConnection(graphene.relay.Connection):
+    class Meta:
+        node = ShowType
+
+
+class ShowChangesType(graphene.ObjectType):
+    """A page of the shows changed since a sync, and the next cursor"""
+
+    shows = graphene.List(graphene.NonNull(ShowType), required=True)
+    deleted_ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+    has_more = graphene.Boolean(required=True)
+    cursor = graphene.String(required=True)
+
+    def resolve_shows(self, info):
+        return optimize_queryset(self.shows, info)  # noqa
+
 
 class ExpectedErrorType(Scalar):
     @staticmethod
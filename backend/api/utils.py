@@ -0,0 +1,20 @@
+from django.core.exceptions import FieldDoesNotExist
+
+
+def get_model_field(model, name):
+    """Gets a model field by attribute name.
+
+    Unlike `Options.get_field`, reverse relations are looked up by their
+    accessor name (e.g. `rounds`) rather than their query name (`round`).
+
+    Raises:
+        FieldDoesNotExist: If the model has no field with the name.
+    """
+
+    for field in model._meta.get_fields():
+        if field.auto_created and not field.concrete and field.is_relation:
+            if field.get_accessor_name() == name:
+                return field
+        elif field.name == name:
+            return field
+    raise FieldDoesNotExist(f"{model.__name__} has no field named '{name}'")
@@ -0,0 +1,52 @@
+from typing import Optional
+
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+def get_viewer_queryset():
+    """Gets the users joined with their member profile and Slack user"""
+
+    return User.objects.select_related("member__slack_user")
+
+
+def get_user_by_natural_key(username: str) -> Optional[User]:
+    """Gets the user authenticated by a JWT, along with their member profile.
+
+    Replaces the handler of django-graphql-jwt, so that the user it loads
+    serves as the viewer of the request without querying it again.
+    """
+
+    try:
+        return get_viewer_queryset().get(**{User.USERNAME_FIELD: username})
+    except User.DoesNotExist:
+        return None
+
+
+def _is_joined(user) -> bool:
+    return User.member.related.is_cached(user)
+
+
+def get_viewer(info) -> Optional[User]:
+    """Gets the user making a request, loaded once for the request.
+
+    The viewer is loaded with their member profile and Slack user in one
+    joined query, and shared by every resolver and mutation of the request,
+    including the other operations of a batch. Users authenticated by a JWT
+    are loaded that way already, so no query is made for them.
+
+    Returns:
+        The user, or None if the request is anonymous.
+    """
+
+    context = info.context
+    user = context.user
+    if not user.is_authenticated:
+        return None
+    viewer = getattr(context, "viewer", None)
+    if viewer is not None and viewer.pk == user.pk:
+        return viewer
+    viewer = user if _is_joined(user) else get_viewer_queryset().get(pk=user.pk)
+    context.viewer = viewer
+    return viewer
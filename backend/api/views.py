@@ -0,0 +1,255 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag, require_safe
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView, HttpError
+
+from common.side_effects import defer_side_effects, schedule_side_effects
+from . import cache
+from .choices import get_choices_bundle
+from .documents import (
+    PERSISTED_QUERY_NOT_FOUND,
+    PersistedQueryError,
+    get_document_backend,
+    get_persisted_query_hash,
+    hash_query,
+    resolve_persisted_query,
+)
+from .loaders import clear_loaders
+from .sql import sql_requested
+from .tracing import tracing_requested
+
+CACHE_STATUS_HEADER = "X-Response-Cache"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+class HubGraphQLView(GraphQLView):
+    """The GraphQL view of the API.
+
+    Operations may be sent in batches and as persisted queries, and documents
+    are parsed and validated only once. Responses are served from the cache
+    where possible, and the time spent in each phase is reported in a
+    Server-Timing header.
+
+    Cacheable queries sent with GET are tagged with an ETag, and revalidating
+    them with If-None-Match is answered with an empty 304 response without
+    executing the query while show data is unchanged.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if kwargs.get("backend") is None:
+            kwargs["backend"] = get_document_backend()
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def as_async_view(cls, **initkwargs):
+        """Creates the view served by the ASGI application.
+
+        Operations are executed in the thread of their request, while the
+        Slack and email calls of mutations are deferred until the response is
+        sent, and run in the background without holding up the request.
+        """
+
+        view = cls.as_view(**initkwargs)
+
+        @wraps(view)
+        async def async_view(request, *args, **kwargs):
+            with defer_side_effects() as side_effects:
+                response = await sync_to_async(view)(request, *args, **kwargs)
+            if side_effects:
+                schedule_side_effects(side_effects)
+            return response
+
+        return async_view
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        etag = getattr(request, "response_etag", None)
+        if etag is not None and response.status_code in (200, 304):
+            if response.status_code == 304:
+                response = HttpResponseNotModified()
+            response["ETag"] = etag
+            patch_cache_control(response, no_cache=True, private=True)
+            patch_vary_headers(response, ["Authorization"])
+        cache_status = getattr(request, "response_cache_status", None)
+        if cache_status is not None:
+            response[CACHE_STATUS_HEADER] = cache_status
+        timings = getattr(request, "graphql_timings", None)
+        if timings:
+            response[SERVER_TIMING_HEADER] = ", ".join(
+                f"{phase};dur={duration * 1000:.3f}"
+                for phase, duration in timings.items()
+            )
+        return response
+
+    def resolve_persisted_query(self, request, data):
+        """Replaces the query of a persisted query request with its text"""
+
+        query = request.GET.get("query") or data.get("query")
+        query_hash = get_persisted_query_hash(
+            request.GET.get("extensions") or data.get("extensions")
+        )
+        query = resolve_persisted_query(self.backend, self.schema, query, query_hash)
+        if query is None:
+            return data
+        return {**{k: data.get(k) for k in data.keys()}, "query": query}
+
+    def parse_body(self, request):
+        """Parses the body of a request, which may be a batch of operations.
+
+        A JSON array of operations is executed as a batch, sharing the data
+        loaders and authentication of the request, and its results are
+        returned in the same order.
+        """
+
+        if self.get_content_type(request) == "application/json":
+            self.batch = request.body.lstrip().startswith(b"[")
+        data = super().parse_body(request)
+        if self.batch:
+            max_size = getattr(settings, "GRAPHQL_MAX_BATCH_SIZE", None)
+            if max_size is not None and len(data) > max_size:
+                raise HttpError(
+                    HttpResponseBadRequest(
+                        f"Batches are limited to {max_size} operations."
+                    )
+                )
+            if not all(isinstance(entry, dict) for entry in data):
+                raise HttpError(
+                    HttpResponseBadRequest("Batched operations must be objects.")
+                )
+        return data
+
+    def get_response(self, request, data, show_graphiql=False):
+        # Operations of a batch add to the timings of the request
+        request.graphql_timings = self.backend.start_timing(
+            getattr(request, "graphql_timings", None)
+        )
+        try:
+            data = self.resolve_persisted_query(request, data)
+        except PersistedQueryError as e:
+            status_code = (
+                200 if e.extensions["code"] == PERSISTED_QUERY_NOT_FOUND else 400
+            )
+            response = {"errors": [self.format_error(e)]}
+            if self.batch:
+                response["id"] = data.get("id")
+                response["status"] = status_code
+            return self.json_encode(request, response), status_code
+
+        key = None
+        # Operations are executed when their trace or SQL queries are requested
+        debug = tracing_requested(request) or sql_requested(request)
+        if not (show_graphiql or self.batch or debug):
+            key = self.get_cache_key(request, data)
+
+        if key is not None and request.method == "GET":
+            request.response_etag = cache.get_etag(key)
+            if_none_match = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+            if request.response_etag in if_none_match:
+                request.response_cache_status = "not-modified"
+                return "", 304
+
+        if key is not None:
+            cached = cache.get_response(key)
+            if cached is not None:
+                request.response_cache_status = "hit"
+                return cached
+            request.response_cache_status = "miss"
+
+        result, status_code, cacheable = self.execute_response(
+            request, data, show_graphiql
+        )
+
+        if key is not None and status_code == 200 and cacheable:
+            cache.set_response(key, (result, status_code))
+        elif not cacheable:
+            request.response_etag = None
+        return result, status_code
+
+    def get_cache_key(self, request, data):
+        """Gets the key of the cached response to an operation, if cacheable.
+
+        The key is built from the document the backend stores for the query,
+        so that the query is only parsed once, when it is first seen.
+        """
+
+        query, variables, operation_name, _ = self.get_graphql_params(request, data)
+        if not query:
+            return None
+        try:
+            document = self.backend.document_from_string(self.schema, query)
+        except Exception:
+            # Documents that cannot be parsed are reported once executed
+            return None
+        return cache.get_cache_key(request, document, variables, operation_name)
+
+    def execute_response(self, request, data, show_graphiql=False):
+        """Executes an operation, encoding its result with its extensions.
+
+        Returns:
+            A tuple of the encoded result, the status code and whether the
+            result may be cached, being free of errors, traces and SQL queries.
+        """
+
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        if not execution_result:
+            return None, 200, False
+
+        # Data loaded before a mutation is stale for the rest of the batch
+        if self.batch and self.get_operation_type(query, operation_name) == "mutation":
+            clear_loaders(request)
+
+        status_code = 200
+        response = {}
+        if execution_result.errors:
+            set_rollback()
+            response["errors"] = [self.format_error(e) for e in execution_result.errors]
+        if execution_result.invalid:
+            status_code = 400
+        else:
+            response["data"] = execution_result.data
+        if execution_result.extensions:
+            response["extensions"] = execution_result.extensions
+        if self.batch:
+            response["id"] = id
+            response["status"] = status_code
+
+        result = self.json_encode(request, response, pretty=show_graphiql)
+        cacheable = not (
+            execution_result.errors
+            or "tracing" in execution_result.extensions
+            or "sql" in execution_result.extensions
+        )
+        return result, status_code, cacheable
+
+    def get_operation_type(self, query, operation_name):
+        document = self.backend.get_document(self.schema, hash_query(query))
+        return document.get_operation_type(operation_name) if document else None
+
+
+@require_safe
+@cache_control(public=True, no_cache=True)
+@etag(lambda request: get_choices_bundle().etag)
+def choices_view(request):
+    """Serves the choices of every model field.
+
+    Browsers keep the response and revalidate it with its ETag, which is
+    answered with an empty 304 response until the choices change.
+    """
+
+    return HttpResponse(get_choices_bundle().content, content_type="application/json")
@@ -0,0 +1,305 @@
+import asyncio
+import json
+import logging
+from functools import partial
+from typing import Dict, List, Optional
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db import close_old_connections
+from graphene_django.views import GraphQLView
+from graphql import GraphQLError
+from graphql.execution import ExecutionResult, execute
+from graphql.language.parser import parse
+from graphql.validation import validate
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql_jwt.settings import jwt_settings
+from promise import is_thenable
+from rx.subjects import Subject
+
+from shows.events import Event, broker
+from .auth import get_user_by_token
+from .complexity import (
+    QueryComplexityError,
+    analyze_query,
+    check_complexity,
+    get_operation,
+)
+from .loaders import clear_loaders
+from .schema import schema
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL = "graphql-transport-ws"
+
+CLOSE_INVALID_MESSAGE = 4400
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+CLOSE_SUBPROTOCOL_NOT_ACCEPTABLE = 4406
+CLOSE_SUBSCRIBER_EXISTS = 4409
+CLOSE_TOO_MANY_INITIALISATION_REQUESTS = 4429
+
+
+class SubscriptionContext:
+    """The context of the subscriptions of a connection, in place of a request.
+
+    Attributes:
+        user: The user authenticated by the connection, if any.
+        events: The events delivered to the connection, observed by the
+            resolvers of its subscriptions.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.events = Subject()
+        self.META = {}
+        self.loaders = None
+
+
+class _Close(Exception):
+    def __init__(self, code: int):
+        super().__init__(code)
+        self.code = code
+
+
+def _format_errors(errors) -> List[Dict]:
+    return [GraphQLView.format_error(e) for e in errors]
+
+
+def _format_result(result: ExecutionResult) -> Dict:
+    payload = {"data": result.data}
+    if result.errors:
+        payload["errors"] = _format_errors(result.errors)
+    return payload
+
+
+class GraphQLWebSocket:
+    """A WebSocket connection serving subscriptions with graphql-transport-ws.
+
+    The connection is authenticated by the JWT in the `authorization` field of
+    its `connection_init` payload, and anonymous otherwise. The events
+    published by this process are queued for the connection, and each event
+    resolves the selections of every subscription it matches.
+
+    The database is only accessed in the thread of the connection, one
+    message or event at a time.
+    """
+
+    def __init__(self, scope, receive, send):
+        self.scope = scope
+        self.receive = receive
+        self.send = send
+        self.context: Optional[SubscriptionContext] = None
+        self.subscriptions = {}
+        self.events = asyncio.Queue()
+        self.outgoing = []
+
+    @classmethod
+    async def as_asgi(cls, scope, receive, send):
+        await cls(scope, receive, send).run()
+
+    async def run(self):
+        message = await self.receive()
+        if message["type"] != "websocket.connect":
+            return
+        if PROTOCOL not in self.scope.get("subprotocols", []):
+            await self.send(
+                {"type": "websocket.close", "code": CLOSE_SUBPROTOCOL_NOT_ACCEPTABLE}
+            )
+            return
+        await self.send({"type": "websocket.accept", "subprotocol": PROTOCOL})
+
+        loop = asyncio.get_running_loop()
+        unsubscribe = broker.subscribe(
+            lambda event: loop.call_soon_threadsafe(self.events.put_nowait, event)
+        )
+        # Sync work of the connection runs in a thread of its own
+        async with ThreadSensitiveContext():
+            pump = asyncio.create_task(self.pump_events())
+            try:
+                await self.receive_messages()
+            except _Close as e:
+                await self.send({"type": "websocket.close", "code": e.code})
+            finally:
+                unsubscribe()
+                pump.cancel()
+                await sync_to_async(self.dispose)()
+
+    async def receive_messages(self):
+        while True:
+            message = await self.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message["type"] == "websocket.receive":
+                await self.handle(message.get("text"))
+
+    async def pump_events(self):
+        while True:
+            event = await self.events.get()
+            if self.subscriptions:
+                await self.send_all(await sync_to_async(self.dispatch)(event))
+
+    async def send_json(self, message: Dict):
+        await self.send({"type": "websocket.send", "text": json.dumps(message)})
+
+    async def send_all(self, messages: List[Dict]):
+        for message in messages:
+            await self.send_json(message)
+
+    async def handle(self, text: Optional[str]):
+        try:
+            message = json.loads(text or "")
+        except ValueError:
+            raise _Close(CLOSE_INVALID_MESSAGE)
+        if not isinstance(message, dict):
+            raise _Close(CLOSE_INVALID_MESSAGE)
+
+        message_type = message.get("type")
+        if message_type == "connection_init":
+            if self.context is not None:
+                raise _Close(CLOSE_TOO_MANY_INITIALISATION_REQUESTS)
+            user = await sync_to_async(self.authenticate)(message.get("payload"))
+            if user is None:
+                raise _Close(CLOSE_FORBIDDEN)
+            self.context = SubscriptionContext(user)
+            await self.send_json({"type": "connection_ack"})
+        elif message_type == "ping":
+            await self.send_json({"type": "pong"})
+        elif message_type == "pong":
+            pass
+        elif message_type == "subscribe":
+            if self.context is None:
+                raise _Close(CLOSE_UNAUTHORIZED)
+            subscription_id = message.get("id")
+            if not isinstance(subscription_id, str):
+                raise _Close(CLOSE_INVALID_MESSAGE)
+            if subscription_id in self.subscriptions:
+                raise _Close(CLOSE_SUBSCRIBER_EXISTS)
+            await self.send_all(
+                await sync_to_async(self.subscribe)(
+                    subscription_id, message.get("payload") or {}
+                )
+            )
+        elif message_type == "complete":
+            await sync_to_async(self.complete)(message.get("id"))
+        else:
+            raise _Close(CLOSE_INVALID_MESSAGE)
+
+    @staticmethod
+    def authenticate(payload: Optional[Dict]):
+        """Gets the user of a connection, or None if its token is invalid"""
+
+        authorization = (payload or {}).get("authorization")
+        if not authorization:
+            return AnonymousUser()
+        prefix, _, token = authorization.partition(" ")
+        if prefix != jwt_settings.JWT_AUTH_HEADER_PREFIX:
+            return None
+        try:
+            return get_user_by_token(token)
+        except JSONWebTokenError:
+            return None
+
+    def subscribe(self, subscription_id: str, payload: Dict) -> List[Dict]:
+        """Starts a subscription, returning the messages to send back"""
+
+        def error(errors):
+            return [
+                {
+                    "id": subscription_id,
+                    "type": "error",
+                    "payload": _format_errors(errors),
+                }
+            ]
+
+        operation_name = payload.get("operationName")
+        variables = payload.get("variables") or {}
+        try:
+            document_ast = parse(payload.get("query") or "")
+        except GraphQLError as e:
+            return error([e])
+        errors = validate(schema, document_ast)
+        if errors:
+            return error(errors)
+
+        operation = get_operation(document_ast, operation_name)
+        if operation is None or operation.operation != "subscription":
+            return error(
+                [GraphQLError("Only subscriptions are served over WebSockets.")]
+            )
+        try:
+            complexity = analyze_query(schema, document_ast, operation_name, variables)
+            check_complexity(complexity)
+        except QueryComplexityError as e:
+            return error([e])
+
+        try:
+            result = execute(
+                schema,
+                document_ast,
+                context_value=self.context,
+                variable_values=variables,
+                operation_name=operation_name,
+                allow_subscriptions=True,
+            )
+        finally:
+            close_old_connections()
+        if isinstance(result, ExecutionResult):
+            return error(result.errors or [])
+
+        self.subscriptions[subscription_id] = result.subscribe(
+            on_next=partial(self.on_next, subscription_id),
+            on_error=partial(self.on_error, subscription_id),
+            on_completed=partial(self.on_completed, subscription_id),
+        )
+        return []
+
+    def dispatch(self, event: Event) -> List[Dict]:
+        """Delivers an event to the subscriptions, returning their results"""
+
+        clear_loaders(self.context)
+        try:
+            self.context.events.on_next(event)
+        finally:
+            close_old_connections()
+        messages, self.outgoing = self.outgoing, []
+        return messages
+
+    def on_next(self, subscription_id: str, result: ExecutionResult):
+        # Selections loaded in batches resolve to promises
+        if result.data:
+            result.data = {
+                key: value.get() if is_thenable(value) else value
+                for key, value in result.data.items()
+            }
+        self.outgoing.append(
+            {"id": subscription_id, "type": "next", "payload": _format_result(result)}
+        )
+
+    def on_error(self, subscription_id: str, error: Exception):
+        logger.exception("Subscription %s failed", subscription_id, exc_info=error)
+        self.subscriptions.pop(subscription_id, None)
+        self.outgoing.append(
+            {
+                "id": subscription_id,
+                "type": "error",
+                "payload": _format_errors([error]),
+            }
+        )
+
+    def on_completed(self, subscription_id: str):
+        self.subscriptions.pop(subscription_id, None)
+        self.outgoing.append({"id": subscription_id, "type": "complete"})
+
+    def complete(self, subscription_id: Optional[str]):
+        """Stops a subscription at the request of the client"""
+
+        subscription = self.subscriptions.pop(subscription_id, None)
+        if subscription is not None:
+            subscription.dispose()
+
+    def dispose(self):
+        for subscription in self.subscriptions.values():
+            subscription.dispose()
+        self.subscriptions.clear()
+        close_old_connections()
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Callable, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_deferred: ContextVar[Optional[List[Callable]]] = ContextVar(
+    "deferred_side_effects", default=None
+)
+_tasks = set()
+
+
+def run_or_defer(func: Callable, *args, **kwargs):
+    """Runs a slow side effect, such as a Slack or email call.
+
+    The side effect is run immediately, unless side effects are being
+    deferred, in which case it is queued to be run once the response has been
+    sent, and None is returned.
+    """
+
+    deferred = _deferred.get()
+    if deferred is None:
+        return func(*args, **kwargs)
+    deferred.append(partial(func, *args, **kwargs))
+    return None
+
+
+@contextmanager
+def defer_side_effects():
+    """Defers the side effects run within the context to the yielded list"""
+
+    deferred = []
+    token = _deferred.set(deferred)
+    try:
+        yield deferred
+    finally:
+        _deferred.reset(token)
+
+
+def run_side_effects(side_effects: List[Callable]) -> None:
+    """Runs deferred side effects, logging rather than raising their errors"""
+
+    for side_effect in side_effects:
+        try:
+            side_effect()
+        except Exception:
+            logger.exception("Deferred side effect %r failed", side_effect)
+
+
+def _run_side_effects_in_thread(side_effects: List[Callable]) -> None:
+    try:
+        run_side_effects(side_effects)
+    finally:
+        # The thread is not a request thread, so nothing else closes its
+        # database connection
+        close_old_connections()
+
+
+def schedule_side_effects(side_effects: List[Callable]) -> asyncio.Task:
+    """Runs deferred side effects in the background of the running event loop.
+
+    The side effects are run in a thread of their own, so that the event loop
+    and the request that deferred them are not held up while they wait on
+    Slack or the mail server.
+    """
+
+    task = asyncio.create_task(
+        sync_to_async(_run_side_effects_in_thread, thread_sensitive=False)(side_effects)
+    )
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+async def wait_for_side_effects() -> None:
+    """Waits for the scheduled side effects to finish"""
+
+    await asyncio.gather(*_tasks)
@@ -0,0 +1,29 @@
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+
+from common.side_effects import defer_side_effects, run_or_defer, run_side_effects
+
+
+class TestSideEffects(SimpleTestCase):
+    def test_side_effects_run_immediately(self):
+        side_effect = MagicMock(return_value=1)
+        self.assertEqual(run_or_defer(side_effect, 2, key=3), 1)
+        side_effect.assert_called_once_with(2, key=3)
+
+    def test_side_effects_are_deferred(self):
+        side_effect = MagicMock()
+        with defer_side_effects() as side_effects:
+            self.assertIsNone(run_or_defer(side_effect, 2, key=3))
+        side_effect.assert_not_called()
+
+        run_side_effects(side_effects)
+        side_effect.assert_called_once_with(2, key=3)
+        run_or_defer(side_effect)
+        self.assertEqual(side_effect.call_count, 2)
+
+    def test_failed_side_effects_are_logged(self):
+        failing, succeeding = MagicMock(side_effect=ValueError), MagicMock()
+        with self.assertLogs("common.side_effects", "ERROR"):
+            run_side_effects([failing, succeeding])
+        succeeding.assert_called_once()
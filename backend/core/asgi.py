@@ -2,6 +2,8 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests are routed with ``core.asgi_urls``, which serves the GraphQL API
+asynchronously, and GraphQL subscriptions are served over WebSockets.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
@@ -9,8 +11,28 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.dev")
 
-application = get_asgi_application()
+ASGI_URLCONF = "core.asgi_urls"
+GRAPHQL_WEBSOCKET_PATH = "/graphql/"
+
+
+class HubASGIHandler(ASGIHandler):
+    async def get_response_async(self, request):
+        request.urlconf = ASGI_URLCONF
+        return await super().get_response_async(request)
+
+
+django.setup(set_prefix=False)
+django_application = HubASGIHandler()
+
+from api.websocket import GraphQLWebSocket  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket" and scope["path"] == GRAPHQL_WEBSOCKET_PATH:
+        return await GraphQLWebSocket.as_asgi(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,13 @@
+from django.urls import path
+
+from api.views import HubGraphQLView
+from core.urls import urlpatterns as wsgi_urlpatterns
+
+graphql_view = HubGraphQLView.as_async_view(graphiql=True)
+# csrf_exempt would wrap the view in a synchronous function
+graphql_view.csrf_exempt = True
+
+urlpatterns = [
+    path("graphql/", graphql_view),
+    *wsgi_urlpatterns,
+]
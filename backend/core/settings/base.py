@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/4.0/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
+
 import os
 from datetime import timedelta
 
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "graphene_django",
     "graphql_jwt.refresh_token.apps.RefreshTokenConfig",
+    "api.apps.ApiConfig",
     "users.apps.UsersConfig",
     "shows.apps.ShowsConfig",
     "slack.apps.SlackConfig",
@@ -56,13 +58,53 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+# Responses to queries selecting only these root fields are cached
+GRAPHQL_RESPONSE_CACHE_FIELDS = ["shows"]
+GRAPHQL_RESPONSE_CACHE_TIMEOUT = 60 * 60
+
+# Parsed and validated documents are kept by the SHA-256 hash of their text,
+# which clients may send in place of the text as a persisted query
+GRAPHQL_DOCUMENT_CACHE_SIZE = 1000
+# Document cache hit ratio and phase timings are logged at this interval
+GRAPHQL_DOCUMENT_STATS_LOG_INTERVAL = 1000
+GRAPHQL_PERSISTED_QUERY_MANIFEST = env("GRAPHQL_PERSISTED_QUERY_MANIFEST", default=None)
+GRAPHQL_PERSISTED_QUERIES_ONLY = env.bool(
+    "GRAPHQL_PERSISTED_QUERIES_ONLY", default=False
+)
+
+# Operations are rejected before execution when deeper or costlier than this,
+# counting one per object resolved and assuming unpaginated lists of this size
+GRAPHQL_MAX_DEPTH = 10
+GRAPHQL_MAX_COST = 10000
+GRAPHQL_LIST_SIZE_ESTIMATE = 10
+GRAPHQL_MAX_BATCH_SIZE = 10
+
+# Shows removed are reported to delta syncs by tombstones kept for this many
+# seconds, so syncs last run before then must start over without a cursor
+SHOW_TOMBSTONE_RETENTION = 30 * 24 * 60 * 60
+
+# Traces of the time and SQL queries of each resolver are logged for this
+# fraction of operations, and returned in extensions.tracing if enabled
+GRAPHQL_TRACING_SAMPLE_RATE = env.float("GRAPHQL_TRACING_SAMPLE_RATE", default=0.0)
+GRAPHQL_TRACING_IN_EXTENSIONS = False
+
 GRAPHENE = {
     "SCHEMA": "api.schema.schema",
     "MIDDLEWARE": [
-        "graphql_jwt.middleware.JSONWebTokenMiddleware",
+        "api.auth.JSONWebTokenMiddleware",
+        "api.tracing.TracingMiddleware",
     ],
 }
 
+# Users verified for a token are remembered by each process for this many
+# seconds, or not at all if 0, so that the token is not decoded again
+GRAPHQL_TOKEN_CACHE_TIMEOUT = env.int("GRAPHQL_TOKEN_CACHE_TIMEOUT", default=0)
+GRAPHQL_TOKEN_CACHE_SIZE = 1000
+
 AUTHENTICATION_BACKENDS = [
     "graphql_jwt.backends.JSONWebTokenBackend",
     "users.backends.CustomAuthBackend",
@@ -73,6 +115,8 @@ GRAPHQL_JWT = {
     "JWT_LONG_RUNNING_REFRESH_TOKEN": True,
     "JWT_EXPIRATION_DELTA": timedelta(minutes=5),
     "JWT_REFRESH_EXPIRATION_DELTA": timedelta(days=7),
+    # Loads the member profile and Slack user of the viewer with the user
+    "JWT_GET_USER_BY_NATURAL_KEY_HANDLER": "api.viewer.get_user_by_natural_key",
 }
 
 ROOT_URLCONF = "core.urls"
@@ -174,6 +218,38 @@ PASSWORD_RESET_TIMEOUT_DAYS = 1
 
 SLACK_TOKEN = env("SLACK_TOKEN", default=None)
 
+# Calls to Slack wait this many seconds at most for their turn under the rate
+# limit of their method, and are retried this many times if rate limited
+SLACK_RATE_LIMIT_MAX_WAIT = 30
+SLACK_RATE_LIMIT_MAX_RETRIES = 3
+
+# Slack side effects of model changes are queued in the database, in the same
+# transaction as the change, for the slack_worker command to run, instead of
+# being run by the request making the change
+SLACK_OUTBOX_ENABLED = env.bool("SLACK_OUTBOX_ENABLED", default=False)
+SLACK_WORKER_CONCURRENCY = env.int("SLACK_WORKER_CONCURRENCY", default=4)
+# Failed tasks are retried after this many seconds, doubled after every
+# attempt up to the maximum, until they have been attempted this many times
+SLACK_OUTBOX_RETRY_DELAY = 10
+SLACK_OUTBOX_MAX_RETRY_DELAY = 60 * 60
+SLACK_OUTBOX_MAX_ATTEMPTS = 8
+# Changes to a show made within this many seconds of each other update its
+# Slack channel once, though no later than the maximum after the first change
+SLACK_OUTBOX_DEBOUNCE = 10
+SLACK_OUTBOX_MAX_DEBOUNCE = 60
+# Tasks still running after this many seconds are run again by another worker
+SLACK_OUTBOX_LEASE = 5 * 60
+# Tasks that are done are deleted after this many seconds
+SLACK_OUTBOX_RETENTION = 7 * 24 * 60 * 60
+# The Slack users of members are synced with the workspace directory by the
+# slack_worker command every this many seconds, or never if 0
+SLACK_DIRECTORY_SYNC_INTERVAL = env.int(
+    "SLACK_DIRECTORY_SYNC_INTERVAL", default=6 * 60 * 60
+)
+# Members Slack has no user for are not looked up again for this many seconds,
+# unless their email address changes or the directory sync finds them
+SLACK_MISSING_USER_TTL = 24 * 60 * 60
+
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_USE_TLS = True
@@ -9,6 +9,8 @@ from core.settings.base import *
 
 DEBUG = True
 
+GRAPHQL_TRACING_IN_EXTENSIONS = True
+
 ALLOWED_HOSTS = ["backend", "localhost", "127.0.0.1"]
 
 if os.environ.get("DEVELOPMENT_DATABASE") == "postgres":
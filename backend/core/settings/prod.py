@@ -27,3 +27,5 @@ db_from_env = dj_database_url.config(
     default=DATABASE_URL, conn_max_age=0, ssl_require=True
 )
 DATABASES["default"].update(db_from_env)
+
+SLACK_OUTBOX_ENABLED = env.bool("SLACK_OUTBOX_ENABLED", default=True)
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
 from shows.models import Show, Round, Member, Contact, Role
+from slack.admin import archive, force_refresh
+from slack.models import SlackChannel
 
 
 class RoundInlineAdmin(admin.TabularInline):
@@ -13,16 +15,12 @@ class RoleInlineAdmin(admin.TabularInline):
 
 @admin.action(description="Refresh show Slack channels")
 def refresh_channels(modeladmin, request, queryset):
-    for show in queryset:
-        if show.has_slack_channel:
-            show.channel.force_refresh()
+    force_refresh(modeladmin, request, SlackChannel.objects.filter(show__in=queryset))
 
 
 @admin.action(description="Archive show Slack channels")
 def archive_channels(modeladmin, request, queryset):
-    for show in queryset:
-        if show.has_slack_channel:
-            show.channel.archive(rename=False)
+    archive(modeladmin, request, SlackChannel.objects.filter(show__in=queryset))
 
 
 class ShowAdmin(admin.ModelAdmin):
@@ -53,6 +51,9 @@ class ShowAdmin(admin.ModelAdmin):
 
     actions = [refresh_channels, archive_channels]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_roster_counts()
+
 
 class MemberAdmin(admin.ModelAdmin):
     list_display = [
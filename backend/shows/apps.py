@@ -8,3 +8,4 @@ class ShowsConfig(AppConfig):
 
     def ready(self):
         import shows.signals.handlers  # noqa
+        import shows.tasks  # noqa
@@ -0,0 +1,32 @@
+from django.db import transaction
+
+from shows.models import ShowsVersion
+
+
+def get_shows_version() -> int:
+    """Gets the version stamp of show data.
+
+    The version changes whenever a show, or anything displayed with a show,
+    is saved or deleted. It is persisted in the database, so that every
+    process reads the same version whatever their cache.
+    """
+
+    return ShowsVersion.objects.get_version()
+
+
+def bump_shows_version() -> None:
+    """Changes the version stamp of show data, invalidating cached responses"""
+
+    ShowsVersion.objects.bump()
+
+
+def bump_shows_version_on_commit() -> None:
+    """Changes the version stamp of show data once the current transaction
+    commits.
+
+    Bumping the version before the change is committed would let a request
+    missing the cache meanwhile store the data from before the change under
+    the new version, where it would stay until it expires.
+    """
+
+    transaction.on_commit(bump_shows_version)
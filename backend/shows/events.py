@@ -0,0 +1,62 @@
+import logging
+import threading
+from typing import Callable, NamedTuple, Optional
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+SHOW_UPDATED = "show_updated"
+ROSTER_CHANGED = "roster_changed"
+
+
+class Event(NamedTuple):
+    """A change to a show, or to its roster if a member joined or left it"""
+
+    kind: str
+    show_id: int
+    member_id: Optional[int] = None
+    joined: Optional[bool] = None
+
+
+class Broker:
+    """Delivers the events of this process to their subscribers.
+
+    Subscribers are called in the thread publishing the event, so they should
+    only hand the event over, such as to the queue of a WebSocket connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def subscribe(self, callback: Callable[[Event], None]) -> Callable[[], None]:
+        """Subscribes to events, returning a function to unsubscribe"""
+
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def publish(self, event: Event) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Subscriber %r failed to receive %r", callback, event)
+
+
+broker = Broker()
+
+
+def publish_on_commit(event: Event) -> None:
+    """Publishes an event once the current transaction, if any, is committed"""
+
+    transaction.on_commit(lambda: broker.publish(event))
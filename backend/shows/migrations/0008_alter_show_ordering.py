@@ -0,0 +1,17 @@
+# Generated by Django 4.1.2 on 2026-10-18 04:46
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shows", "0007_alter_show_payment_method_alter_show_rate"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="show",
+            options={"ordering": ["date", "time", "id"]},
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.2 on 2026-10-18 04:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shows", "0008_alter_show_ordering"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="show",
+            index=models.Index(
+                fields=["status", "date", "time"], name="show_status_date_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="show",
+            index=models.Index(
+                fields=["date", "time", "id"], name="show_date_time_id_idx"
+            ),
+        ),
+    ]
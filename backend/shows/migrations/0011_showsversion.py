@@ -0,0 +1,34 @@
+# Generated by Django 4.1.2 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+def create_shows_version(apps, schema_editor):
+    ShowsVersion = apps.get_model("shows", "ShowsVersion")
+    ShowsVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shows", "0010_updated_at_showtombstone"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShowsVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_shows_version, migrations.RunPython.noop),
+    ]
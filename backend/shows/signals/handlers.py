@@ -1,10 +1,12 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_save, post_delete, pre_save, m2m_changed
 from django.dispatch import receiver
+from django.utils import timezone
 
 from common.decorators import disable_for_loaddata
-from shows.models import Member, Round, Show
+from shows.cache import bump_shows_version_on_commit
+from shows.models import Member, Round, Show, Role, Contact, ShowTombstone
 from users.signals.signals import user_activated
 
 User = get_user_model()
@@ -23,6 +25,26 @@ def update_show_time(sender, instance, **kwargs):
     instance.show.save()
 
 
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def touch_show_for_role(sender, instance, **kwargs):
+    # Updated without saving the show, which would update its Slack channel
+    Show.objects.filter(pk=instance.show_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Contact)
+def touch_shows_for_contact(sender, instance, **kwargs):
+    Show.objects.filter(contact=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Show)
+def create_show_tombstone(sender, instance, **kwargs):
+    # Show.delete unpublishes the show first, which records its tombstone, so
+    # this only records published shows deleted in bulk. Drafts never synced.
+    if instance.status > Show.STATUSES.draft:
+        ShowTombstone.objects.record(instance.pk)
+
+
 @receiver(post_delete, sender=Member)
 def delete_user_for_member(sender, instance, **kwargs):
     try:
@@ -35,3 +57,20 @@ def delete_user_for_member(sender, instance, **kwargs):
 @disable_for_loaddata
 def clean_show(sender, instance, **kwargs):
     instance.full_clean()
+
+
+@receiver(post_save, sender=Show)
+@receiver(post_delete, sender=Show)
+@receiver(post_save, sender=Round)
+@receiver(post_delete, sender=Round)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(m2m_changed, sender=Show.performers.through)
+def invalidate_shows_cache(sender, **kwargs):
+    bump_shows_version_on_commit()
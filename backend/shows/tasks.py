@@ -0,0 +1,45 @@
+from typing import List
+
+from shows.models import Member, Show
+from slack.models import SlackChannel
+from slack.outbox import slack_task
+
+
+def _get_member(member_id: int):
+    return (
+        Member.objects.select_related("user", "slack_user", "missing_slack_user")
+        .filter(pk=member_id)
+        .first()
+    )
+
+
+@slack_task("fetch_slack_user")
+def fetch_slack_user(member_id: int, refresh: bool = False):
+    member = _get_member(member_id)
+    if member is not None:
+        member.fetch_slack_user(refresh=refresh)
+
+
+@slack_task("sync_show_channel")
+def sync_show_channel(show_id: int, updated_fields: List[str]):
+    show = Show.objects.filter(pk=show_id, status__gt=Show.STATUSES.draft).first()
+    if show is not None:
+        show.sync_slack_channel(updated_fields)
+
+
+@slack_task("join_slack_channels")
+def join_slack_channels(member_id: int, channel_ids: List[str]):
+    member = _get_member(member_id)
+    if member is not None:
+        member.join_slack_channels(
+            list(SlackChannel.objects.filter(pk__in=channel_ids, archived=False))
+        )
+
+
+@slack_task("leave_slack_channels")
+def leave_slack_channels(member_id: int, channel_ids: List[str]):
+    member = _get_member(member_id)
+    if member is not None:
+        member.leave_slack_channels(
+            list(SlackChannel.objects.filter(pk__in=channel_ids, archived=False))
+        )
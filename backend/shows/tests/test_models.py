@@ -159,6 +159,22 @@ class TestShowModel(PatchSlackBossMixin, TestCase):
         self.show.status = self.show.STATUSES.closed
         self.assertFalse(self.show.is_open())
 
+    def test_roster_counts(self):
+        for lions, spots_remaining in [(None, None), (0, 0), (1, 1), (2, 3)]:
+            Show.objects.filter(pk=self.show.pk).update(lions=lions)
+            show = Show.objects.get(pk=self.show.pk)
+            annotated_show = Show.objects.with_roster_counts().get(pk=self.show.pk)
+            with self.assertNumQueries(0):
+                self.assertEqual(annotated_show.performer_count(), len(self.members))
+                self.assertEqual(annotated_show.spots_remaining(), spots_remaining)
+            self.assertEqual(show.spots_remaining(), spots_remaining)
+
+    def test_viewer_is_performer(self):
+        other_user = User.objects.create(**fake_user_data(Faker()))
+        for user, is_performer in [(self.users[0], True), (other_user, False)]:
+            show = Show.objects.with_viewer_is_performer(user).get(pk=self.show.pk)
+            self.assertEqual(show.viewer_is_performer, is_performer)
+
 
 class TestContactModel(TestCase):
     contact: Contact
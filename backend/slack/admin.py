@@ -1,6 +1,10 @@
+from functools import partial
+
 from django.contrib import admin
+from django.utils import timezone
 
-from slack.models import SlackUser, SlackChannel
+from slack.models import SlackUser, MissingSlackUser, SlackChannel, SlackTask
+from slack.outbox import enqueue_slack_task
 
 
 class SlackUserAdmin(admin.ModelAdmin):
@@ -8,16 +12,44 @@ class SlackUserAdmin(admin.ModelAdmin):
     list_display = ["id", "member"]
 
 
+@admin.action(description="Look up in Slack again")
+def look_up_again(modeladmin, request, queryset):
+    for missing_slack_user in queryset.select_related("member__user"):
+        member = missing_slack_user.member
+        enqueue_slack_task(
+            "fetch_slack_user",
+            {"member_id": member.pk, "refresh": True},
+            run=partial(member.fetch_slack_user, refresh=True),
+            ordering_key=f"member:{member.pk}",
+        )
+
+
+class MissingSlackUserAdmin(admin.ModelAdmin):
+    readonly_fields = ["member", "email", "checked_at"]
+    list_display = ["member", "email", "checked_at"]
+    actions = [look_up_again]
+
+
 @admin.action(description="Refresh Slack channels")
 def force_refresh(modeladmin, request, queryset):
     for slack_channel in queryset:
-        slack_channel.force_refresh()
+        enqueue_slack_task(
+            "refresh_slack_channel",
+            {"channel_id": slack_channel.id},
+            ordering_key=f"show:{slack_channel.show_id}",
+        )
 
 
 @admin.action(description="Archive Slack channels")
 def archive(modeladmin, request, queryset):
     for slack_channel in queryset:
-        slack_channel.archive(rename=False)
+        enqueue_slack_task(
+            "archive_slack_channel",
+            {"channel_id": slack_channel.id},
+            key=f"archive_slack_channel:{slack_channel.id}",
+            run=partial(slack_channel.archive, rename=False),
+            ordering_key=f"show:{slack_channel.show_id}",
+        )
 
 
 class SlackChannelAdmin(admin.ModelAdmin):
@@ -26,5 +58,31 @@ class SlackChannelAdmin(admin.ModelAdmin):
     actions = [force_refresh, archive]
 
 
+@admin.action(description="Retry Slack tasks")
+def retry(modeladmin, request, queryset):
+    queryset.exclude(status=SlackTask.STATUSES.running).update(
+        status=SlackTask.STATUSES.pending, attempts=0, run_after=timezone.now()
+    )
+
+
+class SlackTaskAdmin(admin.ModelAdmin):
+    readonly_fields = [
+        "name",
+        "payload",
+        "idempotency_key",
+        "status",
+        "attempts",
+        "run_after",
+        "last_error",
+        "created_at",
+        "updated_at",
+    ]
+    list_display = ["name", "idempotency_key", "status", "attempts", "run_after"]
+    list_filter = ["status", "name"]
+    actions = [retry]
+
+
 admin.site.register(SlackUser, SlackUserAdmin)
+admin.site.register(MissingSlackUser, MissingSlackUserAdmin)
 admin.site.register(SlackChannel, SlackChannelAdmin)
+admin.site.register(SlackTask, SlackTaskAdmin)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SlackConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "slack"
+
+    def ready(self):
+        import slack.tasks  # noqa
@@ -9,3 +9,7 @@ class SlackBossException(CustomException):
 
 class SlackTokenException(SlackBossException):
     default_message = _("Slack token is not configured properly")
+
+
+class SlackRateLimitException(SlackBossException):
+    default_message = _("Slack rate limit exceeded, try again later")
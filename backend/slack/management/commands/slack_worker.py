@@ -0,0 +1,93 @@
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from slack.models import SlackTask
+from slack.outbox import run_due_slack_tasks, schedule_slack_task
+
+PURGE_INTERVAL = 60 * 60
+SCHEDULE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the Slack side effects queued in the outbox, retrying failed "
+        "tasks with exponential backoff"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=getattr(settings, "SLACK_WORKER_CONCURRENCY", 4),
+            help="Number of tasks to run at once",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before checking for tasks again when idle",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no tasks are due instead of waiting for more",
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        handlers = {
+            signum: signal.signal(signum, self.stop)
+            for signum in [signal.SIGTERM, signal.SIGINT]
+        }
+        try:
+            self.run(**options)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+    def run(self, **options):
+        concurrency = max(options["concurrency"], 1)
+        retention = timedelta(
+            seconds=getattr(settings, "SLACK_OUTBOX_RETENTION", 7 * 24 * 60 * 60)
+        )
+        sync_interval = getattr(settings, "SLACK_DIRECTORY_SYNC_INTERVAL", 6 * 60 * 60)
+        purged_at = scheduled_at = None
+        ran = 0
+        with ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="slack_worker"
+        ) as executor:
+            while not self.stopping:
+                count = run_due_slack_tasks(
+                    concurrency, executor if concurrency > 1 else None
+                )
+                ran += count
+                if count:
+                    continue
+                if purged_at is None or time.monotonic() - purged_at > PURGE_INTERVAL:
+                    SlackTask.objects.purge(timezone.now() - retention)
+                    purged_at = time.monotonic()
+                if sync_interval and (
+                    scheduled_at is None
+                    or time.monotonic() - scheduled_at > SCHEDULE_INTERVAL
+                ):
+                    schedule_slack_task("sync_slack_directory", sync_interval)
+                    scheduled_at = time.monotonic()
+                    continue
+                # Idle workers do not hold on to their database connection
+                close_old_connections()
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        self.stdout.write(f"Ran {ran} Slack tasks.")
+
+    def stop(self, signum, frame):
+        """Stops once the tasks being run are done"""
+
+        self.stopping = True
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from slack.models import SlackUser
+from slack.ratelimit import Priority, slack_priority
+
+
+class Command(BaseCommand):
+    help = (
+        "Lists the users of the Slack workspace and creates, replaces or "
+        "deletes the Slack users of members to match"
+    )
+
+    def handle(self, *args, **options):
+        with slack_priority(Priority.BULK):
+            created, replaced, deleted = SlackUser.objects.sync()
+        self.stdout.write(
+            f"Created {created}, replaced {replaced} and deleted {deleted} "
+            f"Slack users."
+        )
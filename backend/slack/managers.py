@@ -1,51 +1,82 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Tuple, Union, List
-
-from django.db import models
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from slack.service import slack_boss
 
 if TYPE_CHECKING:
     from django.db.models import QuerySet
-    from slack.models import SlackUser, SlackChannel
+    from slack.models import SlackUser, SlackChannel, SlackTask
     from shows.models import Member, Show
 
+SLACK_DIRECTORY_KEY = "slack:directory"
+
 
 class SlackUserManager(models.Manager):
     """Model manager for SlackUser"""
 
-    def create(self, member: Member, **extra_fields) -> SlackUser:
+    def create(
+        self, member: Member, refresh: bool = False, **extra_fields
+    ) -> SlackUser:
         """Creates SlackUser for a member.
 
+        Members Slack has no user for are marked as missing, and are not
+        looked up again until the marker goes stale, unless refreshed.
+
         Args:
             member: The member to create the SlackUser for.
+            refresh: Whether to look up a member marked as missing anyway.
 
         Returns:
-            The newly created SlackUser instance.
+            The newly created SlackUser instance. None if the member is not
+            in the Slack workspace.
 
         Raises:
             SlackBossException: If there was an error fetching the user ID.
         """
 
+        from slack.models import MissingSlackUser
+
         if not member:
             raise ValueError(_("The member must be set"))
         if hasattr(member, "slack_user"):
             raise ValueError(_("The member already has a SlackUser record"))
-        user_id = slack_boss.fetch_user(member=member)
-        if user_id is not None:
-            logging.info(f"Creating SlackUser with ID {user_id} ...")
-            user = self.model(id=user_id, member=member, **extra_fields)
-            user.save()
-            return user
-
-    def get_or_create(self, member: Member, **extra_fields) -> Tuple[SlackUser, bool]:
+        missing = getattr(member, "missing_slack_user", None)
+        if not refresh and missing is not None and missing.is_fresh(member.user.email):
+            return None
+        user_id = self.lookup(member)
+        if user_id is None:
+            user_id = slack_boss.fetch_user(member=member)
+        if user_id is None:
+            MissingSlackUser.objects.update_or_create(
+                member=member,
+                defaults={"email": member.user.email, "checked_at": timezone.now()},
+            )
+            return None
+        if missing is not None:
+            missing.delete()
+        logging.info(f"Creating SlackUser with ID {user_id} ...")
+        user = self.model(id=user_id, member=member, **extra_fields)
+        user.save()
+        return user
+
+    def get_or_create(
+        self, member: Member, refresh: bool = False, **extra_fields
+    ) -> Tuple[SlackUser, bool]:
         """Fetches SlackUser for a member, or creates one if necessary.
 
         Args:
             member: The member to fetch or create the SlackUser for.
+            refresh: Whether to look up a member marked as missing anyway.
 
         Returns:
             A tuple containing the fetched or newly created SlackUser instance
@@ -58,7 +89,81 @@ class SlackUserManager(models.Manager):
         try:
             return self.get(member=member, **extra_fields), False
         except self.model.DoesNotExist:
-            return self.create(member=member, **extra_fields), True
+            return self.create(member=member, refresh=refresh, **extra_fields), True
+
+    def lookup(self, member: Member) -> Optional[str]:
+        """Looks up the Slack ID of a member in the last directory synced.
+
+        Returns:
+            The member's Slack ID, or None if it is not in the directory, such
+            as if they joined the workspace since, or no directory is cached.
+        """
+
+        directory = cache.get(SLACK_DIRECTORY_KEY)
+        if not directory or member.user_id is None:
+            return None
+        return directory.get(member.user.email.lower())
+
+    def sync(self, directory: Optional[Dict[str, str]] = None) -> Tuple[int, int, int]:
+        """Matches the SlackUsers of all members to the workspace directory.
+
+        The directory is fetched with a call to Slack per page of users, and
+        cached for SlackUsers created until the next sync to be looked up in.
+        Members in the directory get a SlackUser, or have theirs replaced if
+        their Slack ID changed, while those no longer in it have theirs
+        deleted and are marked as missing, all in a few queries whatever the
+        number of members.
+
+        Args:
+            directory: The Slack IDs keyed by lowercase email address.
+                Defaults to the directory fetched from Slack.
+
+        Returns:
+            A tuple containing the numbers of SlackUsers created, replaced
+            and deleted.
+
+        Raises:
+            SlackBossException: If there was an error fetching the directory.
+        """
+
+        from slack.models import MissingSlackUser
+
+        if directory is None:
+            directory = slack_boss.fetch_directory()
+            interval = getattr(settings, "SLACK_DIRECTORY_SYNC_INTERVAL", 6 * 60 * 60)
+            cache.set(SLACK_DIRECTORY_KEY, directory, timeout=2 * interval or None)
+
+        member_model = self.model._meta.get_field("member").related_model
+        members = member_model.objects.filter(user__isnull=False).select_related(
+            "user", "slack_user"
+        )
+        now = timezone.now()
+        stale, new, missing = [], [], []
+        replaced = 0
+        for member in members:
+            user_id = directory.get(member.user.email.lower())
+            if user_id is None:
+                missing.append(
+                    MissingSlackUser(
+                        member=member, email=member.user.email, checked_at=now
+                    )
+                )
+            slack_user = getattr(member, "slack_user", None)
+            if slack_user is not None and slack_user.id == user_id:
+                continue
+            if slack_user is not None:
+                stale.append(slack_user.id)
+            if user_id is not None:
+                new.append(self.model(id=user_id, member=member))
+                replaced += slack_user is not None
+
+        with transaction.atomic():
+            # Stale rows go first, since a Slack ID may move between members
+            self.filter(pk__in=stale).delete()
+            self.bulk_create(new)
+            MissingSlackUser.objects.all().delete()
+            MissingSlackUser.objects.bulk_create(missing)
+        return len(new) - replaced, replaced, len(stale) - replaced
 
 
 class SlackChannelManager(models.Manager):
@@ -147,3 +252,59 @@ class SlackChannelManager(models.Manager):
         for channel in channel_set:
             channel.remove_users(users)
         return channel_set
+
+
+class SlackTaskManager(models.Manager):
+    """Model manager for SlackTask"""
+
+    def claim(self, limit: int, lease: timedelta) -> List[SlackTask]:
+        """Claims the tasks that are due for a worker to run.
+
+        A task is due once its run_after time has passed, whether it is
+        pending or running, since a running task is only due again once the
+        lease of the worker running it expires, such as if the worker was
+        stopped. A task with an ordering key is not claimed while an earlier
+        task with the same key is pending or running, including one waiting
+        to be retried. Each task is claimed with a conditional update, so that
+        workers claiming tasks at the same time never claim the same one, nor
+        two tasks with the same ordering key.
+
+        Args:
+            limit: The most tasks to claim.
+            lease: How long the worker has to run the tasks before they are
+                due again.
+
+        Returns:
+            The claimed tasks, oldest first.
+        """
+
+        now = timezone.now()
+        unfinished = [self.model.STATUSES.pending, self.model.STATUSES.running]
+        earlier = self.filter(
+            ordering_key=OuterRef("ordering_key"),
+            pk__lt=OuterRef("pk"),
+            status__in=unfinished,
+        )
+        due = self.filter(status__in=unfinished, run_after__lte=now).filter(
+            Q(ordering_key="") | ~Exists(earlier)
+        )
+        claimed = [
+            pk
+            for pk in due.order_by("run_after", "pk").values_list("pk", flat=True)[
+                :limit
+            ]
+            if due.filter(pk=pk).update(
+                status=self.model.STATUSES.running,
+                run_after=now + lease,
+                attempts=F("attempts") + 1,
+                updated_at=now,
+            )
+        ]
+        return list(self.filter(pk__in=claimed).order_by("run_after", "pk"))
+
+    def purge(self, before: datetime) -> int:
+        """Deletes the tasks done before a time, returning how many there were"""
+
+        return self.filter(
+            status=self.model.STATUSES.done, updated_at__lt=before
+        ).delete()[0]
@@ -0,0 +1,60 @@
+# Generated by Django 4.1.2 on 2026-10-18 06:13
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("slack", "0002_slackchannel_archived"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlackTask",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=60)),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                ("idempotency_key", models.CharField(max_length=200, unique=True)),
+                (
+                    "status",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (0, "Pending"),
+                            (1, "Running"),
+                            (2, "Done"),
+                            (3, "Failed"),
+                        ],
+                        default=0,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "run_after",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="When the task is next due, or when its worker's lease on it expires",
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="slacktask",
+            index=models.Index(
+                fields=["status", "run_after"], name="slacktask_status_run_idx"
+            ),
+        ),
+    ]
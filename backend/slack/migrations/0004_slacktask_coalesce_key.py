@@ -0,0 +1,28 @@
+# Generated by Django 4.1.2 on 2026-10-18 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("slack", "0003_slacktask"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="slacktask",
+            name="coalesce_key",
+            field=models.CharField(
+                blank=True,
+                help_text="Pending tasks with the same coalesce key are merged into one",
+                max_length=200,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="slacktask",
+            index=models.Index(
+                fields=["coalesce_key", "status"], name="slacktask_coalesce_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.1.2 on 2026-10-18 06:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shows", "0010_updated_at_showtombstone"),
+        ("slack", "0004_slacktask_coalesce_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MissingSlackUser",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "email",
+                    models.EmailField(
+                        help_text="Email address Slack was checked for", max_length=254
+                    ),
+                ),
+                ("checked_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "member",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="missing_slack_user",
+                        to="shows.member",
+                    ),
+                ),
+            ],
+        ),
+    ]
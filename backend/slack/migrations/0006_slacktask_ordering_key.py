@@ -0,0 +1,28 @@
+# Generated by Django 4.1.2 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("slack", "0005_missingslackuser"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="slacktask",
+            name="ordering_key",
+            field=models.CharField(
+                blank=True,
+                help_text="Tasks with the same ordering key are run one at a time, in the order they were queued",
+                max_length=200,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="slacktask",
+            index=models.Index(
+                fields=["ordering_key", "status"], name="slacktask_ordering_idx"
+            ),
+        ),
+    ]
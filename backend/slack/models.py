@@ -1,12 +1,15 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Union, List, Optional
 
+from django.conf import settings
 from django.contrib import admin
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext as _
+from model_utils import Choices
 
 from common.exceptions import WrongUsage
-from slack.managers import SlackUserManager, SlackChannelManager
+from slack.managers import SlackUserManager, SlackChannelManager, SlackTaskManager
 from slack.service import slack_boss
 from users.models import User
 
@@ -32,6 +35,39 @@ class SlackUser(models.Model):
         return f"<@{self.id}>"
 
 
+class MissingSlackUser(models.Model):
+    """Model for a member who is not in the Slack workspace.
+
+    Each marker has a one-to-one relationship with the member Slack had no
+    user for when last checked. The member is not looked up again while the
+    marker is fresh, so that members who never joined Slack cost no calls.
+    """
+
+    member = models.OneToOneField(
+        "shows.Member", related_name="missing_slack_user", on_delete=models.CASCADE
+    )
+    email = models.EmailField(help_text=_("Email address Slack was checked for"))
+    checked_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return str(self.email)
+
+    def is_fresh(self, email: str) -> bool:
+        """Checks whether the marker still holds for a member's email address.
+
+        A marker goes stale SLACK_MISSING_USER_TTL seconds after the check, or
+        as soon as the member's email address changes.
+        """
+
+        ttl = timedelta(
+            seconds=getattr(settings, "SLACK_MISSING_USER_TTL", 24 * 60 * 60)
+        )
+        return (
+            self.email.lower() == email.lower()
+            and self.checked_at > timezone.now() - ttl
+        )
+
+
 class SlackChannel(models.Model):
     """Model for a show channel in the Slack workspace.
 
@@ -93,14 +129,17 @@ class SlackChannel(models.Model):
 
         if not self.is_archived():
             if rename:
-                timestamp = str(datetime.now().timestamp()).replace(".", "-")
-                self.update_name(
-                    name=f"arch-{self.show.default_channel_name()}-{timestamp}"
-                )
+                self.update_name(name=self.archived_name())
             slack_boss.archive_channel(channel_id=self.id)
             self.archived = True
             self.save()
 
+    def archived_name(self) -> str:
+        """Generates a unique name for the Slack channel once archived"""
+
+        timestamp = str(datetime.now().timestamp()).replace(".", "-")
+        return f"arch-{self.show.default_channel_name()}-{timestamp}"
+
     def invite_users(self, users: Union[SlackUser, List[SlackUser]]):
         """Invites Slack user or users to the Slack channel.
 
@@ -117,13 +156,17 @@ class SlackChannel(models.Model):
             invite_admin: Whether to invite Slack admins
         """
 
-        if self.show.performers.count() > 0:
-            self.invite_users(
-                [
-                    performer.fetch_slack_user()
-                    for performer in self.show.performers.all()
-                ]
+        # Slack users synced from the directory, and markers of performers
+        # missing from it, are loaded with the performers
+        slack_users = [
+            performer.fetch_slack_user()
+            for performer in self.show.performers.select_related(
+                "user", "slack_user", "missing_slack_user"
             )
+        ]
+        slack_users = [slack_user for slack_user in slack_users if slack_user]
+        if len(slack_users) > 0:
+            self.invite_users(slack_users)
 
         if invite_admin:
             self.invite_admin()
@@ -254,3 +297,74 @@ class SlackChannel(models.Model):
             slack_boss.pin_message_in_channel(channel_id=self.id, ts=ts)
             self.briefing_ts = ts
             self.save()
+
+
+class SlackTask(models.Model):
+    """Model for a Slack side effect queued in the outbox.
+
+    Tasks are written in the same transaction as the change causing them, and
+    run by the slack_worker command once committed, so that requests do not
+    wait on Slack. Each task names a function registered with `slack_task`,
+    along with the keyword arguments to call it with. Its idempotency key is
+    unique, so that a side effect is queued at most once however many times
+    the change causing it is retried, while its coalesce key lets changes made
+    in quick succession be merged into the one pending task. Tasks with the
+    same ordering key, such as those of a member, run one at a time in the
+    order they were queued, so that a member leaving a channel is never run
+    before, or alongside, them joining it.
+    """
+
+    STATUSES = Choices(
+        (0, "pending", _("Pending")),
+        (1, "running", _("Running")),
+        (2, "done", _("Done")),
+        (3, "failed", _("Failed")),
+    )
+
+    name = models.CharField(max_length=60)
+    payload = models.JSONField(default=dict, blank=True)
+    idempotency_key = models.CharField(max_length=200, unique=True)
+    coalesce_key = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text=_("Pending tasks with the same coalesce key are merged into one"),
+    )
+    ordering_key = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text=_(
+            "Tasks with the same ordering key are run one at a time, in the order "
+            "they were queued"
+        ),
+    )
+    status = models.PositiveSmallIntegerField(
+        choices=STATUSES, default=STATUSES.pending
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        help_text=_(
+            "When the task is next due, or when its worker's lease on it expires"
+        ),
+    )
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = SlackTaskManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "run_after"], name="slacktask_status_run_idx"
+            ),
+            models.Index(
+                fields=["coalesce_key", "status"], name="slacktask_coalesce_idx"
+            ),
+            models.Index(
+                fields=["ordering_key", "status"], name="slacktask_ordering_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.idempotency_key})"
@@ -0,0 +1,233 @@
+import logging
+import random
+import uuid
+from concurrent.futures import Executor
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from common.side_effects import run_or_defer
+from slack.models import SlackTask
+
+logger = logging.getLogger(__name__)
+
+TASKS: Dict[str, Callable[..., None]] = {}
+
+
+def slack_task(name: str):
+    """Registers a function as the Slack task with a name.
+
+    The function is called with the payload of each task as keyword
+    arguments, which must be JSON serializable, such as the IDs of the rows
+    it acts on. Tasks may be run more than once, such as when they fail
+    partway and are retried, so they should be safe to repeat.
+    """
+
+    def decorator(func):
+        TASKS[name] = func
+        return func
+
+    return decorator
+
+
+def is_outbox_enabled() -> bool:
+    return getattr(settings, "SLACK_OUTBOX_ENABLED", False)
+
+
+def enqueue_slack_task(
+    name: str,
+    payload: Dict,
+    key: Optional[str] = None,
+    run: Optional[Callable[[], None]] = None,
+    ordering_key: str = "",
+) -> None:
+    """Queues a Slack side effect in the outbox.
+
+    The task is written in the current transaction, if any, so it is only
+    run if the change causing it is committed. If the outbox is disabled, the
+    side effect is run, or deferred until the response is sent, instead.
+
+    Args:
+        name: The name of the registered task.
+        payload: The keyword arguments to call the task with.
+        key: The idempotency key of the task. The task is not queued if one
+            with the same key was already queued. Defaults to a unique key.
+        run: The side effect to run in place of the task if the outbox is
+            disabled, such as the same work on instances already loaded.
+        ordering_key: The ordering key of the task, such as the member it
+            acts on. The task is not run until the tasks queued before it
+            with the same key are done or failed.
+    """
+
+    if name not in TASKS:
+        raise ValueError(f"Unknown Slack task {name}")
+    if not is_outbox_enabled():
+        run_or_defer(run or TASKS[name], **({} if run else payload))
+        return
+    SlackTask.objects.get_or_create(
+        idempotency_key=key or f"{name}:{uuid.uuid4().hex}",
+        defaults={"name": name, "payload": payload, "ordering_key": ordering_key},
+    )
+
+
+def coalesce_slack_task(
+    name: str,
+    payload: Dict,
+    key: str,
+    merge: Callable[[Dict, Dict], Dict],
+    run: Optional[Callable[[], None]] = None,
+    ordering_key: str = "",
+) -> None:
+    """Queues a Slack side effect once changes to the same thing settle.
+
+    A task is not due until SLACK_OUTBOX_DEBOUNCE seconds after it was last
+    queued. If a task with the same coalesce key is still pending, its
+    payload is merged with this one instead, and it is delayed again, though
+    never more than SLACK_OUTBOX_MAX_DEBOUNCE seconds after it was first
+    queued. A burst of changes, such as an admin saving a show and its
+    rounds, then makes a single round of Slack calls.
+
+    If the outbox is disabled, the side effect is run, or deferred until the
+    response is sent, instead, like those queued with `enqueue_slack_task`.
+
+    Args:
+        name: The name of the registered task.
+        payload: The keyword arguments to call the task with.
+        key: The coalesce key of the task, such as the show it updates.
+        merge: Merges the payload of the pending task with this payload.
+        run: The side effect to run in place of the task if the outbox is
+            disabled.
+        ordering_key: The ordering key of the task, as for
+            `enqueue_slack_task`.
+    """
+
+    if not is_outbox_enabled():
+        enqueue_slack_task(name, payload, run=run)
+        return
+
+    now = timezone.now()
+    delay = timedelta(seconds=getattr(settings, "SLACK_OUTBOX_DEBOUNCE", 10))
+    max_delay = timedelta(seconds=getattr(settings, "SLACK_OUTBOX_MAX_DEBOUNCE", 60))
+    pending = SlackTask.objects.filter(
+        name=name, coalesce_key=key, status=SlackTask.STATUSES.pending
+    )
+    with transaction.atomic():
+        task = pending.select_for_update().order_by("pk").first()
+        # The task is only merged with if no worker claimed it in the meantime
+        if task is not None and pending.filter(pk=task.pk).update(
+            payload=merge(task.payload, payload),
+            run_after=(
+                task.run_after
+                if task.attempts
+                else min(now + delay, task.created_at + max_delay)
+            ),
+            updated_at=now,
+        ):
+            return
+        SlackTask.objects.create(
+            name=name,
+            payload=payload,
+            idempotency_key=f"{name}:{uuid.uuid4().hex}",
+            coalesce_key=key,
+            ordering_key=ordering_key,
+            run_after=now + delay,
+        )
+
+
+def schedule_slack_task(name: str, interval: float) -> None:
+    """Queues a task to run once per interval, such as a periodic sync.
+
+    The idempotency key of the task is the interval it falls in, so the task
+    is only queued once per interval however many workers schedule it.
+
+    Args:
+        name: The name of the registered task, which takes no arguments.
+        interval: The number of seconds between runs.
+    """
+
+    if name not in TASKS:
+        raise ValueError(f"Unknown Slack task {name}")
+    period = int(timezone.now().timestamp() // interval)
+    SlackTask.objects.get_or_create(
+        idempotency_key=f"{name}:{period}", defaults={"name": name, "payload": {}}
+    )
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    """Gets the delay before retrying a task, doubling after every attempt.
+
+    Up to a tenth of the delay is added at random, so that tasks failing
+    together, such as while Slack is down, are not all retried together.
+    """
+
+    base = getattr(settings, "SLACK_OUTBOX_RETRY_DELAY", 10)
+    maximum = getattr(settings, "SLACK_OUTBOX_MAX_RETRY_DELAY", 60 * 60)
+    delay = min(base * 2 ** max(attempts - 1, 0), maximum)
+    return timedelta(seconds=delay * (1 + random.random() / 10))
+
+
+def run_slack_task(task: SlackTask) -> bool:
+    """Runs a claimed task, recording whether it is done or must be retried.
+
+    Returns:
+        Whether the task succeeded.
+    """
+
+    tasks = SlackTask.objects.filter(pk=task.pk)
+    try:
+        TASKS[task.name](**task.payload)
+    except Exception as e:
+        now = timezone.now()
+        max_attempts = getattr(settings, "SLACK_OUTBOX_MAX_ATTEMPTS", 8)
+        if task.attempts >= max_attempts:
+            logger.exception("Slack task %s failed for good", task)
+            tasks.update(
+                status=SlackTask.STATUSES.failed, last_error=repr(e), updated_at=now
+            )
+        else:
+            logger.warning("Slack task %s failed, retrying: %r", task, e)
+            tasks.update(
+                status=SlackTask.STATUSES.pending,
+                run_after=now + get_retry_delay(task.attempts),
+                last_error=repr(e),
+                updated_at=now,
+            )
+        return False
+    tasks.update(
+        status=SlackTask.STATUSES.done, last_error="", updated_at=timezone.now()
+    )
+    return True
+
+
+def _run_slack_task_in_thread(task: SlackTask) -> bool:
+    try:
+        return run_slack_task(task)
+    finally:
+        # The thread is not a request thread, so nothing else closes its
+        # database connection
+        close_old_connections()
+
+
+def run_due_slack_tasks(limit: int, executor: Optional[Executor] = None) -> int:
+    """Claims and runs the tasks that are due.
+
+    Args:
+        limit: The most tasks to run.
+        executor: The executor to run the tasks concurrently with, or None to
+            run them one at a time.
+
+    Returns:
+        The number of tasks that were run.
+    """
+
+    lease = timedelta(seconds=getattr(settings, "SLACK_OUTBOX_LEASE", 5 * 60))
+    tasks = SlackTask.objects.claim(limit, lease)
+    if executor is None:
+        for task in tasks:
+            run_slack_task(task)
+    else:
+        list(executor.map(_run_slack_task_in_thread, tasks))
+    return len(tasks)
@@ -0,0 +1,178 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Dict, Optional
+
+# Calls per minute allowed by each of Slack's rate limit tiers
+# https://api.slack.com/docs/rate-limits
+TIERS = {1: 1, 2: 20, 3: 50, 4: 100}
+
+METHOD_TIERS = {
+    "chat.update": 3,
+    "conversations.archive": 2,
+    "conversations.create": 2,
+    "conversations.info": 3,
+    "conversations.invite": 3,
+    "conversations.kick": 3,
+    "conversations.rename": 2,
+    "pins.add": 2,
+    "users.list": 2,
+    "users.lookupByEmail": 3,
+}
+
+# Methods with special rate limits, in calls per minute. Messages may be
+# posted about once per second per channel, with short bursts allowed.
+METHOD_RATES = {"chat.postMessage": 60}
+
+DEFAULT_TIER = 3
+
+
+class Priority(IntEnum):
+    """Lanes of calls to Slack, lower values of which are made first"""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+_priority: ContextVar[Priority] = ContextVar(
+    "slack_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def slack_priority(priority: Priority):
+    """Makes the calls to Slack within the context in the lane of a priority"""
+
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def get_priority() -> Priority:
+    return _priority.get()
+
+
+class TokenBucket:
+    """Tokens for the calls to a Slack method, refilled at its rate limit.
+
+    Up to a tenth of a minute's worth of calls may be made in a burst. Calls
+    waiting for a token take them in order of priority, then of arrival, so
+    that interactive calls go before the calls of bulk jobs waiting already.
+
+    Attributes:
+        rate: The number of tokens added per second.
+        capacity: The most tokens the bucket holds.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, per_minute / 10)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float):
+        elapsed = max(now - max(self._updated_at, self._paused_until), 0)
+        self._tokens = min(self._tokens + elapsed * self.rate, self.capacity)
+        self._updated_at = max(now, self._updated_at)
+
+    def _get_wait(self, now: float) -> float:
+        if now < self._paused_until:
+            return self._paused_until - now + max(1 - self._tokens, 0) / self.rate
+        return max(1 - self._tokens, 0) / self.rate
+
+    def acquire(self, priority: Priority, timeout: float) -> bool:
+        """Waits for a token.
+
+        Args:
+            priority: The lane of the call.
+            timeout: The most seconds to wait.
+
+        Returns:
+            Whether a token was taken before the timeout.
+        """
+
+        entry = (priority, next(self._counter))
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    is_next = self._waiters[0] == entry
+                    wait = self._get_wait(now)
+                    if is_next and wait <= 0:
+                        self._tokens -= 1
+                        return True
+                    remaining = deadline - now
+                    if remaining <= 0 or (is_next and wait > remaining):
+                        return False
+                    # Only the next waiter waits for the token, and the others
+                    # for it to be taken
+                    self._condition.wait(min(wait, remaining) if is_next else remaining)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def pause(self, seconds: float):
+        """Holds back calls for a while, such as when Slack asks to retry later"""
+
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            # A single call is let through to retry once the pause is over
+            self._tokens = min(self._tokens, 1)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._condition.notify_all()
+
+
+class RateLimiter:
+    """The token buckets of the Slack methods called by this process.
+
+    Limits are only kept within a process, so calls made by other processes,
+    such as the web and worker processes, may still be rate limited by Slack,
+    which is what the pauses asked for in Retry-After headers are for.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def get_bucket(self, method: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(method)
+            if bucket is None:
+                per_minute = (
+                    METHOD_RATES.get(method)
+                    or TIERS[METHOD_TIERS.get(method, DEFAULT_TIER)]
+                )
+                bucket = self._buckets[method] = TokenBucket(per_minute)
+            return bucket
+
+    def acquire(self, method: str, timeout: float, priority: Optional[Priority] = None):
+        """Waits for a token to call a method, in the current lane by default"""
+
+        if priority is None:
+            priority = get_priority()
+        return self.get_bucket(method).acquire(priority, timeout)
+
+    def pause(self, method: str, seconds: float):
+        self.get_bucket(method).pause(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+rate_limiter = RateLimiter()
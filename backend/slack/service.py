@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import itertools
 import logging
-from typing import Optional, TYPE_CHECKING, Union, List, Tuple
+from typing import Optional, TYPE_CHECKING, Union, List, Tuple, Dict
 
 from django.conf import settings
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
 from common.exceptions import WrongUsage
-from slack.exceptions import SlackBossException, SlackTokenException
+from slack.exceptions import (
+    SlackBossException,
+    SlackRateLimitException,
+    SlackTokenException,
+)
+from slack.ratelimit import rate_limiter
 
 if TYPE_CHECKING:
     from users.models import User
@@ -54,6 +60,47 @@ class SlackBoss:
         self.token = token
         self.client = WebClient(token=self.token)
 
+    def _call(self, method: str, **kwargs):
+        """Calls a Web API method of the client within Slack's rate limits.
+
+        Calls wait for their turn under the rate limit of their method, in the
+        lane of the current priority, rather than fail. If Slack rate limits
+        a call anyway, such as because of calls made by other processes, the
+        method is paused for as long as Slack asks, and the call retried.
+
+        Args:
+            method: The name of the client method, such as `chat_postMessage`.
+            **kwargs: The arguments of the method.
+
+        Returns:
+            The response to the call.
+
+        Raises:
+            SlackRateLimitException: If the call could not be made within
+                SLACK_RATE_LIMIT_MAX_WAIT seconds.
+            SlackApiError: If the call failed.
+        """
+
+        api_method = method.replace("_", ".", 1)
+        max_wait = getattr(settings, "SLACK_RATE_LIMIT_MAX_WAIT", 30)
+        max_retries = getattr(settings, "SLACK_RATE_LIMIT_MAX_RETRIES", 3)
+        for attempt in itertools.count():
+            if not rate_limiter.acquire(api_method, timeout=max_wait):
+                raise SlackRateLimitException()
+            try:
+                return getattr(self.client, method)(**kwargs)
+            except SlackApiError as api_error:
+                if (
+                    api_error.response.get("error") != "ratelimited"
+                    or attempt >= max_retries
+                ):
+                    raise
+                retry_after = self._get_retry_after(api_error.response)
+                logging.warning(
+                    f"Slack rate limited {api_method}, retrying in {retry_after}s ..."
+                )
+                rate_limiter.pause(api_method, retry_after)
+
     def fetch_user(
         self,
         email: Optional[str] = None,
@@ -80,7 +127,7 @@ class SlackBoss:
 
         logging.info(f"Fetching Slack user for {member_label} ...")
         try:
-            response = self.client.users_lookupByEmail(email=email)
+            response = self._call("users_lookupByEmail", email=email)
         except SlackApiError as api_error:
             error = api_error.response.get("error")
             if error == "users_not_found":
@@ -91,6 +138,39 @@ class SlackBoss:
             logging.debug(response)
             return response["user"]["id"]
 
+    def fetch_directory(self, page_size: int = 200) -> Dict[str, str]:
+        """Fetches the Slack user IDs of everyone in the workspace by email.
+
+        Users are listed a page at a time, so the whole workspace takes one
+        call per page rather than one call per member. Deactivated users,
+        bots, and users without an email address are left out.
+
+        Args:
+            page_size: The most users to list per call.
+
+        Returns:
+            The Slack user IDs keyed by lowercase email address.
+
+        Raises:
+            SlackBossException: If there was an error listing the users.
+        """
+
+        logging.info("Fetching Slack workspace directory ...")
+        directory = {}
+        cursor = None
+        while True:
+            try:
+                response = self._call("users_list", cursor=cursor, limit=page_size)
+            except SlackApiError as api_error:
+                raise SlackBossException(api_error.response.get("error"))
+            for user in response["members"]:
+                email = user.get("profile", {}).get("email")
+                if email and not user.get("deleted") and not user.get("is_bot"):
+                    directory[email.lower()] = user["id"]
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                return directory
+
     def fetch_channel_name(
         self,
         channel_id: Optional[str] = None,
@@ -116,7 +196,7 @@ class SlackBoss:
 
         logging.info(f"Fetching info on channel {channel_label} ...")
         try:
-            response = self.client.conversations_info(channel=channel_id)
+            response = self._call("conversations_info", channel=channel_id)
         except SlackApiError as api_error:
             error = api_error.response.get("error")
             raise SlackBossException(error)
@@ -144,7 +224,7 @@ class SlackBoss:
 
         logging.info(f"Creating Slack channel for {show_label} ...")
         try:
-            response = self.client.conversations_create(name=name, is_private=False)
+            response = self._call("conversations_create", name=name, is_private=False)
         except SlackApiError as api_error:
             error = api_error.response.get("error")
             raise SlackBossException(error)
@@ -177,9 +257,12 @@ class SlackBoss:
 
         logging.info(f"Archiving channel {channel_label} ...")
         try:
-            response = self.client.conversations_archive(channel=channel_id)
+            response = self._call("conversations_archive", channel=channel_id)
         except SlackApiError as api_error:
             error = api_error.response.get("error")
+            if error == "already_archived":
+                logging.info(f"Channel {channel_label} is already archived")
+                return True
             raise SlackBossException(error)
         else:
             logging.debug(response)
@@ -224,7 +307,7 @@ class SlackBoss:
 
         logging.info(f"Renaming channel {channel_label} ...")
         try:
-            response = self.client.conversations_rename(channel=channel_id, name=name)
+            response = self._call("conversations_rename", channel=channel_id, name=name)
         except SlackApiError as api_error:
             error = api_error.response.get("error")
             raise SlackBossException(error)
@@ -265,8 +348,8 @@ class SlackBoss:
 
         logging.info(f"Inviting {members_label} to channel {channel_label} ...")
         try:
-            response = self.client.conversations_invite(
-                channel=channel_id, users=user_ids
+            response = self._call(
+                "conversations_invite", channel=channel_id, users=user_ids
             )
         except SlackApiError as api_error:
             error = api_error.response.get("error")
@@ -314,8 +397,8 @@ class SlackBoss:
             user_ids = [user_ids]
         for user_id in user_ids:
             try:
-                response = self.client.conversations_kick(
-                    channel=channel_id, user=user_id
+                response = self._call(
+                    "conversations_kick", channel=channel_id, user=user_id
                 )
             except SlackApiError as api_error:
                 error = api_error.response.get("error")
@@ -372,13 +455,13 @@ class SlackBoss:
         try:
             if is_new_message:
                 logging.info(f"Sending message in channel {channel_label} ...")
-                response = self.client.chat_postMessage(
-                    channel=channel_id, blocks=blocks, text=text
+                response = self._call(
+                    "chat_postMessage", channel=channel_id, blocks=blocks, text=text
                 )
             else:
                 logging.info(f"Updating message in channel {channel_label} ...")
-                response = self.client.chat_update(
-                    channel=channel_id, ts=ts, blocks=blocks, text=text
+                response = self._call(
+                    "chat_update", channel=channel_id, ts=ts, blocks=blocks, text=text
                 )
         except SlackApiError as api_error:
             error = api_error.response.get("error")
@@ -418,7 +501,7 @@ class SlackBoss:
 
         logging.info(f"Pinning message {ts_label} in channel {channel_label} ...")
         try:
-            response = self.client.pins_add(channel=channel_id, timestamp=ts)
+            response = self._call("pins_add", channel=channel_id, timestamp=ts)
         except SlackApiError as api_error:
             error = api_error.response.get("error")
             if error == "already_pinned":
@@ -431,6 +514,17 @@ class SlackBoss:
             logging.debug(response)
             return True
 
+    @staticmethod
+    def _get_retry_after(response) -> float:
+        """Gets the seconds Slack asked to wait before retrying, 1 by default"""
+
+        headers = getattr(response, "headers", None) or {}
+        retry_after = headers.get("Retry-After", headers.get("retry-after"))
+        try:
+            return max(float(retry_after), 0)
+        except (TypeError, ValueError):
+            return 1
+
     @staticmethod
     def _get_email_arg(
         email: Optional[str] = None,
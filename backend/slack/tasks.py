@@ -0,0 +1,38 @@
+from typing import Optional
+
+from slack.models import SlackChannel, SlackUser
+from slack.outbox import slack_task
+from slack.ratelimit import Priority, slack_priority
+from slack.service import slack_boss
+
+
+@slack_task("archive_slack_channel")
+def archive_slack_channel(channel_id: str, name: Optional[str] = None):
+    """Archives a Slack channel, renaming it first if a name is given"""
+
+    if name is not None:
+        slack_boss.rename_channel(channel_id=channel_id, name=name)
+    slack_boss.archive_channel(channel_id=channel_id)
+    SlackChannel.objects.filter(pk=channel_id).update(archived=True)
+
+
+@slack_task("refresh_slack_channel")
+def refresh_slack_channel(channel_id: str):
+    """Refreshes a Slack channel, after the calls of interactive changes"""
+
+    channel = (
+        SlackChannel.objects.select_related("show")
+        .filter(pk=channel_id, archived=False)
+        .first()
+    )
+    if channel is not None:
+        with slack_priority(Priority.BULK):
+            channel.force_refresh()
+
+
+@slack_task("sync_slack_directory")
+def sync_slack_directory():
+    """Matches the SlackUsers of all members to the workspace directory"""
+
+    with slack_priority(Priority.BULK):
+        SlackUser.objects.sync()
@@ -0,0 +1,103 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from faker import Faker
+
+from slack.managers import SLACK_DIRECTORY_KEY
+from slack.models import SlackUser, MissingSlackUser
+from slack.service import SlackBoss
+from slack.tests.utils import PatchSlackBossMixin
+from users.models import User
+from users.tests.utils import fake_user_data
+
+
+class TestSlackDirectorySync(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(cache.delete, SLACK_DIRECTORY_KEY)
+
+        self.faker = Faker()
+        Faker.seed(0)
+
+        # No member is in the workspace until synced
+        self.mock_fetch_user.side_effect = None
+        self.mock_fetch_user.return_value = None
+        self.members = [
+            User.objects.create(**fake_user_data(self.faker)).member for _ in range(4)
+        ]
+        SlackUser.objects.bulk_create(
+            [
+                SlackUser(id=f"U{i}", member=member)
+                for i, member in enumerate(self.members[:3])
+            ]
+        )
+        self.mock_fetch_user.reset_mock()
+        # The first member is unchanged, the second has a new Slack ID, the
+        # third left the workspace and the fourth joined it
+        self.directory = {
+            self.members[0].user.email.lower(): "U0",
+            self.members[1].user.email.lower(): "U9",
+            self.members[3].user.email.lower(): "U3",
+        }
+
+        fetch_directory_patcher = patch.object(
+            SlackBoss, "fetch_directory", return_value=self.directory
+        )
+        self.mock_fetch_directory = fetch_directory_patcher.start()
+        self.addCleanup(fetch_directory_patcher.stop)
+
+    def get_slack_ids(self):
+        return dict(SlackUser.objects.values_list("member_id", "id"))
+
+    def test_sync(self):
+        self.assertEqual(SlackUser.objects.sync(), (1, 1, 1))
+        self.mock_fetch_directory.assert_called_once()
+        self.assertEqual(
+            self.get_slack_ids(),
+            {
+                self.members[0].pk: "U0",
+                self.members[1].pk: "U9",
+                self.members[3].pk: "U3",
+            },
+        )
+        # Members missing from the directory are not looked up on their own
+        self.assertEqual(
+            list(MissingSlackUser.objects.values_list("member_id", flat=True)),
+            [self.members[2].pk],
+        )
+        self.members[2].refresh_from_db()
+        self.members[2].save()
+        self.mock_fetch_user.assert_not_called()
+        self.assertEqual(SlackUser.objects.sync(), (0, 0, 0))
+
+    def test_sync_queries_do_not_grow_with_members(self):
+        with self.assertNumQueries(7):
+            SlackUser.objects.sync(self.directory)
+        for _ in range(3):
+            User.objects.create(**fake_user_data(self.faker))
+        SlackUser.objects.all().delete()
+        with self.assertNumQueries(6):
+            SlackUser.objects.sync(self.directory)
+
+    def test_synced_directory_is_looked_up(self):
+        SlackUser.objects.sync()
+        user_data = fake_user_data(self.faker)
+        self.directory[user_data["email"].lower()] = "U5"
+        cache.set(SLACK_DIRECTORY_KEY, self.directory)
+
+        member = User.objects.create(**user_data).member
+        self.mock_fetch_user.assert_not_called()
+        self.assertEqual(member.slack_user.id, "U5")
+
+    def test_members_missing_from_directory_are_fetched(self):
+        SlackUser.objects.sync()
+        User.objects.create(**fake_user_data(self.faker))
+        self.mock_fetch_user.assert_called_once()
+
+    def test_command(self):
+        out = StringIO()
+        call_command("sync_slack_directory", stdout=out)
+        self.assertIn("Created 1, replaced 1 and deleted 1 Slack users", out.getvalue())
@@ -1,12 +1,14 @@
+from datetime import timedelta
 from unittest.mock import Mock, MagicMock
 
 from django.test import TestCase
+from django.utils import timezone
 from faker import Faker
 
 from common.exceptions import WrongUsage
 from shows.models import Member, Show, Role
 from shows.tests.utils import fake_show_data
-from slack.models import SlackUser, SlackChannel
+from slack.models import SlackUser, MissingSlackUser, SlackChannel
 from slack.tests.utils import fake_slack_id, PatchSlackBossMixin, fake_slack_timestamp
 
 # logging.disable(logging.WARNING)
@@ -30,6 +32,56 @@ class TestSlackUser(TestCase):
         self.assertEqual(mention_tag, f"<@{self.user_id}>")
 
 
+class TestMissingSlackUser(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        faker = Faker()
+        Faker.seed(517)
+
+        # The member is not in the Slack workspace
+        self.mock_fetch_user.side_effect = None
+        self.mock_fetch_user.return_value = None
+        self.user = User.objects.create(**fake_user_data(faker))
+        self.member = self.user.member
+        self.show = Show.objects.create(**fake_show_data(faker))
+
+    def test_missing_member_is_marked(self):
+        self.mock_fetch_user.assert_called_once()
+        missing = MissingSlackUser.objects.get(member=self.member)
+        self.assertEqual(missing.email, self.user.email)
+
+    def test_missing_member_is_not_looked_up_again(self):
+        self.member.save()
+        Role.objects.create(show=self.show, performer=self.member).delete()
+        self.assertIsNone(Member.objects.get(pk=self.member.pk).fetch_slack_user())
+        self.mock_fetch_user.assert_called_once()
+
+    def test_stale_marker_is_looked_up_again(self):
+        MissingSlackUser.objects.update(checked_at=timezone.now() - timedelta(days=2))
+        Member.objects.get(pk=self.member.pk).fetch_slack_user()
+        self.assertEqual(self.mock_fetch_user.call_count, 2)
+        self.assertGreater(
+            MissingSlackUser.objects.get().checked_at,
+            timezone.now() - timedelta(minutes=1),
+        )
+
+    def test_changed_email_is_looked_up_again(self):
+        self.user.email = "new." + self.user.email
+        self.user.save()
+        Member.objects.get(pk=self.member.pk).fetch_slack_user()
+        self.assertEqual(self.mock_fetch_user.call_count, 2)
+
+    def test_refresh(self):
+        self.mock_fetch_user.return_value = "U1"
+        member = Member.objects.get(pk=self.member.pk)
+        self.assertIsNone(member.fetch_slack_user())
+
+        slack_user = member.fetch_slack_user(refresh=True)
+        self.assertEqual(slack_user.id, "U1")
+        self.assertFalse(MissingSlackUser.objects.exists())
+
+
 class TestSlackChannel(PatchSlackBossMixin, TestCase):
     def setUp(self):
         super().setUp()
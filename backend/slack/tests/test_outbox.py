@@ -0,0 +1,266 @@
+from datetime import time, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from faker import Faker
+
+from shows.models import Role, Round, Show
+from shows.tests.utils import fake_show_data
+from slack.exceptions import SlackBossException
+from slack.models import SlackChannel, SlackTask
+from slack.outbox import enqueue_slack_task, run_due_slack_tasks, schedule_slack_task
+from slack.tests.utils import PatchSlackBossMixin
+from users.models import User
+from users.tests.utils import fake_user_data
+
+
+@override_settings(SLACK_OUTBOX_ENABLED=True, SLACK_OUTBOX_DEBOUNCE=0)
+class TestSlackOutbox(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.faker = Faker()
+        Faker.seed(0)
+
+        self.user = User.objects.create(**fake_user_data(self.faker))
+        self.member = self.user.member
+        self.show = Show.objects.create(
+            **fake_show_data(self.faker), status=Show.STATUSES.published
+        )
+
+    def run_tasks(self):
+        return run_due_slack_tasks(limit=100)
+
+    def test_saves_do_not_call_slack(self):
+        self.mock_fetch_user.assert_not_called()
+        self.mock_create_channel.assert_not_called()
+        self.assertEqual(
+            set(SlackTask.objects.values_list("name", flat=True)),
+            {"fetch_slack_user", "sync_show_channel"},
+        )
+
+        self.assertEqual(self.run_tasks(), 2)
+        self.mock_fetch_user.assert_called_once()
+        self.mock_create_channel.assert_called_once()
+        self.assertTrue(SlackChannel.objects.filter(show=self.show).exists())
+        self.assertFalse(
+            SlackTask.objects.exclude(status=SlackTask.STATUSES.done).exists()
+        )
+        self.assertEqual(self.run_tasks(), 0)
+
+    def test_roles_are_joined_by_the_worker(self):
+        self.run_tasks()
+        role = Role.objects.create(show=self.show, performer=self.member)
+        self.mock_invite_users_to_channel.reset_mock()
+        self.run_tasks()
+        self.mock_invite_users_to_channel.assert_called_once()
+
+        role.delete()
+        self.mock_remove_users_from_channel.assert_not_called()
+        self.run_tasks()
+        self.mock_remove_users_from_channel.assert_called_once()
+
+    def test_tasks_of_a_member_run_in_order(self):
+        self.run_tasks()
+        # A sign-up followed by a withdrawal
+        role = Role.objects.create(show=self.show, performer=self.member)
+        role.delete()
+
+        batches = []
+
+        class ReversingExecutor:
+            """Runs each batch last task first, as concurrent workers might"""
+
+            def map(self, func, tasks):
+                tasks = list(tasks)
+                if tasks:
+                    batches.append([task.name for task in tasks])
+                return [func(task) for task in reversed(tasks)]
+
+        with patch("slack.outbox.close_old_connections"):
+            while run_due_slack_tasks(limit=100, executor=ReversingExecutor()):
+                pass
+        self.assertEqual(batches, [["join_slack_channels"], ["leave_slack_channels"]])
+        self.mock_invite_users_to_channel.assert_called_once()
+        self.mock_remove_users_from_channel.assert_called_once()
+
+    def test_retried_tasks_hold_back_later_tasks_of_a_member(self):
+        self.run_tasks()
+        self.mock_invite_users_to_channel.side_effect = SlackBossException(
+            "ratelimited"
+        )
+        role = Role.objects.create(show=self.show, performer=self.member)
+        role.delete()
+
+        self.assertEqual(self.run_tasks(), 1)
+        join = SlackTask.objects.get(name="join_slack_channels")
+        self.assertEqual(join.status, SlackTask.STATUSES.pending)
+        # The leave is due, but waits for the join to be retried
+        self.assertEqual(self.run_tasks(), 0)
+        self.mock_remove_users_from_channel.assert_not_called()
+
+        self.mock_invite_users_to_channel.side_effect = None
+        SlackTask.objects.filter(pk=join.pk).update(run_after=timezone.now())
+        self.assertEqual(self.run_tasks(), 1)
+        self.assertEqual(self.run_tasks(), 1)
+        self.mock_remove_users_from_channel.assert_called_once()
+        self.assertFalse(
+            SlackTask.objects.exclude(status=SlackTask.STATUSES.done).exists()
+        )
+
+    def test_deleted_show_channel_is_archived(self):
+        self.run_tasks()
+        channel_id = SlackChannel.objects.get(show=self.show).id
+        self.show.delete()
+        self.mock_archive_channel.assert_not_called()
+        self.run_tasks()
+        self.mock_archive_channel.assert_called_once_with(channel_id=channel_id)
+
+    def test_idempotency_key(self):
+        for _ in range(2):
+            enqueue_slack_task(
+                "refresh_slack_channel", {"channel_id": "C1"}, key="refresh:C1"
+            )
+        self.assertEqual(
+            SlackTask.objects.filter(idempotency_key="refresh:C1").count(), 1
+        )
+
+    @override_settings(SLACK_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_tasks_are_retried_with_backoff(self):
+        SlackTask.objects.all().delete()
+        enqueue_slack_task("fetch_slack_user", {"member_id": self.member.pk})
+        self.mock_fetch_user.side_effect = SlackBossException("ratelimited")
+
+        self.run_tasks()
+        task = SlackTask.objects.get()
+        self.assertEqual(task.status, SlackTask.STATUSES.pending)
+        self.assertEqual(task.attempts, 1)
+        self.assertIn("ratelimited", task.last_error)
+        self.assertGreater(task.run_after, timezone.now() + timedelta(seconds=9))
+        self.assertEqual(self.run_tasks(), 0)
+
+        SlackTask.objects.update(run_after=timezone.now())
+        self.run_tasks()
+        task.refresh_from_db()
+        self.assertEqual(task.status, SlackTask.STATUSES.failed)
+        self.assertEqual(task.attempts, 2)
+
+    def test_expired_leases_are_claimed_again(self):
+        lease = timedelta(minutes=5)
+        claimed = SlackTask.objects.claim(10, lease)
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(SlackTask.objects.claim(10, lease), [])
+
+        # The worker running them stopped
+        SlackTask.objects.update(run_after=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(SlackTask.objects.claim(10, lease)), 2)
+
+    def test_worker_command(self):
+        out = StringIO()
+        with patch("slack.outbox.TASKS", {}) as tasks:
+            tasks["fetch_slack_user"] = lambda member_id: None
+            tasks["sync_show_channel"] = lambda show_id, updated_fields: None
+            tasks["sync_slack_directory"] = lambda: None
+            call_command("slack_worker", "--once", "--concurrency=1", stdout=out)
+        # The periodic directory sync is scheduled once the queue is empty
+        self.assertIn("Ran 3 Slack tasks", out.getvalue())
+        self.assertEqual(
+            SlackTask.objects.filter(status=SlackTask.STATUSES.done).count(), 3
+        )
+
+    def test_scheduled_tasks_are_queued_once_per_interval(self):
+        for _ in range(2):
+            schedule_slack_task("sync_slack_directory", 60 * 60)
+        self.assertEqual(
+            SlackTask.objects.filter(name="sync_slack_directory").count(), 1
+        )
+
+
+@override_settings(
+    SLACK_OUTBOX_ENABLED=True, SLACK_OUTBOX_DEBOUNCE=10, SLACK_OUTBOX_MAX_DEBOUNCE=60
+)
+class TestCoalescedShowUpdates(PatchSlackBossMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.faker = Faker()
+        Faker.seed(0)
+
+        self.show = Show.objects.create(
+            **fake_show_data(self.faker), status=Show.STATUSES.published
+        )
+        self.run_due_tasks()
+        # Update messages are only sent once the briefing is a few seconds old
+        SlackChannel.objects.update(briefing_ts="1600000000.000100")
+        self.mock_send_message_in_channel.reset_mock()
+        self.mock_rename_channel.reset_mock()
+
+    @staticmethod
+    def run_due_tasks():
+        SlackTask.objects.filter(status=SlackTask.STATUSES.pending).update(
+            run_after=timezone.now()
+        )
+        return run_due_slack_tasks(limit=100)
+
+    def get_pending_syncs(self):
+        return SlackTask.objects.filter(
+            name="sync_show_channel", status=SlackTask.STATUSES.pending
+        )
+
+    def test_new_show_channel_is_created_once(self):
+        self.assertEqual(self.mock_create_channel.call_count, 1)
+
+    def test_updates_are_coalesced(self):
+        self.show.name = "Renamed show"
+        self.show.save()
+        self.show.lions = 7
+        self.show.save()
+        Round.objects.create(show=self.show, time=time(18, 30))
+        self.show.refresh_from_db()
+        self.show.name = "Renamed show again"
+        self.show.save()
+
+        task = self.get_pending_syncs().get()
+        self.assertEqual(task.payload["updated_fields"], ["name", "lions", "time"])
+        self.assertGreater(task.run_after, timezone.now())
+        self.assertEqual(run_due_slack_tasks(limit=100), 0)
+
+        self.run_due_tasks()
+        # The briefing is updated once, along with one update message
+        self.assertEqual(self.mock_send_message_in_channel.call_count, 2)
+        message = self.mock_send_message_in_channel.call_args.kwargs["text"]
+        self.assertIn("name, number of lions and show time have been updated", message)
+        self.mock_rename_channel.assert_called_once()
+
+    def test_updates_are_delayed_at_most_the_max_debounce(self):
+        self.show.name = "Renamed show"
+        self.show.save()
+        self.get_pending_syncs().update(
+            created_at=timezone.now() - timedelta(seconds=55)
+        )
+        self.show.lions = 7
+        self.show.save()
+        self.assertLess(
+            self.get_pending_syncs().get().run_after,
+            timezone.now() + timedelta(seconds=6),
+        )
+
+    def test_claimed_tasks_are_not_merged(self):
+        self.show.name = "Renamed show"
+        self.show.save()
+        self.get_pending_syncs().update(status=SlackTask.STATUSES.running)
+        self.show.lions = 7
+        self.show.save()
+        self.assertEqual(
+            self.get_pending_syncs().get().payload["updated_fields"], ["lions"]
+        )
+
+
+class TestSlackOutboxDisabled(PatchSlackBossMixin, TestCase):
+    def test_side_effects_run_immediately(self):
+        Show.objects.create(**fake_show_data(Faker()), status=Show.STATUSES.published)
+        self.mock_create_channel.assert_called_once()
+        self.assertFalse(SlackTask.objects.exists())
@@ -0,0 +1,98 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, override_settings
+from slack_sdk.errors import SlackApiError
+
+from slack.exceptions import SlackRateLimitException
+from slack.ratelimit import (
+    Priority,
+    RateLimiter,
+    TokenBucket,
+    get_priority,
+    slack_priority,
+)
+from slack.service import SlackBoss
+
+
+class TestTokenBucket(SimpleTestCase):
+    def test_bursts_then_waits_for_rate(self):
+        # 600 calls per minute, in bursts of up to 60
+        bucket = TokenBucket(600)
+        for _ in range(60):
+            self.assertTrue(bucket.acquire(Priority.INTERACTIVE, timeout=0))
+        self.assertFalse(bucket.acquire(Priority.INTERACTIVE, timeout=0))
+        start = time.monotonic()
+        self.assertTrue(bucket.acquire(Priority.INTERACTIVE, timeout=1))
+        self.assertGreater(time.monotonic() - start, 0.05)
+
+    def test_interactive_calls_go_first(self):
+        bucket = TokenBucket(600)
+        while bucket.acquire(Priority.INTERACTIVE, timeout=0):
+            pass
+
+        order = []
+
+        def call(priority):
+            bucket.acquire(priority, timeout=5)
+            order.append(priority)
+
+        bulk = [threading.Thread(target=call, args=(Priority.BULK,)) for _ in range(2)]
+        for thread in bulk:
+            thread.start()
+        time.sleep(0.02)
+        interactive = threading.Thread(target=call, args=(Priority.INTERACTIVE,))
+        interactive.start()
+        for thread in bulk + [interactive]:
+            thread.join()
+        self.assertEqual(order[0], Priority.INTERACTIVE)
+
+    def test_pause(self):
+        bucket = TokenBucket(6000)
+        bucket.pause(0.2)
+        self.assertFalse(bucket.acquire(Priority.INTERACTIVE, timeout=0.1))
+        start = time.monotonic()
+        self.assertTrue(bucket.acquire(Priority.INTERACTIVE, timeout=1))
+        self.assertGreater(time.monotonic() - start, 0.05)
+
+    def test_priority_context(self):
+        self.assertEqual(get_priority(), Priority.INTERACTIVE)
+        with slack_priority(Priority.BULK):
+            self.assertEqual(get_priority(), Priority.BULK)
+        self.assertEqual(get_priority(), Priority.INTERACTIVE)
+
+
+class TestRateLimitedCalls(SimpleTestCase):
+    @patch("slack.service.WebClient")
+    def setUp(self, mock_web_client):
+        self.mock_client = MagicMock()
+        mock_web_client.return_value = self.mock_client
+        self.slack_boss = SlackBoss()
+
+        rate_limiter_patcher = patch("slack.service.rate_limiter", RateLimiter())
+        self.rate_limiter = rate_limiter_patcher.start()
+        self.addCleanup(rate_limiter_patcher.stop)
+
+    @staticmethod
+    def ratelimited(retry_after: str):
+        response = MagicMock(headers={"Retry-After": retry_after})
+        response.get.return_value = "ratelimited"
+        return SlackApiError(message="", response=response)
+
+    def test_retries_after_rate_limit(self):
+        self.mock_client.conversations_archive.side_effect = [
+            self.ratelimited("0.1"),
+            {"ok": True},
+        ]
+        start = time.monotonic()
+        self.assertTrue(self.slack_boss.archive_channel(channel_id="C1"))
+        self.assertGreater(time.monotonic() - start, 0.1)
+        self.assertEqual(self.mock_client.conversations_archive.call_count, 2)
+
+    @override_settings(SLACK_RATE_LIMIT_MAX_WAIT=0.1)
+    def test_gives_up_after_max_wait(self):
+        self.mock_client.conversations_archive.side_effect = self.ratelimited("5")
+        with self.assertRaises(SlackRateLimitException):
+            self.slack_boss.archive_channel(channel_id="C1")
+        self.mock_client.conversations_archive.assert_called_once()
@@ -11,6 +11,7 @@ from shows.models import Member, Show
 from shows.tests.utils import fake_show_name, fake_show_data
 from slack.exceptions import SlackTokenException, SlackBossException
 from slack.models import SlackChannel, SlackUser
+from slack.ratelimit import rate_limiter
 from slack.service import SlackBoss
 from slack.tests.utils import fake_slack_token, fake_slack_id, fake_slack_timestamp
 from users.models import User
@@ -180,6 +181,11 @@ class TestSlackBoss(SimpleTestCase):
         mock_web_client.return_value = self.mock_client
         self.slack_boss = SlackBoss()
 
+        # Calls to the mock client are not held back by Slack's rate limits
+        rate_limiter_patcher = patch.object(rate_limiter, "acquire", return_value=True)
+        rate_limiter_patcher.start()
+        self.addCleanup(rate_limiter_patcher.stop)
+
         self.generic_slack_api_error = SlackApiError(message="", response={"error": ""})
 
     @override_settings()
@@ -223,6 +229,51 @@ class TestSlackBoss(SimpleTestCase):
         with self.assertRaises(SlackBossException):
             self.slack_boss.fetch_user(email="")
 
+    def test_fetch_directory(self):
+        user_ids = [fake_slack_id(self.faker) for _ in range(4)]
+        pages = {
+            None: (
+                [
+                    {"id": user_ids[0], "profile": {"email": "Ann@Example.com"}},
+                    {
+                        "id": user_ids[1],
+                        "profile": {"email": "bot@example.com"},
+                        "is_bot": True,
+                    },
+                ],
+                "next",
+            ),
+            "next": (
+                [
+                    {
+                        "id": user_ids[2],
+                        "profile": {"email": "bo@example.com"},
+                        "deleted": True,
+                    },
+                    {"id": user_ids[3], "profile": {}},
+                ],
+                "",
+            ),
+        }
+
+        def mock_users_list(cursor: Optional[str] = None, limit: int = None):
+            members, next_cursor = pages[cursor]
+            return {
+                "ok": True,
+                "members": members,
+                "response_metadata": {"next_cursor": next_cursor},
+            }
+
+        self.mock_client.users_list.side_effect = mock_users_list
+
+        directory = self.slack_boss.fetch_directory()
+        self.assertEqual(directory, {"ann@example.com": user_ids[0]})
+        self.assertEqual(self.mock_client.users_list.call_count, 2)
+
+        self.mock_client.users_list.side_effect = self.generic_slack_api_error
+        with self.assertRaises(SlackBossException):
+            self.slack_boss.fetch_directory()
+
     def test_create_channel(self):
         show_name = fake_show_name(self.faker)
         channel_id = fake_slack_id(self.faker)
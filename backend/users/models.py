@@ -10,6 +10,7 @@ from django.utils.html import strip_tags
 from django.utils.translation import gettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
 
+from common.side_effects import run_or_defer
 from users.managers import UserManager
 from users.signals import signals
 from users.tokens import action_token, TokenAction
@@ -53,7 +54,8 @@ class User(AbstractUser):
         _subject = render_to_string(subject, context).replace("\n", " ").strip()
         html_message = render_to_string(template, context)
         message = strip_tags(html_message)
-        return send_mail(
+        return run_or_defer(
+            send_mail,
             subject=_subject,
             message=message,
             from_email=settings.DEFAULT_FROM_EMAIL,
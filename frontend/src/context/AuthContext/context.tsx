@@ -1,5 +1,5 @@
 import React, {createContext, useEffect, useState} from "react";
-import {handleApolloError, useMutation} from "../../services/graphql";
+import {createAPILink, handleApolloError, useMutation} from "../../services/graphql";
 import {useLocation, useNavigate} from "react-router-dom";
 import jwt_decode from "jwt-decode";
 import dayjs from "dayjs";
@@ -12,7 +12,6 @@ import {
 import {
     ApolloClient,
     ApolloError,
-    createHttpLink,
     InMemoryCache
 } from "@apollo/client";
 import {setContext} from "@apollo/client/link/context";
@@ -109,10 +108,6 @@ export const AuthProvider: React.FC<Props> = ({children}: Props) => {
 
     useEffect(() => {
         if (authTokens) {
-            const httpLink = createHttpLink({
-                uri: "/graphql/",
-            });
-
             const authLink = setContext(async (_, {headers}) => {
 
                 type TokenType = { exp: number; }
@@ -137,7 +132,9 @@ export const AuthProvider: React.FC<Props> = ({children}: Props) => {
 
             setClient(
                 new ApolloClient({
-                    link: authLink.concat(httpLink),
+                    link: authLink.concat(createAPILink(() => ({
+                        authorization: `JWT ${authTokens.access}`,
+                    }))),
                     cache: new InMemoryCache(),
                 })
             );
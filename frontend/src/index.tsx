@@ -2,12 +2,11 @@ import React from "react";
 import ReactDOM from "react-dom/client";
 import App from "./App";
 import {BrowserRouter} from "react-router-dom";
-import {ApolloClient, ApolloProvider, createHttpLink, InMemoryCache,} from "@apollo/client";
+import {ApolloClient, ApolloProvider, InMemoryCache,} from "@apollo/client";
+import {createAPILink} from "./services/graphql";
 
 const client = new ApolloClient({
-    link: createHttpLink({
-        uri: "/graphql/",
-    }), cache: new InMemoryCache(),
+    link: createAPILink(), cache: new InMemoryCache(),
 });
 
 const root = ReactDOM.createRoot(document.getElementById("root"));
@@ -1,4 +1,4 @@
-import React, {useContext, useState} from "react";
+import React, {useContext} from "react";
 import {
     Divider,
     Form,
@@ -19,7 +19,7 @@ import {UserContext} from "../../context/UserContext";
 import Header from "../../components/Navigation";
 import ProfileItem from "./components/ProfileItem";
 import ProfilePasswordItem from "./components/ProfilePasswordItem";
-import {QueryResult, useAuthQuery} from "../../services/graphql";
+import {useChoices} from "../../services/choices";
 import {
     EMAIL_VALIDATION_RULES,
     FIRST_NAME_VALIDATION_RULES,
@@ -30,41 +30,18 @@ import {
     toTitleCase
 } from "../../services/validation";
 import styles from "./style.module.css";
-import {
-    GET_CLASS_YEAR_CHOICES_QUERY,
-    GET_POSITION_CHOICES_QUERY,
-    GET_SCHOOL_CHOICES_QUERY
-} from "./queries";
 import Loader from "../../components/Loader";
 
 
 const ProfilePage = () => {
 
     const {user} = useContext(UserContext);
-    const [schoolChoices, setSchoolChoices] = useState(null);
-    const [classYearChoices, setClassYearChoices] = useState(null);
-    const [positionChoices, setPositionChoices] = useState(null);
-
-    const {loading: schoolChoicesLoading}: QueryResult = useAuthQuery(GET_SCHOOL_CHOICES_QUERY, {
-        onCompleted: ({schoolChoices}: { schoolChoices: string }) => {
-            setSchoolChoices(JSON.parse(schoolChoices));
-        },
-    });
-
-    const {loading: classYearChoicesLoading}: QueryResult = useAuthQuery(GET_CLASS_YEAR_CHOICES_QUERY, {
-        onCompleted: ({classYearChoices}: { classYearChoices: string }) => {
-            setClassYearChoices(JSON.parse(classYearChoices));
-        },
-    });
-
-    const {loading: positionChoicesLoading}: QueryResult = useAuthQuery(GET_POSITION_CHOICES_QUERY, {
-        onCompleted: ({positionChoices}: { positionChoices: string }) => {
-            setPositionChoices(JSON.parse(positionChoices));
-        },
-    });
+    const choices = useChoices();
+    const schoolChoices = choices?.school;
+    const classYearChoices = choices?.classYear;
+    const positionChoices = choices?.position;
 
-    const isLoading: boolean = classYearChoicesLoading || schoolChoicesLoading || positionChoicesLoading
-        || !classYearChoices || !schoolChoices || !positionChoices;
+    const isLoading: boolean = !choices;
 
     return <Layout>
         <Header/>
@@ -1,23 +1,5 @@
 import {gql} from "@apollo/client";
 
-export const GET_SCHOOL_CHOICES_QUERY = gql`
-	{
-		schoolChoices
-	}
-`;
-
-export const GET_CLASS_YEAR_CHOICES_QUERY = gql`
-	{
-		classYearChoices
-	}
-`;
-
-export const GET_POSITION_CHOICES_QUERY = gql`
-    {
-        positionChoices
-    }
-`;
-
 export const UPDATE_PROFILE_MUTATION = gql`
     mutation UpdateProfile (
         $email: String
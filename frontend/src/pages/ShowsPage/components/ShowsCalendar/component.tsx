@@ -10,7 +10,8 @@ const ShowCalendar = () => {
 
     const {
         shows,
-        view
+        view,
+        setCalendarWindow,
     }: ShowContextInterface = useContext(ShowsTableContext);
 
     type TimeUnit = "day" | "month";
@@ -54,9 +55,21 @@ const ShowCalendar = () => {
         return render;
     };
 
+    const onPanelChange = (date: Dayjs, mode: "month" | "year") => {
+        if (mode === "year") {
+            setCalendarWindow([date.startOf("year"), date.endOf("year")]);
+        } else {
+            setCalendarWindow([
+                date.startOf("month").startOf("week"),
+                date.endOf("month").endOf("week"),
+            ]);
+        }
+    };
+
     return view == Views.CALENDAR && <Calendar
         dateCellRender={cellRender("day")}
         monthCellRender={cellRender("month")}
+        onPanelChange={onPanelChange}
         validRange={[dayjs("2022-09-01"), dayjs("2023-05-31")]}
         style={{padding: "10px 25px"}}
     />;
@@ -4,21 +4,21 @@ import {
     handleApolloError,
     useAuthLazyQuery,
     useAuthMutation,
-    useAuthQuery
+    useAuthSubscription
 } from "../../../../services/graphql";
 import {AuthContext} from "../../../../context/AuthContext";
 import {
     CREATE_ROLE_MUTATION,
     DELETE_ROLE_MUTATION,
-    GET_SHOW_PRIORITY_CHOICES_QUERY,
-    GET_SHOW_STATUS_CHOICES_QUERY,
-    GET_SHOWS_QUERY
+    GET_SHOWS_QUERY,
+    ROSTER_CHANGED_SUBSCRIPTION
 } from "./queries";
 import {Show, User} from "../../../../types/types";
-import {ShowContextInterface} from "./types";
+import {ShowContextInterface, ShowFilters} from "./types";
 import {Options, Views} from "../../components/ShowsTableControls";
 import {UserContext} from "../../../../context/UserContext";
-import dayjs from "dayjs";
+import dayjs, {Dayjs} from "dayjs";
+import {useChoices} from "../../../../services/choices";
 
 const ShowsTableContext = createContext(undefined);
 
@@ -32,31 +32,44 @@ export const ShowsTableProvider: React.FC<Props> = ({children}: Props) => {
     const {logoutUser} = useContext(AuthContext);
     const {user}: { user: User } = useContext(UserContext);
 
-    const [showPriorityChoices, setShowPriorityChoices] = useState(null);
-    useAuthQuery(GET_SHOW_PRIORITY_CHOICES_QUERY, {
-        onCompleted: ({showPriorityChoices}) => {
-            setShowPriorityChoices(JSON.parse(showPriorityChoices));
-        },
-    });
-
-    const [showStatusChoices, setShowStatusChoices] = useState(null);
-    useAuthQuery(GET_SHOW_STATUS_CHOICES_QUERY, {
-        onCompleted: ({showStatusChoices}) => {
-            setShowStatusChoices(JSON.parse(showStatusChoices));
-        },
-    });
+    const choices = useChoices();
+    const showPriorityChoices = choices?.showPriority ?? null;
+    const showStatusChoices = choices?.showStatus ?? null;
 
     const [view, setView] = useState<Views>(Views.TABLE);
     const [optionsFilter, setOptionsFilter] = useState<Options>(Options.UPCOMING);
     const [needsRefresh, setNeedsRefresh] = useState<boolean>(true);
+    const [calendarWindow, setCalendarWindow] = useState<[Dayjs, Dayjs]>([
+        dayjs().startOf("month").startOf("week"),
+        dayjs().endOf("month").endOf("week"),
+    ]);
+
+    const dateFormat = "YYYY-MM-DD";
+    const filters: ShowFilters = {};
+    switch (optionsFilter) {
+        case Options.MINE:
+            filters.performerId = user?.member?.id;
+            break;
+        case Options.UPCOMING:
+            filters.dateFrom = dayjs().format(dateFormat);
+            break;
+        case Options.PAST:
+            filters.dateTo = dayjs().subtract(1, "day").format(dateFormat);
+            break;
+    }
+    if (view === Views.CALENDAR) {
+        const [windowStart, windowEnd] = calendarWindow;
+        if (!filters.dateFrom || windowStart.isAfter(filters.dateFrom)) {
+            filters.dateFrom = windowStart.format(dateFormat);
+        }
+        if (!filters.dateTo || windowEnd.isBefore(filters.dateTo)) {
+            filters.dateTo = windowEnd.format(dateFormat);
+        }
+    }
+    const filtersKey = JSON.stringify(filters);
 
     const [shows, setShows] = useState<Show[]>([]);
     const [getShows] = useAuthLazyQuery(GET_SHOWS_QUERY, {
-        onCompleted: ({shows}) => {
-            shows.forEach(show => show.date = dayjs(show.date));
-            setShows(shows);
-            setNeedsRefresh(false);
-        },
         onError: () => logoutUser(),
         fetchPolicy: "network-only",
         nextFetchPolicy: "network-only",
@@ -64,10 +77,35 @@ export const ShowsTableProvider: React.FC<Props> = ({children}: Props) => {
 
     useEffect(() => {
         const fetchShows = async () => {
-            await getShows();
+            const fetchedShows: Show[] = [];
+            let after: string = null;
+            let hasNextPage = true;
+            while (hasNextPage) {
+                const {data} = await getShows({variables: {...JSON.parse(filtersKey), after}});
+                if (!data) return;
+                const {pageInfo, edges} = data.shows;
+                edges.forEach(({node}) => fetchedShows.push({...node, date: dayjs(node.date)}));
+                hasNextPage = pageInfo.hasNextPage;
+                after = pageInfo.endCursor;
+            }
+            setShows(fetchedShows);
+            setNeedsRefresh(false);
         };
         fetchShows().catch(console.error);
-    }, [needsRefresh, getShows]);
+    }, [needsRefresh, getShows, filtersKey]);
+
+    // Members joining and leaving shows are pushed as they happen, rather than
+    // refetching every show
+    useAuthSubscription(ROSTER_CHANGED_SUBSCRIPTION, {
+        onSubscriptionData: ({subscriptionData}) => {
+            const {show, member, joined} = subscriptionData.data.rosterChanged;
+            setShows((currentShows: Show[]) => currentShows.map((currentShow) => {
+                if (currentShow.id !== show.id) return currentShow;
+                const performers = currentShow.performers.filter((performer) => performer.user.id !== member.user.id);
+                return {...currentShow, performers: joined ? [...performers, member] : performers};
+            }));
+        },
+    });
 
     const [createRole] = useAuthMutation(CREATE_ROLE_MUTATION, {
         onCompleted: async ({createRole}) => {
@@ -111,31 +149,8 @@ export const ShowsTableProvider: React.FC<Props> = ({children}: Props) => {
         }
     };
 
-    const isPerforming = (show: Show) => {
-        for (const performer of show.performers) {
-            if (performer.user.id === user.id) return true;
-        }
-        return false;
-    };
-
-    let filtered_shows: Show[];
-    switch (optionsFilter) {
-        case Options.ALL:
-            filtered_shows = shows;
-            break;
-        case Options.MINE:
-            filtered_shows = shows.filter(isPerforming);
-            break;
-        case Options.UPCOMING:
-            filtered_shows = shows.filter((show: Show) => !dayjs().isAfter(show.date, "day"));
-            break;
-        case Options.PAST:
-            filtered_shows = shows.filter((show: Show) => dayjs().isAfter(show.date, "day"));
-            break;
-    }
-
     const contextData: ShowContextInterface = {
-        shows: filtered_shows,
+        shows: shows,
         showPriorityChoices: showPriorityChoices,
         showStatusChoices: showStatusChoices,
         view: view,
@@ -144,6 +159,7 @@ export const ShowsTableProvider: React.FC<Props> = ({children}: Props) => {
         setView: setView,
         setOptionsFilter: setOptionsFilter,
         setNeedsRefresh: setNeedsRefresh,
+        setCalendarWindow: setCalendarWindow,
         addToShowRoster: addToShowRoster,
         removeFromShowRoster: removeFromShowRoster,
     };
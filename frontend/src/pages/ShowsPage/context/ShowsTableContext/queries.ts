@@ -1,45 +1,53 @@
 import {gql} from "@apollo/client";
 
 export const GET_SHOWS_QUERY = gql`
-	{
-		shows {
-			id
-			name
-			priority
-			date
-			time
-			rounds {
-				id
-				time
-			}
-			address
-			lions
-			performers {
-				user {
-					id
-					firstName
-					lastName
-				}
+	query GetShows($after: String, $dateFrom: Date, $dateTo: Date, $performerId: ID) {
+		shows(after: $after, dateFrom: $dateFrom, dateTo: $dateTo, performerId: $performerId) {
+			pageInfo {
+				hasNextPage
+				endCursor
 			}
-			point {
-				user {
+			edges {
+				node {
 					id
-					firstName
-					lastName
+					name
+					priority
+					date
+					time
+					rounds {
+						id
+						time
+					}
+					address
+					lions
+					performers {
+						user {
+							id
+							firstName
+							lastName
+						}
+					}
+					point {
+						user {
+							id
+							firstName
+							lastName
+						}
+					}
+					contact {
+						firstName
+						lastName
+						phone
+						email
+					}
+					isCampus
+					isOutOfCity
+					isOpen
+					isPending
+					status
+					notes
 				}
 			}
-			contact {
-				firstName
-				lastName
-				phone
-				email
-			}
-			isCampus
-			isOutOfCity
-			isOpen
-			isPending
-			status
-			notes
 		}
 	}
 `;
@@ -82,14 +90,20 @@ export const DELETE_ROLE_MUTATION = gql`
 	}
 `;
 
-export const GET_SHOW_PRIORITY_CHOICES_QUERY = gql`
-	{
-		showPriorityChoices
+export const ROSTER_CHANGED_SUBSCRIPTION = gql`
+	subscription RosterChanged {
+		rosterChanged {
+			show {
+				id
+			}
+			member {
+				user {
+					id
+					firstName
+					lastName
+				}
+			}
+			joined
+		}
 	}
 `;
-
-export const GET_SHOW_STATUS_CHOICES_QUERY = gql`
-	{
-		showStatusChoices
-	}
-`;
\ No newline at end of file
@@ -1,3 +1,4 @@
+import {Dayjs} from "dayjs";
 import {Show} from "../../../../types/types";
 import {Options, Views} from "../../components/ShowsTableControls";
 
@@ -11,6 +12,13 @@ export interface ShowContextInterface {
     setView: (view: Views) => void,
     setOptionsFilter: (optionsFilter: Options) => void,
     setNeedsRefresh: (needsRefresh: boolean) => void,
+    setCalendarWindow: (calendarWindow: [Dayjs, Dayjs]) => void,
     addToShowRoster: (id: number) => void,
     removeFromShowRoster: (id: number) => void,
-}
\ No newline at end of file
+}
+
+export interface ShowFilters {
+    dateFrom?: string,
+    dateTo?: string,
+    performerId?: number,
+}
@@ -0,0 +1,35 @@
+import {useEffect, useState} from "react";
+import {Choices} from "../../types";
+
+let choicesRequest: Promise<Choices> = null;
+
+const fetchChoices = (): Promise<Choices> => {
+    if (!choicesRequest) {
+        choicesRequest = fetch("/api/choices/").then((response) => {
+            if (!response.ok) {
+                throw new Error(`Failed to fetch choices: ${response.status}`);
+            }
+            return response.json();
+        });
+        choicesRequest.catch(() => {
+            choicesRequest = null;
+        });
+    }
+    return choicesRequest;
+};
+
+export const useChoices = (): Choices | null => {
+    const [choices, setChoices] = useState<Choices>(null);
+
+    useEffect(() => {
+        let mounted = true;
+        fetchChoices()
+            .then((fetchedChoices) => mounted && setChoices(fetchedChoices))
+            .catch(console.error);
+        return () => {
+            mounted = false;
+        };
+    }, []);
+
+    return choices;
+};
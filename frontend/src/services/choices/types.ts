@@ -0,0 +1,10 @@
+export type ChoiceMap = Record<string, string>;
+
+export interface Choices {
+    school: ChoiceMap;
+    classYear: ChoiceMap;
+    position: ChoiceMap;
+    showPriority: ChoiceMap;
+    showStatus: ChoiceMap;
+    performanceRole: ChoiceMap;
+}
@@ -1,3 +1,4 @@
 export * from "./useAuthQuery";
 export * from "./useAuthMutation";
-export * from "./useAuthLazyQuery";
\ No newline at end of file
+export * from "./useAuthLazyQuery";
+export * from "./useAuthSubscription";
\ No newline at end of file
@@ -0,0 +1,8 @@
+import {DocumentNode, SubscriptionHookOptions, useSubscription} from "@apollo/client";
+import {useContext} from "react";
+import {AuthContext} from "../../../../context/AuthContext";
+
+export const useAuthSubscription = (subscription: DocumentNode, args: SubscriptionHookOptions) => {
+    const {client} = useContext(AuthContext);
+    return useSubscription(subscription, {...args, client: client});
+};
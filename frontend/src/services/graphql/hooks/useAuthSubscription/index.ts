@@ -0,0 +1 @@
+export * from "./hook";
\ No newline at end of file
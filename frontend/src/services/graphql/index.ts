@@ -1,4 +1,5 @@
 export {useMutation} from "@apollo/client";
 export * from "./service";
 export * from "./hooks";
+export * from "./links";
 export * from "./types";
\ No newline at end of file
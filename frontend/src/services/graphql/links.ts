@@ -0,0 +1,59 @@
+import {ApolloLink, HttpLink, Operation, split} from "@apollo/client";
+import {BatchHttpLink} from "@apollo/client/link/batch-http";
+import {createPersistedQueryLink} from "@apollo/client/link/persisted-queries";
+import {getMainDefinition} from "@apollo/client/utilities";
+import {WebSocketLink} from "./websocket";
+
+const sha256 = async (query: string): Promise<string> => {
+    const digest = await crypto.subtle.digest("SHA-256", new TextEncoder().encode(query));
+    return Array.from(new Uint8Array(digest))
+        .map((byte) => byte.toString(16).padStart(2, "0"))
+        .join("");
+};
+
+type ConnectionParams = () => Record<string, unknown>;
+
+// Subscriptions are served over a WebSocket, which connects on the first
+// subscription and is authenticated by the params it connects with
+const createSubscriptionLink = (connectionParams?: ConnectionParams) => new WebSocketLink(
+    `${window.location.protocol === "https:" ? "wss:" : "ws:"}//${window.location.host}/graphql/`,
+    connectionParams,
+);
+
+// Root fields whose responses the server tags with an ETag when queried with GET
+const CONDITIONAL_FIELDS = ["shows", "__typename"];
+
+const isConditionalQuery = ({query}: Operation): boolean => {
+    const definition = getMainDefinition(query);
+    return definition.kind === "OperationDefinition" && definition.operation === "query"
+        && definition.selectionSet.selections.every(
+            (selection) => selection.kind === "Field" && CONDITIONAL_FIELDS.includes(selection.name.value)
+        );
+};
+
+// Queries of shows are sent with GET, so that the browser revalidates its copy
+// of the response and the server answers with an empty 304 while the shows
+// are unchanged. Other operations issued together are sent in one request, up
+// to the batch size accepted by the server
+const createHttpLink = () => split(
+    isConditionalQuery,
+    createPersistedQueryLink({sha256, useGETForHashedQueries: true}).concat(
+        new HttpLink({uri: "/graphql/", useGETForQueries: true})
+    ),
+    createPersistedQueryLink({sha256}).concat(
+        new BatchHttpLink({
+            uri: "/graphql/",
+            batchMax: 10,
+            batchInterval: 20,
+        })
+    ),
+);
+
+export const createAPILink = (connectionParams?: ConnectionParams): ApolloLink => split(
+    ({query}) => {
+        const definition = getMainDefinition(query);
+        return definition.kind === "OperationDefinition" && definition.operation === "subscription";
+    },
+    createSubscriptionLink(connectionParams),
+    createHttpLink(),
+);
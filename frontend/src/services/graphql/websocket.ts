@@ -0,0 +1,134 @@
+import {ApolloLink, FetchResult, Observable, Observer, Operation} from "@apollo/client";
+import {print} from "graphql";
+
+// Subscriptions are served with the graphql-transport-ws protocol, which the
+// server implements in api/websocket.py
+const PROTOCOL = "graphql-transport-ws";
+
+// The server closes the socket with these codes when retrying cannot help,
+// such as when the connection params are unauthorized
+const FATAL_CLOSE_CODES = [4400, 4401, 4403, 4406, 4409, 4429];
+
+const MAX_RETRY_DELAY = 30000;
+
+type ConnectionParams = () => Record<string, unknown>;
+
+interface Subscription {
+    payload: Record<string, unknown>;
+    observer: Observer<FetchResult>;
+}
+
+class SubscriptionClient {
+    private socket: WebSocket | null = null;
+    private acknowledged = false;
+    private retries = 0;
+    private nextId = 0;
+    private subscriptions = new Map<string, Subscription>();
+
+    constructor(private url: string, private connectionParams?: ConnectionParams) {}
+
+    subscribe(payload: Record<string, unknown>, observer: Observer<FetchResult>): string {
+        const id = String(++this.nextId);
+        this.subscriptions.set(id, {payload, observer});
+        if (this.acknowledged) {
+            this.send({id, type: "subscribe", payload});
+        } else if (!this.socket) {
+            this.connect();
+        }
+        return id;
+    }
+
+    unsubscribe(id: string) {
+        if (!this.subscriptions.delete(id)) {
+            return;
+        }
+        if (this.acknowledged) {
+            this.send({id, type: "complete"});
+        }
+        // The socket is only kept open while anything is subscribed
+        if (this.subscriptions.size === 0 && this.socket) {
+            const socket = this.socket;
+            this.socket = null;
+            this.acknowledged = false;
+            socket.close(1000);
+        }
+    }
+
+    private send(message: Record<string, unknown>) {
+        this.socket?.send(JSON.stringify(message));
+    }
+
+    private connect() {
+        const socket = new WebSocket(this.url, PROTOCOL);
+        this.socket = socket;
+        socket.onopen = () => {
+            this.send({type: "connection_init", payload: this.connectionParams?.() ?? {}});
+        };
+        socket.onmessage = ({data}) => this.receive(JSON.parse(data));
+        socket.onclose = ({code}) => {
+            if (this.socket !== socket) {
+                return;
+            }
+            this.socket = null;
+            this.acknowledged = false;
+            if (FATAL_CLOSE_CODES.includes(code)) {
+                this.subscriptions.forEach(({observer}) => observer.error?.(new Error(`WebSocket closed with ${code}`)));
+                this.subscriptions.clear();
+            } else if (this.subscriptions.size > 0) {
+                // Subscriptions are resumed once the socket reconnects, waiting
+                // twice as long after every failed attempt
+                const delay = Math.min(1000 * 2 ** this.retries++, MAX_RETRY_DELAY);
+                setTimeout(() => this.socket || this.subscriptions.size === 0 || this.connect(), delay);
+            }
+        };
+    }
+
+    private receive(message: {id?: string, type: string, payload?: any}) {
+        const subscription = message.id ? this.subscriptions.get(message.id) : undefined;
+        switch (message.type) {
+            case "connection_ack":
+                this.acknowledged = true;
+                this.retries = 0;
+                this.subscriptions.forEach(({payload}, id) => this.send({id, type: "subscribe", payload}));
+                break;
+            case "ping":
+                this.send({type: "pong"});
+                break;
+            case "next":
+                subscription?.observer.next?.(message.payload);
+                break;
+            case "error":
+                this.subscriptions.delete(message.id!);
+                subscription?.observer.error?.(
+                    new Error(message.payload?.map((error: {message: string}) => error.message).join("\n"))
+                );
+                break;
+            case "complete":
+                this.subscriptions.delete(message.id!);
+                subscription?.observer.complete?.();
+                break;
+        }
+    }
+}
+
+// Sends subscriptions over a WebSocket, which connects on the first
+// subscription and is authenticated by the params it connects with
+export class WebSocketLink extends ApolloLink {
+    private client: SubscriptionClient;
+
+    constructor(url: string, connectionParams?: ConnectionParams) {
+        super();
+        this.client = new SubscriptionClient(url, connectionParams);
+    }
+
+    request(operation: Operation): Observable<FetchResult> {
+        return new Observable((observer) => {
+            const id = this.client.subscribe({
+                query: print(operation.query),
+                variables: operation.variables,
+                operationName: operation.operationName,
+            }, observer);
+            return () => this.client.unsubscribe(id);
+        });
+    }
+}
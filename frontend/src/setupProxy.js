@@ -2,10 +2,11 @@ const {createProxyMiddleware} = require("http-proxy-middleware");
 
 module.exports = function (app) {
     app.use(
-        "/graphql",
+        ["/graphql", "/api"],
         createProxyMiddleware({
             target: "http://127.0.0.1:8000",
             changeOrigin: true,
+            ws: true,
         })
     );
 };
\ No newline at end of file
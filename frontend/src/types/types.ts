@@ -10,6 +10,7 @@ export type User = {
 }
 
 export type Member = {
+    id: number,
     user: User,
     school: number,
     classYear: number,